@@ -0,0 +1,101 @@
+"""
+マイクロベンチマーク: 1件ずつの登録と一括登録（/bulk）の比較
+
+同じ件数の生徒を次の方法で登録し、1秒あたりの登録件数（rows/sec）を比べます。
+
+- single: POST /students を1件ずつ呼ぶ
+- bulk (JSON): POST /students/bulk に JSON の配列を送る
+- bulk (NDJSON): POST /students/bulk に NDJSON（1行1件）を送る
+
+アプリケーションを httpx の ASGITransport で（ネットワークを通さずに）呼び出します。
+データベースは一時ファイルの SQLite で、方法ごとにテーブルを作り直します。
+
+使い方:
+    python benchmarks/bench_bulk.py --rows 20000 --single-rows 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_bulk_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの DATABASE_URL に接続する
+os.environ["DATABASE_URL"] = DATABASE_URL
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+import generate_data  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import Student  # noqa: E402
+
+
+def students(rows: int):
+    return [
+        {"student_id": i, "name": f"生徒 {i}", "email": f"student{i}@example.com",
+         "enrollment_date": "2024-04-01T09:00:00"}
+        for i in range(1, rows + 1)
+    ]
+
+
+async def single(client: httpx.AsyncClient, rows: list):
+    for row in rows:
+        response = await client.post("/students", json=row)
+        assert response.status_code == 200, response.text
+
+
+async def bulk_json(client: httpx.AsyncClient, rows: list, batch_size: int):
+    response = await client.post(f"/students/bulk?batch_size={batch_size}", json=rows)
+    assert response.status_code == 200 and response.json()["created"] == len(rows), response.text
+
+
+async def bulk_ndjson(client: httpx.AsyncClient, rows: list, batch_size: int):
+    body = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode()
+    response = await client.post(f"/students/bulk?batch_size={batch_size}", content=body,
+                                 headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200 and response.json()["created"] == len(rows), response.text
+
+
+async def measure(name: str, rows: list, run) -> float:
+    generate_data.reset_schema(engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await run(client, rows)
+        elapsed = time.perf_counter() - start
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Student)) == len(rows)
+    rate = len(rows) / elapsed
+    print(f"{name:<16} {len(rows):>8,} 件 {elapsed:>8.2f}秒 {rate:>12,.0f} rows/sec")
+    return rate
+
+
+async def compare(args):
+    all_rows = students(args.rows)
+    single_rate = await measure("single", all_rows[:args.single_rows], single)
+    for name, run in (("bulk (JSON)", bulk_json), ("bulk (NDJSON)", bulk_ndjson)):
+        rate = await measure(name, all_rows, lambda client, rows: run(client, rows, args.batch_size))
+        print(f"{'':<16} single の {rate / single_rate:.0f} 倍")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="1件ずつの登録と一括登録の rows/sec を比べます")
+    parser.add_argument("--rows", type=int, default=20000, help="一括登録する件数（デフォルト: 20000）")
+    parser.add_argument("--single-rows", type=int, default=2000, help="1件ずつ登録する件数（デフォルト: 2000）")
+    parser.add_argument("--batch-size", type=int, default=1000, help="一括登録の batch_size（デフォルト: 1000）")
+    asyncio.run(compare(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
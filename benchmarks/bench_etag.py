@@ -0,0 +1,87 @@
+"""
+マイクロベンチマーク: ETag（If-None-Match）でポーリングしたときの転送量と CPU 時間
+
+データが変わっていない一覧・詳細を繰り返し取得（ポーリング）するクライアントを想定し、
+次の2つで1リクエストあたりのレスポンスの大きさ（バイト）と CPU 時間（マイクロ秒）を比べます。
+
+- 200: 毎回 If-None-Match なしで取得する（毎回レスポンス全体を作って送る）
+- 304: 前回の ETag を If-None-Match で送る（変わっていなければ本文なしの 304）
+
+レスポンスキャッシュあり（CACHE_TTL=30 相当）となし（CACHE_TTL=0 相当）の両方で計測します。
+キャッシュなしの場合、304 でもデータベースから読み込んで ETag を計算しますが、
+レスポンスの検証・エンコード・送信は省けます。
+
+アプリケーションを httpx の ASGITransport で（ネットワークを通さずに）呼び出します。
+データベースは一時ファイルの SQLite です。
+
+使い方:
+    python benchmarks/bench_etag.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_etag_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの DATABASE_URL に接続する
+os.environ["DATABASE_URL"] = DATABASE_URL
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+import generate_data  # noqa: E402
+from cache import cache  # noqa: E402
+from main import app  # noqa: E402
+
+
+async def poll(client: httpx.AsyncClient, path: str, requests: int, conditional: bool):
+    """requests 回取得して、(1リクエストあたりのバイト数, CPU マイクロ秒) を返す"""
+    etag = (await client.get(path)).headers["etag"]
+    headers = {"If-None-Match": etag} if conditional else {}
+    expected = 304 if conditional else 200
+    total_bytes = 0
+    start = time.process_time()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == expected, response.status_code
+        total_bytes += len(response.content)
+    cpu = time.process_time() - start
+    return total_bytes / requests, cpu / requests * 1_000_000
+
+
+async def compare(paths, requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for ttl in (30, 0):
+            cache.ttl = ttl
+            print(f"\nキャッシュ{'あり' if ttl else 'なし'}（CACHE_TTL={ttl}）")
+            print(f"{'エンドポイント':<26} {'200':>20} {'304':>20}")
+            for path in paths:
+                full_bytes, full_cpu = await poll(client, path, requests, conditional=False)
+                cond_bytes, cond_cpu = await poll(client, path, requests, conditional=True)
+                print(f"{path:<26} {full_bytes:>8.0f}B {full_cpu:>8.1f}µs "
+                      f"{cond_bytes:>8.0f}B {cond_cpu:>8.1f}µs  (CPU {cond_cpu / full_cpu:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="If-None-Match の有無で、ポーリング1回あたりの転送量と CPU 時間を比べます")
+    parser.add_argument("--requests", type=int, default=2000, help="1つのエンドポイントに送るリクエスト数（デフォルト: 2000）")
+    parser.add_argument("--students", type=int, default=1000, help="投入する生徒の人数（デフォルト: 1000）")
+    args = parser.parse_args()
+
+    generate_data.generate(create_engine(DATABASE_URL), args.students, reset=True)
+    paths = ["/students?limit=100", "/students/1", "/courses?limit=100", "/courses/1"]
+    asyncio.run(compare(paths, args.requests))
+
+
+if __name__ == "__main__":
+    main()
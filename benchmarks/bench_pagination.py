@@ -0,0 +1,106 @@
+"""
+マイクロベンチマーク: ページの深さとページングの時間（OFFSET vs キーセット）
+
+生徒テーブルに rows 件（デフォルト 100万件）を投入し、先頭から depth 件目のページ（limit 件）を
+次の2つの方法で取得する時間を比べます。
+
+- offset: ?skip=depth（OFFSET depth）。データベースは depth 件を読んでから捨てる
+- cursor: ?cursor=...（WHERE student_id > depth）。主キーのインデックスで必要な行だけを読む
+
+src_fast_api/pagination.py の apply_page / split_page を、GET /students と同じ select(Student) に使います。
+データベースは一時ファイルの SQLite です。
+
+使い方:
+    python benchmarks/bench_pagination.py --rows 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_pagination_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの DATABASE_URL に接続する
+os.environ["DATABASE_URL"] = DATABASE_URL
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+from sqlalchemy import select  # noqa: E402
+
+import generate_data  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models import Student  # noqa: E402
+from pagination import apply_page, encode_cursor, split_page  # noqa: E402
+
+
+def load_students(rows: int):
+    """生徒だけを rows 件投入する（他のテーブルは空）"""
+    generate_data.reset_schema(engine)
+    start = generate_data.START_DATE
+    dbapi_conn = engine.raw_connection()
+    try:
+        generate_data._executemany_sqlite(
+            dbapi_conn,
+            "students",
+            generate_data.TABLES["students"],
+            ((i, f"生徒 {i}", f"student{i}@example.com", start + timedelta(minutes=i)) for i in range(1, rows + 1)),
+        )
+        dbapi_conn.commit()
+    finally:
+        dbapi_conn.close()
+
+
+def fetch_page(db, depth: int, limit: int, mode: str):
+    """depth 件目から limit 件を取得する（GET /students と同じ組み立て方）"""
+    if mode == "cursor":
+        # 前のページの最後の student_id が depth（ID は 1 から連番）
+        query = apply_page(select(Student), Student.student_id, 0, limit, encode_cursor(depth) if depth else None)
+    else:
+        query = apply_page(select(Student), Student.student_id, depth, limit, None)
+    rows, _ = split_page(db.scalars(query).all(), Student.student_id, limit)
+    assert rows[0].student_id == depth + 1
+    return rows
+
+
+def measure(depth: int, limit: int, mode: str, repeat: int) -> float:
+    """repeat 回取得して、1ページあたりの時間の中央値（ミリ秒）を返す"""
+    timings = []
+    with SessionLocal() as db:
+        fetch_page(db, depth, limit, mode)  # ウォームアップ
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fetch_page(db, depth, limit, mode)
+            timings.append(time.perf_counter() - start)
+            db.expunge_all()
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ページの深さごとに、OFFSET とキーセットのページングの時間を比べます")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="生徒の件数（デフォルト: 1000000）")
+    parser.add_argument("--limit", type=int, default=100, help="1ページの件数（デフォルト: 100）")
+    parser.add_argument("--repeat", type=int, default=20, help="深さごとに計測する回数（デフォルト: 20）")
+    args = parser.parse_args()
+
+    print(f"生徒を {args.rows:,} 件投入しています...")
+    start = time.perf_counter()
+    load_students(args.rows)
+    print(f"  完了（{time.perf_counter() - start:.1f} 秒）\n")
+
+    depths = sorted({0, 1_000, 10_000, 100_000, args.rows // 2, args.rows - args.limit} & set(range(args.rows - args.limit + 1)))
+    print(f"{'depth':>10} {'offset':>12} {'cursor':>12}")
+    for depth in depths:
+        offset = measure(depth, args.limit, "offset", args.repeat)
+        cursor = measure(depth, args.limit, "cursor", args.repeat)
+        print(f"{depth:>10,} {offset:>10.2f}ms {cursor:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
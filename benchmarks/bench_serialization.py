@@ -0,0 +1,82 @@
+"""
+マイクロベンチマーク: 通常のシリアライズと高速シリアライズ（FAST_SERIALIZATION）の比較
+
+同じ GET エンドポイントを次の2つのモードで N 回ずつ呼び出し、1リクエストあたりの時間（マイクロ秒）を比べます。
+
+- 通常: ORM のインスタンス → response_model（StudentResponse など）で再検証 → 標準ライブラリの json
+- 高速: Core の select でタプルを取得 → 辞書 → orjson（インストールされていなければ json）
+
+どちらのモードも返す JSON が同じであることも確かめます。
+レスポンスキャッシュは無効にして、毎回データベースから読み込みます。
+アプリケーションを httpx の ASGITransport で（ネットワークを通さずに）呼び出します。
+データベースは一時ファイルの SQLite です。
+
+使い方:
+    python benchmarks/bench_serialization.py --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_serialization_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの DATABASE_URL に接続する
+os.environ["DATABASE_URL"] = DATABASE_URL
+os.environ["CACHE_TTL"] = "0"
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+import generate_data  # noqa: E402
+import main as api  # noqa: E402
+import serialization  # noqa: E402
+
+PATHS = ["/students?limit=100", "/students?limit=1000", "/students/1", "/courses?limit=100", "/courses/1"]
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int, fast: bool):
+    """requests 回取得して、(1リクエストあたりのマイクロ秒, 最後のレスポンスの JSON) を返す"""
+    # main.py は import したときの FAST_SERIALIZATION を使うので、モジュールの変数を切り替える
+    api.FAST_SERIALIZATION = fast
+    await client.get(path)  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1_000_000, response.json()
+
+
+async def compare(requests: int):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"JSON エンコーダー（高速）: {'orjson' if serialization.orjson else 'json'}")
+        print(f"{'エンドポイント':<24} {'通常':>12} {'高速':>12}")
+        for path in PATHS:
+            normal_us, normal_body = await measure(client, path, requests, fast=False)
+            fast_us, fast_body = await measure(client, path, requests, fast=True)
+            assert normal_body == fast_body, f"{path}: 通常と高速で JSON が違います"
+            print(f"{path:<24} {normal_us:>10.1f}µs {fast_us:>10.1f}µs  ({fast_us / normal_us:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="通常のシリアライズと高速シリアライズの1リクエストあたりの時間を比べます")
+    parser.add_argument("--requests", type=int, default=500, help="1つのエンドポイントに送るリクエスト数（デフォルト: 500）")
+    parser.add_argument("--students", type=int, default=2000, help="投入する生徒の人数（デフォルト: 2000）")
+    args = parser.parse_args()
+
+    generate_data.generate(create_engine(DATABASE_URL), args.students, reset=True)
+    asyncio.run(compare(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+マイクロベンチマーク: リクエストごとのセッションの作成・後片付けのコスト
+
+src_fast_api/database.py の get_db を、次の2つで比べます。
+
+- before: def の依存関数で、リクエストごとに SessionLocal() を作って close する（expire_on_commit=True）
+- after: async def の依存関数で、最初に使われたときにセッションを作る（LazySession、expire_on_commit=False）
+
+アプリケーションを httpx の ASGITransport で（ネットワークを通さずに）呼び出し、1リクエストあたりの時間（マイクロ秒）と SQL の実行回数を表示します。
+データベースは一時ファイルの SQLite です。
+
+使い方:
+    python benchmarks/bench_sessions.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_sessions_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの環境変数を使う
+os.environ["DATABASE_URL"] = DATABASE_URL
+os.environ.setdefault("CACHE_TTL", "60")
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+import httpx  # noqa: E402
+from fastapi import Request  # noqa: E402
+from sqlalchemy import create_engine, event, func, select  # noqa: E402
+
+import generate_data  # noqa: E402
+from database import READ_METHODS, SessionLocal, engine, get_db, reads_from_primary  # noqa: E402
+from main import app  # noqa: E402
+from models import Review, VideoSubmission  # noqa: E402
+
+
+def legacy_get_db(request: Request):
+    """変更前の get_db（def の依存関数で、毎回セッションを作る）"""
+    db = SessionLocal()
+    db.expire_on_commit = True
+    db.info["read_only"] = request.method in READ_METHODS and not reads_from_primary(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def review_payloads(requests: int):
+    """POST /reviews に送る、毎回 review_id の異なるレビュー"""
+    with SessionLocal() as db:
+        next_id = (db.scalar(select(func.max(Review.review_id))) or 0) + 1
+        submission_id = db.scalar(select(func.min(VideoSubmission.submission_id)))
+    reviewed_at = datetime(2024, 6, 1).isoformat()
+    for review_id in range(next_id, next_id + requests):
+        yield {"review_id": review_id, "submission_id": submission_id, "rating": 5, "reviewed_at": reviewed_at}
+
+
+async def run(client: httpx.AsyncClient, method: str, path: str, requests: int, counter: StatementCounter):
+    """requests 回呼び出して、(1リクエストあたりのマイクロ秒, SQL の回数) を返す"""
+    payloads = review_payloads(requests + 10) if method == "POST" else None
+    for _ in range(10):
+        await client.request(method, path, json=next(payloads) if payloads else None)
+    counter.count = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.request(method, path, json=next(payloads) if payloads else None)
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1_000_000, counter.count / requests
+
+
+async def compare(cases, requests: int, rounds: int, counter: StatementCounter):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for method, path in cases:
+            # 変更前と変更後を交互に rounds 回ずつ計測し、いちばん速かった回を使う
+            best = {}
+            for _ in range(rounds):
+                for name, dependency in (("before", legacy_get_db), ("after", None)):
+                    if dependency is None:
+                        app.dependency_overrides.clear()
+                    else:
+                        app.dependency_overrides[get_db] = dependency
+                    result = await run(client, method, path, requests, counter)
+                    best[name] = min(best.get(name, result), result)
+            (before, before_sql), (after, after_sql) = best["before"], best["after"]
+            print(
+                f"{method + ' ' + path:<22} {before:>8.1f}µs {before_sql:>4.1f}SQL "
+                f"{after:>8.1f}µs {after_sql:>4.1f}SQL  ({after / before:.2f}x)"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="get_db の変更前と変更後で、1リクエストあたりの時間を比べます")
+    parser.add_argument("--requests", type=int, default=2000, help="1つのエンドポイントに送るリクエスト数（デフォルト: 2000）")
+    parser.add_argument("--rounds", type=int, default=3, help="計測を繰り返す回数（デフォルト: 3）")
+    parser.add_argument("--students", type=int, default=1000, help="投入する生徒の人数（デフォルト: 1000）")
+    args = parser.parse_args()
+
+    generate_data.generate(create_engine(DATABASE_URL), args.students, reset=True)
+    counter = StatementCounter()
+    event.listen(engine, "after_cursor_execute", counter)
+
+    cases = [
+        ("GET", "/health"),
+        ("GET", "/students/1"),  # 2回目以降はレスポンスキャッシュから返す
+        ("GET", "/health/db"),
+        ("POST", "/reviews"),
+    ]
+    print(f"{'エンドポイント':<22} {'before':>16} {'after':>16}")
+    asyncio.run(compare(cases, args.requests, args.rounds, counter))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+マイクロベンチマーク: SQL の組み立て直し vs 組み立て済みの SQL
+
+src_fast_api/statements.py の組み立て済みの SQL（bindparam）で、1回の検索あたりの Python の処理時間がどれだけ減るかを計測します。
+同じ検索を次の方法で N 回ずつ実行し、1回あたりの時間（マイクロ秒）を比べます。
+
+- db.query(...).filter(...).first()（ORM の Query を毎回組み立てる）
+- db.execute(select(...).where(...))（select を毎回組み立てる）
+- db.execute(lambda_stmt(lambda: select(...)))（参考）
+- db.execute(statements.XXX, {...})（組み立て済みの SQL）
+
+データベースは一時ファイルの SQLite なので、差はほぼすべて Python 側の処理時間です。
+
+使い方:
+    python benchmarks/bench_statements.py --calls 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="bench_statements_")
+DATABASE_URL = f"sqlite:///{Path(WORK_DIR) / 'bench.db'}"
+
+# src_fast_api のモジュールは import したときの DATABASE_URL に接続する
+os.environ["DATABASE_URL"] = DATABASE_URL
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+from sqlalchemy import bindparam, create_engine, lambda_stmt, select  # noqa: E402
+
+import generate_data  # noqa: E402
+import statements  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models import Course, Enrollment, Student  # noqa: E402
+
+
+# JOIN を含む検索（組み立て済み）
+ACTIVE_ENROLLMENTS_BY_STUDENT = (
+    select(Enrollment.enrollment_id, Enrollment.enrolled_at, Course.course_id, Course.title)
+    .join(Course, Course.course_id == Enrollment.course_id)
+    .where(Enrollment.student_id == bindparam("student_id"), Enrollment.status == "active")
+    .order_by(Enrollment.enrollment_id)
+)
+
+
+def cases():
+    """(名前, {方法: 関数}) のリスト。関数は (db, id) を受け取る"""
+    return [
+        ("student by id", {
+            "ORM Query": lambda db, i: db.query(Student).filter(Student.student_id == i).first(),
+            "select": lambda db, i: db.execute(select(Student).where(Student.student_id == i)).scalar_one_or_none(),
+            "lambda_stmt": lambda db, i: db.execute(
+                lambda_stmt(lambda: select(Student).where(Student.student_id == i))
+            ).scalar_one_or_none(),
+            "prebuilt": lambda db, i: db.execute(statements.STUDENT_BY_ID, {"student_id": i}).scalar_one_or_none(),
+        }),
+        ("course row by id", {
+            "select": lambda db, i: db.execute(select(*statements.COURSE_COLUMNS).where(Course.course_id == i)).first(),
+            "lambda_stmt": lambda db, i: db.execute(
+                lambda_stmt(lambda: select(*statements.COURSE_COLUMNS).where(Course.course_id == i))
+            ).first(),
+            "prebuilt": lambda db, i: db.execute(statements.COURSE_ROW_BY_ID, {"course_id": i}).first(),
+        }),
+        ("active enrollments (JOIN)", {
+            "select": lambda db, i: db.execute(
+                select(Enrollment.enrollment_id, Enrollment.enrolled_at, Course.course_id, Course.title)
+                .join(Course, Course.course_id == Enrollment.course_id)
+                .where(Enrollment.student_id == i, Enrollment.status == "active")
+                .order_by(Enrollment.enrollment_id)
+            ).all(),
+            "prebuilt": lambda db, i: db.execute(ACTIVE_ENROLLMENTS_BY_STUDENT, {"student_id": i}).all(),
+        }),
+    ]
+
+
+def measure(func, ids) -> float:
+    """ids の数だけ func を実行し、1回あたりのマイクロ秒を返す"""
+    db = SessionLocal()
+    try:
+        # ウォームアップ（コンパイル済み SQL のキャッシュを作る）
+        for i in ids[:100]:
+            func(db, i)
+        db.expunge_all()
+        start = time.perf_counter()
+        for i in ids:
+            func(db, i)
+            # アイデンティティマップに溜まったインスタンスの影響を避ける
+            db.expunge_all()
+        return (time.perf_counter() - start) / len(ids) * 1_000_000
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL の組み立て直しと組み立て済みの SQL の1回あたりの時間を比べます")
+    parser.add_argument("--calls", type=int, default=20000, help="1つの方法で実行する回数（デフォルト: 20000）")
+    parser.add_argument("--students", type=int, default=1000, help="投入する生徒の人数（デフォルト: 1000）")
+    args = parser.parse_args()
+
+    generate_data.generate(create_engine(DATABASE_URL), args.students, reset=True)
+    rng = random.Random(42)
+    student_ids = [rng.randint(1, args.students) for _ in range(args.calls)]
+    course_ids = [rng.randint(1, max(5, args.students // 2000)) for _ in range(args.calls)]
+
+    statements.track_statement_cache(engine)
+    for name, methods in cases():
+        ids = course_ids if "course" in name else student_ids
+        print(f"\n{name}")
+        baseline = None
+        for method, func in methods.items():
+            elapsed = measure(func, ids)
+            baseline = baseline or elapsed
+            print(f"  {method:<12} {elapsed:>8.1f}µs/回  ({elapsed / baseline:.2f}x)")
+
+    print(f"\nコンパイル済み SQL のキャッシュ: {statements.cache_stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 -- For Supabase (PostgreSQL)
 
 -- Clean up existing objects (ignore errors if your RDBMS doesn't support IF EXISTS)
+DROP TABLE IF EXISTS summary_totals;
+DROP TABLE IF EXISTS student_stats;
+DROP TABLE IF EXISTS course_stats;
 DROP TABLE IF EXISTS reviews;
 DROP TABLE IF EXISTS video_submissions;
 DROP TABLE IF EXISTS lessons;
@@ -69,4 +72,44 @@ CREATE TABLE reviews (
   FOREIGN KEY (submission_id) REFERENCES video_submissions(submission_id)
 );
 
+-- Summary tables: ダッシュボード用の集計テーブル（src_fast_api/summary.py が差分で更新）
+-- 元のテーブルから作り直せるデータなので、外部キーは付けていません。
+-- 既存のデータベースに追加するときは、この3つの CREATE TABLE IF NOT EXISTS だけを実行してください
+-- （アプリケーションも起動時に、なければ作成します）。
+CREATE TABLE IF NOT EXISTS course_stats (
+  course_id INT PRIMARY KEY,
+  active_enrollments INT NOT NULL DEFAULT 0,
+  completed_enrollments INT NOT NULL DEFAULT 0,
+  cancelled_enrollments INT NOT NULL DEFAULT 0,
+  total_enrollments INT NOT NULL DEFAULT 0,
+  review_count INT NOT NULL DEFAULT 0,
+  rating_count INT NOT NULL DEFAULT 0, -- rating が NULL でないレビューの数
+  rating_sum INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS student_stats (
+  student_id INT PRIMARY KEY,
+  active_enrollments INT NOT NULL DEFAULT 0,
+  completed_enrollments INT NOT NULL DEFAULT 0,
+  cancelled_enrollments INT NOT NULL DEFAULT 0,
+  total_enrollments INT NOT NULL DEFAULT 0,
+  total_lessons INT NOT NULL DEFAULT 0,
+  completed_lessons INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS summary_totals (
+  name VARCHAR(50) PRIMARY KEY, -- 'courses', 'course_price_sum', 'enrollments.active' など
+  value NUMERIC(14, 2) NOT NULL DEFAULT 0
+);
 
+-- Indexes: 外部キーとよく使う検索条件のインデックス
+-- PostgreSQL は外部キーに自動でインデックスを作らないため、JOIN やリレーションシップの取得が全件走査になります。
+-- 名前は SQLAlchemy の index=True と同じ ix_<テーブル名>_<カラム名> に揃えています。
+CREATE INDEX ix_students_enrollment_date ON students(enrollment_date);
+CREATE INDEX ix_enrollments_student_id ON enrollments(student_id);
+CREATE INDEX ix_enrollments_course_id ON enrollments(course_id);
+CREATE INDEX ix_enrollments_status_course_id ON enrollments(status, course_id); -- ステータスで絞り込んでコースと JOIN
+CREATE INDEX ix_lessons_enrollment_id_status ON lessons(enrollment_id, status); -- 受講登録ごとの完了レッスン数
+CREATE INDEX ix_video_submissions_lesson_id ON video_submissions(lesson_id);
+CREATE INDEX ix_reviews_submission_id ON reviews(submission_id);
+CREATE INDEX ix_reviews_rating ON reviews(rating);
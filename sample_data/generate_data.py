@@ -0,0 +1,287 @@
+"""
+大量のサンプルデータを生成するスクリプト
+
+02_seed.sql は生徒6人・コース5件の固定データなので、本番に近いデータ量での動作確認ができません。
+このスクリプトは、シード値を指定すると毎回同じ内容になる（決定的な）データを、
+好きな規模で6つのテーブルすべてに投入します。
+
+データ量の目安（--students に対して）:
+    courses           生徒 2,000 人ごとに 1 件（最低 5 件）
+    enrollments       生徒 1 人あたり 1〜3 件（平均 2 件）
+    lessons           受講登録 1 件あたり 1〜9 件（平均 5 件）
+    video_submissions 完了したレッスンの 60%
+    reviews           レビュー済み・再提出のビデオ提出に 1 件ずつ
+    → --students 1000000 で、レッスンは約 1,000 万件
+
+ステータスや評価は、実際の分布に近くなるように偏りを持たせています。
+
+1行ずつ INSERT するのではなく、まとめて投入します。
+    PostgreSQL: COPY ... FROM STDIN
+    SQLite: executemany
+    その他（MySQL など）: DB-API の executemany（ドライバーのパラメーターの書き方に合わせる）
+
+使い方:
+    python generate_data.py --students 100000 --reset
+    python generate_data.py --database-url sqlite:///bench.db --students 1000000 --seed 42 --reset
+
+他のプログラム（ベンチマークなど）からは generate() を呼び出して使えます。
+"""
+
+import argparse
+import csv
+import functools
+import io
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+DDL_PATH = Path(__file__).with_name("01_ddl.sql")
+
+# テーブルと列（投入する順番＝外部キーの親から順）
+TABLES = {
+    "students": ("student_id", "name", "email", "enrollment_date"),
+    "courses": ("course_id", "title", "description", "monthly_price", "created_at"),
+    "enrollments": ("enrollment_id", "student_id", "course_id", "enrolled_at", "status"),
+    "lessons": ("lesson_id", "enrollment_id", "scheduled_at", "duration_minutes", "status", "notes"),
+    "video_submissions": ("submission_id", "lesson_id", "title", "video_url", "submitted_at", "status"),
+    "reviews": ("review_id", "submission_id", "rating", "feedback", "reviewed_at"),
+}
+
+# ステータス・評価の分布（値, 重み）
+ENROLLMENT_STATUSES = (("active", 70), ("completed", 20), ("cancelled", 10))
+LESSON_STATUSES = (("completed", 60), ("scheduled", 30), ("cancelled", 10))
+SUBMISSION_STATUSES = (("reviewed", 70), ("submitted", 20), ("revised", 10))
+RATINGS = ((5, 35), (4, 40), (3, 18), (2, 5), (1, 2))
+
+LAST_NAMES = ["田中", "高橋", "伊藤", "山本", "中村", "小林", "佐藤", "鈴木", "渡辺", "加藤", "吉田", "山田"]
+FIRST_NAMES = ["一郎", "美咲", "健太", "さくら", "大輔", "麻衣", "花子", "翔太", "陽菜", "蓮", "結衣", "大翔"]
+COURSE_TOPICS = ["英会話基礎", "英会話中級", "ビジネス英会話", "TOEIC対策", "プレゼンテーション英会話", "発音矯正", "英文法"]
+LESSON_TOPICS = ["自己紹介と挨拶", "基本的な文法（現在形）", "日常会話の練習", "リスニング練習", "過去形と過去分詞",
+                 "条件文（if文）", "ビジネスメールの書き方", "会議での英語表現", "現在完了形"]
+FEEDBACKS = ["よくできています。", "発音をもう少し練習しましょう。", "自然な会話ができています。",
+             "時制の使い分けが良いです。", "もっと長い文章で話す練習をしましょう。"]
+
+START_DATE = datetime(2023, 1, 1)
+
+
+def _weighted(choices):
+    values, weights = zip(*choices)
+    return values, list(weights)
+
+
+def generate_rows(students: int, seed: int = 42, chunk_size: int = 10000):
+    """
+    データを生成するジェネレーター
+
+    生徒 chunk_size 人ごとに、その生徒に関係する6テーブル分の行をまとめて返します。
+    チャンクごとに親テーブルから順に投入すれば、外部キー制約を満たしたまま
+    一定のメモリで大量のデータを投入できます。
+
+    Yields:
+        {テーブル名: [行のタプル, ...]} の辞書（最初のチャンクにはすべてのコースを含む）
+    """
+    rng = random.Random(seed)
+    enrollment_statuses = _weighted(ENROLLMENT_STATUSES)
+    lesson_statuses = _weighted(LESSON_STATUSES)
+    submission_statuses = _weighted(SUBMISSION_STATUSES)
+    ratings = _weighted(RATINGS)
+
+    n_courses = max(5, students // 2000)
+    courses = []
+    for course_id in range(1, n_courses + 1):
+        topic = COURSE_TOPICS[(course_id - 1) % len(COURSE_TOPICS)]
+        price = Decimal(rng.randrange(10, 31) * 1000).quantize(Decimal("0.01"))
+        courses.append((course_id, f"{topic}コース {course_id}", f"{topic}を学ぶ", price, START_DATE))
+
+    enrollment_id = lesson_id = submission_id = review_id = 0
+    rows = {table: [] for table in TABLES}
+    rows["courses"] = courses
+
+    for student_id in range(1, students + 1):
+        enrollment_date = START_DATE + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60))
+        name = f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"
+        rows["students"].append((student_id, name, f"student{student_id}@example.com", enrollment_date))
+
+        for _ in range(rng.randint(1, 3)):
+            enrollment_id += 1
+            enrolled_at = enrollment_date + timedelta(hours=rng.randrange(24 * 30))
+            status = rng.choices(*enrollment_statuses)[0]
+            rows["enrollments"].append((enrollment_id, student_id, rng.randint(1, n_courses), enrolled_at, status))
+
+            for week in range(rng.randint(1, 9)):
+                lesson_id += 1
+                scheduled_at = enrolled_at + timedelta(days=7 * (week + 1))
+                lesson_status = rng.choices(*lesson_statuses)[0]
+                rows["lessons"].append((lesson_id, enrollment_id, scheduled_at, rng.choice((60, 90)),
+                                        lesson_status, rng.choice(LESSON_TOPICS)))
+
+                if lesson_status != "completed" or rng.random() >= 0.6:
+                    continue
+                submission_id += 1
+                submitted_at = scheduled_at + timedelta(hours=rng.randrange(6, 48))
+                submission_status = rng.choices(*submission_statuses)[0]
+                rows["video_submissions"].append((submission_id, lesson_id, "レッスンの復習ビデオ",
+                                                  f"https://example.com/videos/{submission_id}",
+                                                  submitted_at, submission_status))
+
+                if submission_status == "submitted":
+                    continue
+                review_id += 1
+                rows["reviews"].append((review_id, submission_id, rng.choices(*ratings)[0], rng.choice(FEEDBACKS),
+                                        submitted_at + timedelta(hours=rng.randrange(12, 72))))
+
+        if student_id % chunk_size == 0:
+            yield rows
+            rows = {table: [] for table in TABLES}
+
+    if any(rows.values()):
+        yield rows
+
+
+# ========== 一括投入 ==========
+
+def _copy_postgres(dbapi_conn, table, columns, rows):
+    """PostgreSQL: COPY で一括投入（psycopg3 / psycopg2 の両方に対応）"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    with dbapi_conn.cursor() as cursor:
+        if hasattr(cursor, "copy"):
+            # psycopg3
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            # psycopg2: CSV 形式のテキストを渡す
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(sql + " WITH (FORMAT csv)", buffer)
+
+
+def _sqlite_value(value):
+    # sqlite3 は Decimal を扱えず、datetime の自動変換も非推奨なので文字列にする
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _executemany_sqlite(dbapi_conn, table, columns, rows):
+    """SQLite: executemany で一括投入"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    cursor = dbapi_conn.cursor()
+    cursor.executemany(sql, ([_sqlite_value(v) for v in row] for row in rows))
+    cursor.close()
+
+
+def _executemany_dbapi(paramstyle, dbapi_conn, table, columns, rows):
+    """その他のデータベース: DB-API の executemany で一括投入"""
+    if paramstyle == "qmark":
+        placeholders = ["?"] * len(columns)
+    elif paramstyle in ("numeric", "named"):
+        # 名前付きのドライバー（Oracle など）も、:1, :2 の位置指定を受け付ける
+        placeholders = [f":{i}" for i in range(1, len(columns) + 1)]
+    else:
+        placeholders = ["%s"] * len(columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+    cursor = dbapi_conn.cursor()
+    cursor.executemany(sql, [tuple(row) for row in rows])
+    cursor.close()
+
+
+def _split_statements(script: str):
+    """SQL スクリプトを1文ずつに分ける（-- のコメントは取り除く）"""
+    script = re.sub(r"--[^\n]*", "", script)
+    return [statement.strip() for statement in script.split(";") if statement.strip()]
+
+
+def reset_schema(engine):
+    """01_ddl.sql を実行してテーブルを作り直す"""
+    ddl = DDL_PATH.read_text(encoding="utf-8")
+    dbapi_conn = engine.raw_connection()
+    try:
+        if engine.dialect.name == "sqlite":
+            dbapi_conn.executescript(ddl)
+        elif engine.dialect.name == "postgresql":
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(ddl)
+        else:
+            # 複数の文を一度に実行できないドライバーがあるので、1文ずつ実行する
+            cursor = dbapi_conn.cursor()
+            for statement in _split_statements(ddl):
+                cursor.execute(statement)
+            cursor.close()
+        dbapi_conn.commit()
+    finally:
+        dbapi_conn.close()
+
+
+def generate(engine, students: int, seed: int = 42, chunk_size: int = 10000, reset: bool = False, verbose: bool = False):
+    """
+    データを生成してデータベースに投入する
+
+    Args:
+        engine: 投入先の SQLAlchemy エンジン（PostgreSQL・SQLite 以外は executemany で投入するので遅くなります）
+        students: 生徒の人数（他のテーブルの件数はこれに比例）
+        seed: 乱数のシード値（同じ値なら毎回同じデータ）
+        chunk_size: 何人分ずつまとめて投入するか
+        reset: True の場合、01_ddl.sql でテーブルを作り直してから投入
+
+    Returns:
+        テーブルごとの投入件数
+    """
+    if engine.dialect.name == "postgresql":
+        load = _copy_postgres
+    elif engine.dialect.name == "sqlite":
+        load = _executemany_sqlite
+    else:
+        load = functools.partial(_executemany_dbapi, engine.dialect.paramstyle)
+
+    if reset:
+        reset_schema(engine)
+
+    counts = {table: 0 for table in TABLES}
+    start = time.perf_counter()
+    dbapi_conn = engine.raw_connection()
+    try:
+        for rows in generate_rows(students, seed, chunk_size):
+            for table, columns in TABLES.items():
+                if rows[table]:
+                    load(dbapi_conn, table, columns, rows[table])
+                    counts[table] += len(rows[table])
+            dbapi_conn.commit()
+            if verbose:
+                print(f"  生徒 {counts['students']:,} 人分を投入（{time.perf_counter() - start:.1f} 秒）")
+    finally:
+        dbapi_conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大量のサンプルデータを生成して投入します")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="接続URL（デフォルト: 環境変数 DATABASE_URL）")
+    parser.add_argument("--students", type=int, default=1000, help="生徒の人数（デフォルト: 1000）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード値（デフォルト: 42）")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="何人分ずつまとめて投入するか（デフォルト: 10000）")
+    parser.add_argument("--reset", action="store_true", help="01_ddl.sql でテーブルを作り直してから投入する")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url または環境変数 DATABASE_URL を指定してください")
+
+    engine = create_engine(args.database_url)
+    start = time.perf_counter()
+    counts = generate(engine, args.students, args.seed, args.chunk_size, args.reset, verbose=True)
+    print(f"\n完了（{time.perf_counter() - start:.1f} 秒）")
+    for table, count in counts.items():
+        print(f"  {table}: {count:,} 件")
+
+
+if __name__ == "__main__":
+    main()
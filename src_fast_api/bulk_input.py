@@ -0,0 +1,84 @@
+"""
+一括登録（/bulk）のリクエストボディの読み込み
+
+次の2つの形式を受け付けます。
+
+- JSON の配列（Content-Type: application/json）
+    [{"student_id": 1, ...}, {"student_id": 2, ...}]
+- NDJSON（Content-Type: application/x-ndjson）: 1行に1件の JSON
+    {"student_id": 1, ...}
+    {"student_id": 2, ...}
+
+NDJSON は、エクスポート（GET /export/{table}）の出力をそのまま送り返したり、
+大きなファイルを行ごとに作って送ったりするのに使えます。
+ボディはチャンクごとに読み、1行ずつ検証するので、巨大な JSON の配列を一度に解析しません。
+"""
+
+from typing import List
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def _ndjson_lines(request: Request):
+    """ボディを受け取った順に1行ずつ返す（(行番号, 行) のタプル、空行は飛ばす）"""
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+def bulk_rows(schema):
+    """
+    JSON の配列または NDJSON を schema で検証し、辞書のリストにする依存関数を作る
+
+    検証エラーは通常のリクエストと同じく 422 になります（NDJSON の場合、loc に行番号が入ります）。
+    """
+    list_adapter = TypeAdapter(List[schema])
+
+    async def dependency(request: Request) -> List[dict]:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type in NDJSON_TYPES:
+            rows = []
+            async for number, line in _ndjson_lines(request):
+                try:
+                    rows.append(schema.model_validate_json(line).model_dump())
+                except ValidationError as e:
+                    raise RequestValidationError(
+                        [{**error, "loc": ("body", number, *error["loc"])} for error in e.errors(include_url=False)]
+                    )
+            return rows
+
+        try:
+            items = list_adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+        return [item.model_dump() for item in items]
+
+    return dependency
+
+
+def bulk_openapi(schema) -> dict:
+    """/docs に2つの形式のリクエストボディを表示するための openapi_extra"""
+    ref = {"$ref": f"#/components/schemas/{schema.__name__}"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": ref}},
+                "application/x-ndjson": {"schema": ref},
+            },
+        }
+    }
@@ -0,0 +1,231 @@
+"""
+GET エンドポイントのレスポンスキャッシュ（リードスルー）
+
+一度取得した結果をキャッシュしておき、同じリクエストにはデータベースを使わずに返します。
+キャッシュにない場合だけデータベースから読み込み、結果をキャッシュに保存します（リードスルー）。
+
+- キャッシュのキーは「名前空間（テーブル）+ ルート + パラメータ」
+- 名前空間ごとにバージョン番号を持ち、POST で書き込んだらバージョンを上げて古いキャッシュを無効化します
+  （古いエントリは TTL や LRU によって自然に消えます）
+- 読み込み用のレプリカがある場合、無効化した直後はレプリカに書き込みがまだ反映されていないことがあります。
+  get_or_load(..., min_age=秒) を指定すると、無効化してからその秒数がたつまでは読み込んだ結果を保存しません
+- ETag はキャッシュのキー（名前空間のバージョン + ルート + パラメータ）と TTL の区間から作ります。
+  読み込む前に ETag がわかるので、クライアントが If-None-Match で送ってきた ETag と一致すれば、
+  キャッシュになくてもデータベースもシリアライズも使わずに 304 Not Modified を返せます。
+  POST で無効化するとバージョンが変わり、TTL の区間が変わっても ETag が変わるので、
+  API を通さずにデータベースを更新した場合も、キャッシュと同じく TTL 以内には反映されます
+- キャッシュしない場合（CACHE_TTL=0 や、レプリカから読んだ結果を保存しない間）は、
+  読み込んだ結果（レスポンスのデータ）のハッシュから ETag を作ります
+- 保存先（バックエンド）は差し替え可能です
+    - memory: プロセス内の LRU キャッシュ（デフォルト）
+    - redis: 複数プロセスで共有できる Redis（redis パッケージが必要）
+
+環境変数:
+    CACHE_BACKEND: memory / redis（デフォルト: memory）
+    CACHE_URL: Redis の接続URL（デフォルト: redis://localhost:6379/0）
+    CACHE_TTL: キャッシュの有効期間（秒、デフォルト: 30）。0 にするとキャッシュしない
+    CACHE_MAXSIZE: memory の最大エントリ数（デフォルト: 1024）
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1024"))
+
+
+class MemoryBackend:
+    """プロセス内の LRU キャッシュ（TTL 付き）"""
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (期限, 値)
+        self._versions = {}
+        self._invalidated_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            # 最近使ったエントリを末尾に移動（LRU）
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            # 上限を超えたら、最も長く使われていないエントリから削除
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_version(self, namespace: str) -> int:
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace: str):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            self._invalidated_at[namespace] = time.time()
+
+    def get_invalidated_at(self, namespace: str) -> float:
+        """最後に無効化した時刻（UNIX 時間。無効化していなければ 0）"""
+        with self._lock:
+            return self._invalidated_at.get(namespace, 0.0)
+
+
+class RedisBackend:
+    """
+    Redis を使ったキャッシュ（複数のワーカー・サーバーで共有できる）
+
+    client を渡すと、その接続を使います（fakeredis などの代用品でも動きます）。
+    """
+
+    def __init__(self, url: str = CACHE_URL, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis を使うには redis パッケージをインストールしてください")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key: str):
+        value = self.client.get(key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(key, json.dumps(value), px=int(ttl * 1000))
+
+    def get_version(self, namespace: str) -> int:
+        return int(self.client.get(f"version:{namespace}") or 0)
+
+    def bump_version(self, namespace: str):
+        self.client.incr(f"version:{namespace}")
+        self.client.set(f"invalidated:{namespace}", time.time())
+
+    def get_invalidated_at(self, namespace: str) -> float:
+        return float(self.client.get(f"invalidated:{namespace}") or 0)
+
+
+class ResponseCache:
+    """名前空間ごとに無効化できるリードスルーキャッシュ"""
+
+    def __init__(self, backend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, namespace: str, route: str, params: dict) -> str:
+        """キャッシュのキーを作成（名前空間のバージョンを含める）"""
+        version = self.backend.get_version(namespace)
+        query = urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+        return f"{namespace}:v{version}:{route}?{query}"
+
+    def make_etag(self, key: str) -> str:
+        """キャッシュのキーから ETag を作成（TTL の区間が変わると別の ETag になる）"""
+        return make_etag(f"{key}@{int(time.time() // self.ttl)}")
+
+    def load(self, loader):
+        """キャッシュを使わずに loader() で読み込む（get_or_load と同じく (値, ETag) を返す）"""
+        value = loader()
+        return value, make_etag(value)
+
+    def get_or_load(self, namespace: str, route: str, params: dict, loader, min_age: float = 0.0,
+                    if_none_match: str = None):
+        """
+        キャッシュにあればそれを返し、なければ loader() の結果を保存して返す
+
+        Args:
+            namespace: 無効化の単位（"students" など）
+            route: ルートの名前
+            params: パスパラメータ・クエリパラメータ
+            loader: データベースから読み込む関数（JSON に変換できる値を返すこと）
+            min_age: 名前空間を無効化してからこの秒数がたつまでは、読み込んだ結果を保存しない
+            if_none_match: クライアントの If-None-Match ヘッダー。ETag と一致したら読み込まない
+
+        Returns:
+            (値, ETag)。If-None-Match と一致した場合は (None, ETag)
+        """
+        if self.ttl <= 0 or (min_age > 0 and time.time() - self.backend.get_invalidated_at(namespace) < min_age):
+            # 保存しないので、読み込んだデータから ETag を作る
+            with self._lock:
+                self.misses += 1
+            return self.load(loader)
+
+        key = self.make_key(namespace, route, params)
+        etag = self.make_etag(key)
+        if etag_matches(if_none_match, etag):
+            with self._lock:
+                self.hits += 1
+            return None, etag
+
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value, etag
+
+        with self._lock:
+            self.misses += 1
+        value = loader()
+        self.backend.set(key, value, self.ttl)
+        return value, etag
+
+    def invalidate(self, namespace: str):
+        """名前空間のキャッシュをすべて無効化（書き込み後に呼ぶ）"""
+        self.backend.bump_version(namespace)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def create_cache() -> ResponseCache:
+    """環境変数の設定に従ってキャッシュを作成"""
+    if CACHE_BACKEND == "redis":
+        return ResponseCache(RedisBackend(CACHE_URL))
+    return ResponseCache(MemoryBackend(CACHE_MAXSIZE))
+
+
+cache = create_cache()
+
+
+def make_etag(value) -> str:
+    """
+    レスポンスのデータから ETag を作成
+
+    同じデータなら、どのワーカーで作っても同じ ETag になります（キーの順番にもよらない）。
+    """
+    body = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """If-None-Match ヘッダーに etag が含まれているか（弱い比較）"""
+    if not if_none_match:
+        return False
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
@@ -0,0 +1,263 @@
+"""
+データベースへの書き込み処理
+
+「重複チェックの SELECT → INSERT → COMMIT → refresh の SELECT」という書き方では、
+1行あたり4回データベースとやり取りします。
+さらに、チェックと INSERT の間に他のリクエストが同じ ID を登録すると、重複を見逃してしまいます。
+
+- 1件の登録: INSERT ... ON CONFLICT DO NOTHING RETURNING で、
+  重複チェック・登録・登録結果の取得を1つの SQL で行います（重複の判定はデータベースの制約に任せる）
+- 一括登録: 重複チェックをまとめて1回の SELECT で行い、
+  INSERT も複数行を1回の executemany で送ります
+
+ON CONFLICT がないデータベース（MySQL など）では、INSERT の制約違反（IntegrityError）で重複を判定し、
+upsert は「UPDATE して、該当する行がなければ INSERT」で行います。
+"""
+
+import os
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# 一括登録で1回の INSERT にまとめる行数（デフォルト）
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+
+# ON CONFLICT ... RETURNING に対応しているデータベース
+ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def supports_on_conflict(dialect_name: str) -> bool:
+    return dialect_name in ON_CONFLICT_INSERTS
+
+
+def insert_statement(dialect_name: str, model, data: dict, upsert: bool = False):
+    """
+    1件登録する INSERT 文を作成（PostgreSQL と SQLite のみ）
+
+    ON CONFLICT を使い、重複していても例外にせず「0行」を返します。
+    upsert=True の場合は、主キーが重複していたら他のカラムを上書きします（ON CONFLICT DO UPDATE）。
+    RETURNING で登録した行をそのまま受け取るため、登録後の refresh（SELECT）が不要になります。
+    それ以外のデータベースでは、insert_fallback_statements() を使ってください。
+    """
+    table = model.__table__
+    stmt = ON_CONFLICT_INSERTS[dialect_name](table).values(**data)
+    if upsert:
+        primary_keys = [column.key for column in table.primary_key.columns]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=primary_keys,
+            set_={key: stmt.excluded[key] for key in data if key not in primary_keys},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+    return stmt.returning(*table.c)
+
+
+def _primary_key_filter(model, data: dict):
+    return and_(*(column == data[column.key] for column in model.__table__.primary_key.columns))
+
+
+def insert_fallback_statements(model, data: dict):
+    """
+    ON CONFLICT がないデータベース用の SQL
+
+    Returns:
+        (INSERT 文, 主キー以外を上書きする UPDATE 文, 登録した行を取得する SELECT 文)
+    """
+    table = model.__table__
+    primary_keys = {column.key for column in table.primary_key.columns}
+    return (
+        insert(table).values(**data),
+        update(table).where(_primary_key_filter(model, data)).values(
+            **{key: value for key, value in data.items() if key not in primary_keys}
+        ),
+        select(*table.c).where(_primary_key_filter(model, data)),
+    )
+
+
+def create_one(db: Session, model, data: dict, upsert: bool = False, before_commit=None):
+    """
+    1件登録する（INSERT 1回 + COMMIT）
+
+    Args:
+        before_commit: 登録した行を COMMIT する前に before_commit(db, 変更前の行, 変更後の行) で呼ぶ関数
+            （集計テーブルの更新など、同じトランザクションで行いたい処理。新しく登録した場合、変更前の行は None）。
+            upsert と一緒に指定すると、変更前の行を読むために「INSERT（重複なら何もしない）→ ロックして UPDATE」の順に実行します
+
+    Returns:
+        登録（upsert の場合は更新）した行。既に存在して登録できなかった場合は None
+    """
+    dialect_name = db.get_bind().dialect.name
+    if not supports_on_conflict(dialect_name):
+        return _create_one_without_on_conflict(db, model, data, upsert, before_commit)
+    if upsert and before_commit is not None:
+        return _upsert_with_old_row(db, model, data, before_commit)
+
+    try:
+        row = db.execute(insert_statement(dialect_name, model, data, upsert)).one_or_none()
+        if row is not None and before_commit is not None:
+            before_commit(db, None, row)
+        db.commit()
+    except IntegrityError:
+        # upsert 時に他の行とメールアドレスが重複した場合など
+        db.rollback()
+        return None
+    return row
+
+
+def _upsert_with_old_row(db: Session, model, data: dict, before_commit):
+    """
+    変更前の行を読みながら upsert する（create_one で before_commit を指定した場合）
+
+    ON CONFLICT DO UPDATE では変更前の値が分からないため、まず重複なら何もしない INSERT を実行し、
+    登録されなかった（既にある）場合は、その行をロックして読んでから UPDATE します。
+    同じ行への upsert が同時に来ても、ロックで順番に実行されるので、変更前の値を読み違えません。
+    """
+    _, update_stmt, select_stmt = insert_fallback_statements(model, data)
+    try:
+        old = None
+        row = db.execute(insert_statement(db.get_bind().dialect.name, model, data)).one_or_none()
+        if row is None:
+            old = db.execute(select_stmt.with_for_update()).one()
+            row = db.execute(update_stmt.returning(*model.__table__.c)).one()
+        before_commit(db, old, row)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return row
+
+
+def _create_one_without_on_conflict(db: Session, model, data: dict, upsert: bool, before_commit=None):
+    """
+    create_one の ON CONFLICT がないデータベース版
+
+    INSERT して制約違反なら重複と判定します。upsert の場合は、重複していたら UPDATE し直します。
+    RETURNING が使えるとは限らないので、登録した行は SELECT で取得します。
+    """
+    insert_stmt, update_stmt, select_stmt = insert_fallback_statements(model, data)
+    old = None
+    try:
+        db.execute(insert_stmt)
+    except IntegrityError:
+        db.rollback()
+        if not upsert:
+            return None
+        old = db.execute(select_stmt.with_for_update()).one_or_none()
+        if old is None:
+            # 主キー以外（メールアドレスなど）の重複だった
+            db.rollback()
+            return None
+        try:
+            db.execute(update_stmt)
+        except IntegrityError:
+            db.rollback()
+            return None
+    row = db.execute(select_stmt).one()
+    if before_commit is not None:
+        before_commit(db, old, row)
+    db.commit()
+    return row
+
+
+def bulk_create(db: Session, model, rows: list, unique_columns: list, batch_size: int = BULK_BATCH_SIZE,
+                before_commit=None):
+    """
+    複数行をまとめて登録する
+
+    既に存在する行や、リクエスト内で重複している行は登録せずに conflicts として返します。
+
+    Args:
+        db: データベースセッション
+        model: 登録先のモデルクラス（Student, Course など）
+        rows: 登録する行（辞書）のリスト
+        unique_columns: 重複してはいけないカラム（主キーやユニーク制約のカラム）
+        batch_size: 1回の INSERT にまとめる行数
+        before_commit: COMMIT の前に before_commit(db, 登録した行のリスト) で呼ぶ関数
+
+    Returns:
+        (登録した行数, 競合した行のリスト)
+    """
+    created = 0
+    conflicts = []
+    seen = {column.key: set() for column in unique_columns}
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        # 重複チェック: バッチ内のすべての値を IN でまとめて1回の SELECT で調べる
+        existing = {column.key: set() for column in unique_columns}
+        query = select(*unique_columns).where(
+            or_(*(column.in_([row[column.key] for row in batch]) for column in unique_columns))
+        )
+        for found in db.execute(query):
+            for column in unique_columns:
+                existing[column.key].add(getattr(found, column.key))
+
+        to_insert = []
+        for offset, row in enumerate(batch):
+            conflict = None
+            for column in unique_columns:
+                value = row[column.key]
+                if value in existing[column.key]:
+                    conflict = {"field": column.key, "value": value, "reason": "already exists"}
+                    break
+                if value in seen[column.key]:
+                    conflict = {"field": column.key, "value": value, "reason": "duplicate in request"}
+                    break
+            if conflict:
+                conflicts.append({"index": start + offset, **conflict})
+                continue
+            for column in unique_columns:
+                seen[column.key].add(row[column.key])
+            to_insert.append((start + offset, row))
+
+        if not to_insert:
+            continue
+
+        # 複数行を1回の INSERT（executemany）で登録
+        try:
+            db.execute(insert(model), [row for _, row in to_insert])
+            if before_commit is not None:
+                before_commit(db, [row for _, row in to_insert])
+            db.commit()
+            created += len(to_insert)
+        except IntegrityError:
+            # チェックの後に他のリクエストが同じ値を登録した場合は、このバッチを取り消して1行ずつ登録し直す
+            db.rollback()
+            for index, row in to_insert:
+                conflict = _insert_or_find_conflict(db, model, row, unique_columns, before_commit)
+                if conflict is None:
+                    created += 1
+                else:
+                    conflicts.append({"index": index, **conflict})
+
+    return created, conflicts
+
+
+def _insert_or_find_conflict(db: Session, model, row: dict, unique_columns: list, before_commit=None):
+    """
+    1行だけ登録する（競合した場合は、どのカラムが競合したかを返す）
+
+    Returns:
+        登録できた場合は None、できなかった場合は {"field", "value", "reason"}
+    """
+    try:
+        db.execute(insert(model), [row])
+        if before_commit is not None:
+            before_commit(db, [row])
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+    # 同じ値を持つ既存の行を探して、競合したカラムを特定する
+    query = select(*unique_columns).where(or_(*(column == row[column.key] for column in unique_columns)))
+    for found in db.execute(query):
+        for column in unique_columns:
+            if getattr(found, column.key) == row[column.key]:
+                return {"field": column.key, "value": row[column.key], "reason": "conflict during insert"}
+    # 既存の行が見つからない（外部キーなど、unique_columns 以外の制約に違反した）
+    key = unique_columns[0].key
+    return {"field": key, "value": row[key], "reason": "rejected by database"}
@@ -0,0 +1,46 @@
+"""
+非同期版のデータベース接続とセッション管理
+
+database.py の SessionLocal は同期（ブロッキング）なので、
+def で書かれたエンドポイントはスレッドプールのワーカーを1つ占有したまま
+データベースの応答を待ちます。
+ここでは AsyncEngine と AsyncSession を使い、await している間は
+イベントループが他のリクエストを処理できるようにします。
+"""
+
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from database import DATABASE_URL, pool_options
+
+
+def to_async_url(url: str) -> str:
+    """
+    同期用の接続URLを非同期ドライバー用に変換
+
+    - postgresql+psycopg:// は psycopg3 が非同期にも対応しているのでそのまま使えます
+    - sqlite:// は aiosqlite を使うため sqlite+aiosqlite:// に変換します
+    """
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+# 非同期用の接続URL（ASYNC_DATABASE_URL があれば優先）
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+# 非同期エンジンを作成（PostgreSQL の場合は同期版と同じプール設定を使う）
+if ASYNC_DATABASE_URL.startswith("postgresql"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options())
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+# 非同期セッションクラスを作成
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# 非同期セッションを取得する依存関数
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,81 @@
+"""
+include パラメータに応じたリレーションシップの先読み（Eager Loading）
+
+リレーションシップを for 文の中で1件ずつたどると、行の数だけ SELECT が実行されます（N+1問題）。
+ここでは、クライアントが ?include=course,lessons のように指定したリレーションシップだけを、
+行数に関係なく決まった回数の SELECT で読み込みます。
+
+- 多対1（enrollment.course など）: joinedload（最初の SELECT に JOIN して一緒に取得）
+- 1対多（enrollment.lessons など）: selectinload（WHERE ... IN (...) でまとめて1回の SELECT）
+
+SELECT の回数は「1 + 指定した1対多のリレーションシップの数」で一定です。
+"""
+
+from fastapi import HTTPException
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import Enrollment, Lesson, VideoSubmission
+
+# include で指定できる名前 → (読み込み方, リレーションシップ)
+RELATIONSHIPS = {
+    Enrollment: {
+        "student": (joinedload, Enrollment.student),
+        "course": (joinedload, Enrollment.course),
+        "lessons": (selectinload, Enrollment.lessons),
+    },
+    Lesson: {
+        "submissions": (selectinload, Lesson.video_submissions),
+    },
+    VideoSubmission: {
+        "reviews": (selectinload, VideoSubmission.reviews),
+    },
+}
+
+
+def parse_includes(model, include):
+    """
+    include パラメータを木構造の辞書に変換
+
+    例: "course,lessons.submissions" → {"course": {}, "lessons": {"submissions": {}}}
+    """
+    tree = {}
+    if not include:
+        return tree
+    for path in include.split(","):
+        node, current = tree, model
+        for name in path.strip().split("."):
+            if name not in RELATIONSHIPS.get(current, {}):
+                raise HTTPException(status_code=400, detail=f"Unknown include: {path.strip()}")
+            current = RELATIONSHIPS[current][name][1].property.mapper.class_
+            node = node.setdefault(name, {})
+    return tree
+
+
+def loader_options(model, tree):
+    """木構造の include から、query.options() に渡すローダーのリストを作る"""
+    options = []
+    for name, children in tree.items():
+        loader, relationship = RELATIONSHIPS[model][name]
+        option = loader(relationship)
+        child_options = loader_options(relationship.property.mapper.class_, children)
+        if child_options:
+            option = option.options(*child_options)
+        options.append(option)
+    return options
+
+
+def to_dict(obj, tree):
+    """
+    モデルのインスタンスを辞書に変換
+
+    include で指定したリレーションシップだけをたどるため、読み込んでいないリレーションシップで
+    追加の SELECT が発生することはありません。
+    """
+    data = {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+    for name, children in tree.items():
+        value = getattr(obj, RELATIONSHIPS[type(obj)][name][1].key)
+        if isinstance(value, list):
+            data[name] = [to_dict(item, children) for item in value]
+        else:
+            data[name] = None if value is None else to_dict(value, children)
+    return data
@@ -0,0 +1,64 @@
+"""
+テーブル全体のエクスポート（ストリーミング）
+
+.all() で全行を取得して1つの大きな JSON 配列を作ると、テーブルが大きくなるほどメモリを使います。
+ここでは、サーバー側カーソル（stream_results）で少しずつ行を取り出し、
+取り出した分だけ NDJSON（1行1JSON）または CSV に変換してクライアントに送ります。
+テーブルの大きさに関係なく、メモリ使用量は一定です。
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from database import engine
+from models import Student, Course, Enrollment, Lesson, VideoSubmission, Review
+from serialization import row_to_dict
+
+# エクスポートできるテーブル（URL の名前 → モデル）
+EXPORT_MODELS = {
+    "students": Student,
+    "courses": Course,
+    "enrollments": Enrollment,
+    "lessons": Lesson,
+    "video_submissions": VideoSubmission,
+    "reviews": Review,
+}
+
+# 1回にデータベースから取り出す行数
+EXPORT_BATCH_SIZE = 1000
+
+
+def _partitions(model, batch_size: int):
+    """テーブルの行を batch_size 行ずつ取り出す"""
+    table = model.__table__
+    primary_key = list(table.primary_key.columns)
+    query = select(table).order_by(*primary_key)
+    # エクスポートは長時間かかるため、リクエストのセッションではなく専用の接続を使う
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for rows in result.partitions():
+            yield rows
+
+
+def export_ndjson(model, batch_size: int = EXPORT_BATCH_SIZE):
+    """NDJSON 形式で1行ずつ出力するジェネレーター"""
+    for rows in _partitions(model, batch_size):
+        yield "".join(json.dumps(row_to_dict(row), ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows)
+
+
+def export_csv(model, batch_size: int = EXPORT_BATCH_SIZE):
+    """CSV 形式（1行目はヘッダー）で出力するジェネレーター"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in model.__table__.columns])
+    for rows in _partitions(model, batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        # 書き出した分は捨てて、バッファが大きくならないようにする
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,166 @@
+"""
+リクエストごとの SQL の計測
+
+エンドポイントが遅いとき、時間が SQL にかかっているのか、ORM のインスタンス作成や
+Pydantic のシリアライズにかかっているのかを切り分けるための仕組みです。
+
+- エンジンの before_cursor_execute / after_cursor_execute イベントで、SQL を1回実行するごとに時間を計測
+  （開始時刻は SQL ごとの実行コンテキストに持たせます。失敗した SQL は after_cursor_execute が呼ばれないので、
+  handle_error イベントで同じように記録します）
+- ミドルウェアでリクエストごとに集計し、Server-Timing ヘッダーで返す
+    Server-Timing: db;dur=12.3;desc="4 queries", app;dur=5.6, total;dur=17.9
+  （db は SQL の合計時間、app はそれ以外＝ORM・シリアライズなど。ブラウザの開発者ツールでも確認できます）
+- ルートごとの累計を /metrics で返す
+- SLOW_REQUEST_MS（デフォルト: 500）を超えたリクエストは、いちばん遅かった SQL と一緒にログに出力
+
+echo=True のようにすべての SQL を表示するのではなく、件数と時間だけを常に記録します。
+"""
+
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+logger = logging.getLogger("sql_timing")
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+# 実行中のリクエストの集計（リクエストの外で実行された SQL は記録しない）
+_current_stats: ContextVar = ContextVar("sql_request_stats", default=None)
+
+
+class RequestStats:
+    """1リクエスト分の SQL の集計"""
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+class RouteMetrics:
+    """ルートごとの累計（/metrics 用）"""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, total_seconds: float, stats: RequestStats):
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0,
+                "statements": 0,
+                "total_seconds": 0.0,
+                "db_seconds": 0.0,
+                "max_seconds": 0.0,
+                "slow_requests": 0,
+            })
+            entry["requests"] += 1
+            entry["statements"] += stats.statements
+            entry["total_seconds"] += total_seconds
+            entry["db_seconds"] += stats.db_seconds
+            entry["max_seconds"] = max(entry["max_seconds"], total_seconds)
+            if total_seconds * 1000 > SLOW_REQUEST_MS:
+                entry["slow_requests"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    **entry,
+                    "avg_statements": entry["statements"] / entry["requests"],
+                    "avg_ms": entry["total_seconds"] * 1000 / entry["requests"],
+                    "avg_db_ms": entry["db_seconds"] * 1000 / entry["requests"],
+                }
+                for route, entry in sorted(self._routes.items())
+            }
+
+
+route_metrics = RouteMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _record(context, statement: str):
+    start = getattr(context, "_query_start", None)
+    stats = _current_stats.get()
+    if start is not None and stats is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context, statement)
+
+
+def _handle_error(exception_context):
+    """失敗した SQL（重複による IntegrityError など）も、かかった時間を記録する"""
+    _record(exception_context.execution_context, exception_context.statement)
+
+
+def instrument_engine(engine):
+    """エンジンに計測用のイベントを登録（AsyncEngine の場合は engine.sync_engine を渡す）"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _route_name(request) -> str:
+    """/students/101 ではなく /students/{student_id} のように、ルートのパスで集計する"""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return f"{request.method} {route.path}"
+    return f"{request.method} (not found)"
+
+
+def server_timing(total_seconds: float, stats: RequestStats) -> str:
+    """Server-Timing ヘッダーの値を作成"""
+    db_ms = stats.db_seconds * 1000
+    total_ms = total_seconds * 1000
+    return (f'db;dur={db_ms:.1f};desc="{stats.statements} queries", '
+            f"app;dur={max(total_ms - db_ms, 0):.1f}, total;dur={total_ms:.1f}")
+
+
+async def sql_timing_middleware(request, call_next):
+    """
+    リクエストごとに SQL の件数・時間を集計するミドルウェア
+
+    app.middleware("http")(sql_timing_middleware) で登録します。
+    """
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+    total_seconds = time.perf_counter() - start
+
+    # ストリーミングのレスポンスは、本文を送る間の SQL はここに含まれません
+    response.headers["Server-Timing"] = server_timing(total_seconds, stats)
+    route = _route_name(request)
+    route_metrics.record(route, total_seconds, stats)
+    if total_seconds * 1000 > SLOW_REQUEST_MS:
+        logger.warning(
+            "slow request: %s %.1fms (db %.1fms, %d queries)",
+            route, total_seconds * 1000, stats.db_seconds * 1000, stats.statements,
+        )
+        if stats.slowest_statement is not None:
+            logger.warning("  slowest query %.1fms: %s",
+                           stats.slowest_seconds * 1000, " ".join(stats.slowest_statement.split()))
+    return response
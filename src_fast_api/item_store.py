@@ -0,0 +1,92 @@
+"""
+main_simple.py のアイテムの保存先
+
+モジュールのグローバル変数のリスト（items = []）に追加していくだけだと、
+- def のエンドポイントはスレッドプールで同時に実行されるため、追加が重なると番号がずれる
+- 完了・未完了で絞り込むたびに、全件を調べる
+- アプリケーションを再起動すると消える
+という問題があります。
+
+ItemStore は、アイテムを ID → アイテムの辞書で持ち、ロックで追加を1つずつ行います。
+完了・未完了ごとの ID のリストも持っておくので、絞り込みとページングは必要な件数を取り出すだけです。
+path を指定すると、追加したアイテムを1行1JSON（追記のみ）でファイルに書き、起動時に読み込み直します。
+書き込みの途中で止まった最後の行は、読み込むときにファイルから切り詰めます
+（残したまま追記すると、次のアイテムがその行につながって壊れるため）。
+アイテムとして読めない行（{} や []、id のないオブジェクトなど）は、警告を出して読み飛ばします。
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import List, Optional
+
+logger = logging.getLogger("item_store")
+
+
+class ItemStore:
+    """アイテムの保存先（ID は 0 から順番に、それまでの最大の ID + 1 を振る。削除・更新はしない）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._items = {}  # ID → アイテム（辞書）
+        self._ids = []  # 追加した順の ID
+        self._ids_by_done = {True: [], False: []}  # is_done ごとの ID
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            self._load(path)
+            self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self, path: str):
+        """ファイルに追記したアイテムを読み込む（書き込みの途中で止まった最後の行は切り詰める）"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                f.truncate(complete)
+        for number, line in enumerate(data[:complete].decode("utf-8").splitlines(), start=1):
+            try:
+                self._index(json.loads(line))
+            except (ValueError, KeyError, TypeError) as exc:
+                logger.warning("%s の %d 行目はアイテムとして読めないので読み飛ばします: %r", path, number, exc)
+
+    def _index(self, item: dict):
+        # 先にすべての値を取り出して確かめてから追加する（途中で失敗しても中途半端に追加しない）
+        item_id, ids_by_done = item["id"], self._ids_by_done[item["is_done"]]
+        next_id = max(self._next_id, item_id + 1)
+        self._items[item_id] = item
+        self._ids.append(item_id)
+        ids_by_done.append(item_id)
+        self._next_id = next_id
+
+    def add(self, name: str, is_done: bool = False) -> dict:
+        """アイテムを追加して、追加したアイテム（ID 付き）を返す"""
+        with self._lock:
+            item = {"id": self._next_id, "name": name, "is_done": is_done}
+            if self._file is not None:
+                self._file.write(json.dumps(item, ensure_ascii=False) + "\n")
+                self._file.flush()
+            self._index(item)
+        return item
+
+    def get(self, item_id: int) -> Optional[dict]:
+        return self._items.get(item_id)
+
+    def list(self, is_done: Optional[bool] = None, skip: int = 0, limit: int = 100) -> List[dict]:
+        """アイテムを追加した順に返す（is_done を指定すると、完了・未完了で絞り込む）"""
+        ids = self._ids if is_done is None else self._ids_by_done[is_done]
+        # 追加と同時に読んでも、リストの切り出しは途中の状態を返さない
+        return [self._items[item_id] for item_id in ids[skip:skip + limit]]
+
+    def count(self, is_done: Optional[bool] = None) -> int:
+        ids = self._ids if is_done is None else self._ids_by_done[is_done]
+        return len(ids)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,13 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+
+from database import READ_YOUR_WRITES_SECONDS, SessionLocal, engine, get_db, get_pool_status, read_engines
+from database import reads_from_primary, read_your_writes_middleware
+from models import Student, Course, Enrollment, Lesson, Review
+from schemas import StudentCreate, StudentResponse, CourseCreate, CourseResponse, BulkCreateResponse, EnrollmentResponse
+from schemas import CourseEnrollmentReport, EnrollmentProgressReport, CourseRatingReport, NewEnrollmentRevenueReport
+from schemas import EnrollmentCreate, LessonCreate, LessonResponse, ReviewCreate, ReviewResponse
+from schemas import DashboardStatsResponse, CourseStatsResponse, StudentStatsResponse, SearchResult
+from crud import BULK_BATCH_SIZE, bulk_create, create_one
+from bulk_input import bulk_openapi, bulk_rows
+from pagination import MAX_PAGE_SIZE, apply_page, split_page
+from cache import cache, etag_matches
+from serialization import FAST_SERIALIZATION, fast_response, response_columns, row_to_dict
+from export import EXPORT_BATCH_SIZE, EXPORT_MODELS, export_csv, export_ndjson
+from eager_loading import loader_options, parse_includes, to_dict
+import search
+import statements
+import summary
+from reports import course_enrollments_query, course_ratings_query, enrollment_progress_query
+from reports import month_label, new_enrollment_revenue_query
+from instrumentation import instrument_engine, route_metrics, sql_timing_middleware
+
 
-from database import get_db
-from models import Student, Course
-from schemas import StudentCreate, StudentResponse, CourseCreate, CourseResponse
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 全文検索用のインデックス（作成済みなら何もしない）
+    search.setup_search_index(engine)
+    # 集計テーブルがなければ作成し、空なら（generate_data.py でデータを投入した直後など）作り直す
+    if summary.create_tables(engine):
+        db = SessionLocal()
+        try:
+            summary.rebuild_if_empty(db)
+        finally:
+            db.close()
+    yield
 
-app = FastAPI(title="学習管理システムAPI", description="シンプルなFastAPI + SQLAlchemy実装")
+
+app = FastAPI(title="学習管理システムAPI", description="シンプルなFastAPI + SQLAlchemy実装", lifespan=lifespan)
 
 # CORS設定（ブラウザからのアクセスを許可）
 app.add_middleware(
@@ -16,75 +53,482 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],  # ブラウザから次ページのカーソル・ETag・計測結果を読めるようにする
 )
 
+# リクエストごとに SQL の件数・時間を計測し、Server-Timing ヘッダーと /metrics で返す
+for db_engine in (engine, *read_engines):
+    instrument_engine(db_engine)
+    statements.track_statement_cache(db_engine)
+app.middleware("http")(sql_timing_middleware)
+
+# 書き込んだクライアントの直後の GET を、レプリカではなくプライマリに送る（DATABASE_READ_URLS を設定した場合）
+app.middleware("http")(read_your_writes_middleware)
+
+
+def cached(request: Request, namespace: str, route: str, params: dict, load):
+    """
+    レスポンスキャッシュから取得する（なければ load() で読み込んで保存する）
+
+    If-None-Match がキャッシュのキーから作った ETag と一致した場合は、読み込まずに (None, ETag) を返します
+    （続けて not_modified() を呼べば 304 になります）。
+
+    レプリカがある場合は、read-your-writes を壊さないように次のようにします。
+    - 直前に書き込んだクライアント（プライマリから読むリクエスト）は、キャッシュを使わない
+      （他のクライアントがレプリカから読んだ、書き込み前のデータがキャッシュにあるかもしれないため）
+    - 書き込みで無効化してから READ_YOUR_WRITES_SECONDS 秒間は、レプリカから読んだ結果をキャッシュに保存しない
+      （レプリカに書き込みがまだ反映されていないかもしれないため）
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not read_engines:
+        return cache.get_or_load(namespace, route, params, load, if_none_match=if_none_match)
+    if reads_from_primary(request):
+        return cache.load(load)
+    return cache.get_or_load(namespace, route, params, load, min_age=READ_YOUR_WRITES_SECONDS,
+                             if_none_match=if_none_match)
+
+
+def not_modified(request: Request, response: Response, etag: str):
+    """
+    条件付き GET（If-None-Match）の判定
+
+    etag は cached() が返した ETag です。
+    レスポンスに ETag ヘッダーを付け、クライアントの ETag と一致した場合は 304 のレスポンスを返します。
+    一致しない場合は None を返すので、通常どおりデータを返してください。
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
 
 # ========== Students エンドポイント ==========
 
 @app.get("/students", response_model=List[StudentResponse])
-def get_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """全生徒を取得"""
-    students = db.query(Student).offset(skip).limit(limit).all()
-    return students
+def get_students(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    全生徒を取得
+
+    次のページがある場合、X-Next-Cursor ヘッダーにカーソルを返します。
+    それを cursor に渡すと、skip を使わずに次のページを取得できます（キーセットページネーション）。
+    結果はキャッシュされ、POST /students で無効化されます。
+    If-None-Match の ETag が一致する場合は 304 を返します。
+    """
+    params = {"skip": skip, "limit": limit, "cursor": cursor}
+
+    def load():
+        if FAST_SERIALIZATION:
+            # ORM のインスタンスを作らず、必要なカラムだけをタプルで取得する
+            query = apply_page(select(*response_columns(Student, StudentResponse)), Student.student_id, skip, limit, cursor)
+            rows, next_cursor = split_page(db.execute(query).all(), Student.student_id, limit)
+            return {"items": [row_to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+        query = apply_page(db.query(Student), Student.student_id, skip, limit, cursor)
+        students, next_cursor = split_page(query.all(), Student.student_id, limit)
+        return {
+            "items": [StudentResponse.model_validate(s).model_dump(mode="json") for s in students],
+            "next_cursor": next_cursor,
+        }
+
+    page, etag = cached(request, "students", "list", params, load)
+    not_modified_response = not_modified(request, response, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    if FAST_SERIALIZATION:
+        return fast_response(page["items"], response)
+    return page["items"]
 
 
 @app.get("/students/{student_id}", response_model=StudentResponse)
-def get_student(student_id: int, db: Session = Depends(get_db)):
+def get_student(student_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """特定の生徒を取得"""
-    student = db.query(Student).filter(Student.student_id == student_id).first()
-    if student is None:
-        raise HTTPException(status_code=404, detail="Student not found")
+    params = {"student_id": student_id}
+
+    def load():
+        if FAST_SERIALIZATION:
+            row = db.execute(statements.STUDENT_ROW_BY_ID, {"student_id": student_id}).first()
+            if row is None:
+                raise HTTPException(status_code=404, detail="Student not found")
+            return row_to_dict(row)
+
+        student = db.execute(statements.STUDENT_BY_ID, {"student_id": student_id}).scalar_one_or_none()
+        if student is None:
+            raise HTTPException(status_code=404, detail="Student not found")
+        return StudentResponse.model_validate(student).model_dump(mode="json")
+
+    student, etag = cached(request, "students", "detail", params, load)
+    not_modified_response = not_modified(request, response, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+    if FAST_SERIALIZATION:
+        return fast_response(student, response)
     return student
 
 
 @app.post("/students", response_model=StudentResponse)
-def create_student(student: StudentCreate, db: Session = Depends(get_db)):
-    """新しい生徒を作成"""
-    # 既に存在するかチェック
-    existing_student = db.query(Student).filter(Student.student_id == student.student_id).first()
-    if existing_student:
-        raise HTTPException(status_code=400, detail="Student ID already exists")
-    
-    db_student = Student(**student.model_dump())
-    db.add(db_student)
-    db.commit()
-    db.refresh(db_student)
+def create_student(student: StudentCreate, upsert: bool = False, db: Session = Depends(get_db)):
+    """
+    新しい生徒を作成
+
+    重複チェックはデータベースの主キー・ユニーク制約に任せ、INSERT 1回で登録します。
+    upsert=true の場合、同じ ID の生徒がいれば上書きします。
+    """
+    db_student = create_one(db, Student, student.model_dump(), upsert=upsert)
+    if db_student is None:
+        raise HTTPException(status_code=400, detail="Student ID or email already exists")
+    cache.invalidate("students")
     return db_student
 
 
+@app.post("/students/bulk", response_model=BulkCreateResponse, openapi_extra=bulk_openapi(StudentCreate))
+def create_students_bulk(
+    rows: List[dict] = Depends(bulk_rows(StudentCreate)),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1),
+    db: Session = Depends(get_db),
+):
+    """
+    複数の生徒をまとめて作成
+
+    ボディは JSON の配列、または NDJSON（Content-Type: application/x-ndjson、1行に1件）です。
+    既に存在する ID・メールアドレスや、リクエスト内で重複している行は登録せず、conflicts に返します。
+    """
+    created, conflicts = bulk_create(db, Student, rows, [Student.student_id, Student.email], batch_size)
+    if created:
+        cache.invalidate("students")
+    return {"created": created, "conflicts": conflicts}
+
+
 # ========== Courses エンドポイント ==========
 
 @app.get("/courses", response_model=List[CourseResponse])
-def get_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """全コースを取得"""
-    courses = db.query(Course).offset(skip).limit(limit).all()
-    return courses
+def get_courses(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    全コースを取得
+
+    次のページがある場合、X-Next-Cursor ヘッダーにカーソルを返します。
+    結果はキャッシュされ、POST /courses で無効化されます。
+    If-None-Match の ETag が一致する場合は 304 を返します。
+    """
+    params = {"skip": skip, "limit": limit, "cursor": cursor}
+
+    def load():
+        if FAST_SERIALIZATION:
+            query = apply_page(select(*response_columns(Course, CourseResponse)), Course.course_id, skip, limit, cursor)
+            rows, next_cursor = split_page(db.execute(query).all(), Course.course_id, limit)
+            return {"items": [row_to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+        query = apply_page(db.query(Course), Course.course_id, skip, limit, cursor)
+        courses, next_cursor = split_page(query.all(), Course.course_id, limit)
+        return {
+            "items": [CourseResponse.model_validate(c).model_dump(mode="json") for c in courses],
+            "next_cursor": next_cursor,
+        }
+
+    page, etag = cached(request, "courses", "list", params, load)
+    not_modified_response = not_modified(request, response, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    if FAST_SERIALIZATION:
+        return fast_response(page["items"], response)
+    return page["items"]
 
 
 @app.get("/courses/{course_id}", response_model=CourseResponse)
-def get_course(course_id: int, db: Session = Depends(get_db)):
+def get_course(course_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """特定のコースを取得"""
-    course = db.query(Course).filter(Course.course_id == course_id).first()
-    if course is None:
-        raise HTTPException(status_code=404, detail="Course not found")
+    params = {"course_id": course_id}
+
+    def load():
+        if FAST_SERIALIZATION:
+            row = db.execute(statements.COURSE_ROW_BY_ID, {"course_id": course_id}).first()
+            if row is None:
+                raise HTTPException(status_code=404, detail="Course not found")
+            return row_to_dict(row)
+
+        course = db.execute(statements.COURSE_BY_ID, {"course_id": course_id}).scalar_one_or_none()
+        if course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return CourseResponse.model_validate(course).model_dump(mode="json")
+
+    course, etag = cached(request, "courses", "detail", params, load)
+    not_modified_response = not_modified(request, response, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+    if FAST_SERIALIZATION:
+        return fast_response(course, response)
     return course
 
 
 @app.post("/courses", response_model=CourseResponse)
-def create_course(course: CourseCreate, db: Session = Depends(get_db)):
-    """新しいコースを作成"""
-    # 既に存在するかチェック
-    existing_course = db.query(Course).filter(Course.course_id == course.course_id).first()
-    if existing_course:
+def create_course(course: CourseCreate, upsert: bool = False, db: Session = Depends(get_db)):
+    """
+    新しいコースを作成
+
+    upsert=true の場合、同じ ID のコースがあれば上書きします。
+    """
+    db_course = create_one(db, Course, course.model_dump(), upsert=upsert, before_commit=summary.course_created)
+    if db_course is None:
         raise HTTPException(status_code=400, detail="Course ID already exists")
-    
-    db_course = Course(**course.model_dump())
-    db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    cache.invalidate("courses")
     return db_course
 
 
+@app.post("/courses/bulk", response_model=BulkCreateResponse, openapi_extra=bulk_openapi(CourseCreate))
+def create_courses_bulk(
+    rows: List[dict] = Depends(bulk_rows(CourseCreate)),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1),
+    db: Session = Depends(get_db),
+):
+    """
+    複数のコースをまとめて作成
+
+    ボディは JSON の配列、または NDJSON（Content-Type: application/x-ndjson、1行に1件）です。
+    既に存在する ID や、リクエスト内で重複している行は登録せず、conflicts に返します。
+    """
+    created, conflicts = bulk_create(db, Course, rows, [Course.course_id], batch_size,
+                                     before_commit=summary.courses_created)
+    if created:
+        cache.invalidate("courses")
+    return {"created": created, "conflicts": conflicts}
+
+
+# ========== Enrollments エンドポイント ==========
+#
+# include パラメータで、一緒に取得するリレーションシップを指定できます。
+#   student, course, lessons, lessons.submissions, lessons.submissions.reviews
+# 指定したものだけを selectinload / joinedload で先読みするため、
+# 受講登録やレッスンの件数が増えても SELECT の回数は変わりません（N+1問題を回避）。
+
+def query_enrollments(db: Session, include: Optional[str]):
+    """include に応じて先読みの設定をした受講登録のクエリ"""
+    tree = parse_includes(Enrollment, include)
+    query = db.query(Enrollment).options(*loader_options(Enrollment, tree)).order_by(Enrollment.enrollment_id)
+    return query, tree
+
+
+@app.get(
+    "/students/{student_id}/enrollments",
+    response_model=List[EnrollmentResponse],
+    response_model_exclude_unset=True,
+)
+def get_student_enrollments(
+    student_id: int,
+    include: Optional[str] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """生徒の受講登録を取得（例: ?include=course,lessons、?status=active&include=course）"""
+    query, tree = query_enrollments(db, include)
+    if status is not None and tree in ({}, {"course": {}}):
+        # よく使う「アクティブな受講登録とコース」は、組み立て済みの SQL に値だけを渡す
+        params = {"student_id": student_id, "status": status}
+        enrollments = db.execute(statements.STUDENT_ENROLLMENTS_BY_STATUS, params).scalars().all()
+    elif status is not None:
+        enrollments = query.filter(Enrollment.student_id == student_id, Enrollment.status == status).all()
+    else:
+        enrollments = query.filter(Enrollment.student_id == student_id).all()
+    if not enrollments and db.get(Student, student_id) is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return [to_dict(enrollment, tree) for enrollment in enrollments]
+
+
+@app.get(
+    "/courses/{course_id}/enrollments",
+    response_model=List[EnrollmentResponse],
+    response_model_exclude_unset=True,
+)
+def get_course_enrollments(course_id: int, include: Optional[str] = None, db: Session = Depends(get_db)):
+    """コースの受講登録を取得（例: ?include=student）"""
+    query, tree = query_enrollments(db, include)
+    enrollments = query.filter(Enrollment.course_id == course_id).all()
+    if not enrollments and db.get(Course, course_id) is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return [to_dict(enrollment, tree) for enrollment in enrollments]
+
+
+@app.get("/enrollments/{enrollment_id}", response_model=EnrollmentResponse, response_model_exclude_unset=True)
+def get_enrollment(enrollment_id: int, include: Optional[str] = None, db: Session = Depends(get_db)):
+    """特定の受講登録を取得（例: ?include=student,course,lessons.submissions.reviews）"""
+    query, tree = query_enrollments(db, include)
+    enrollment = query.filter(Enrollment.enrollment_id == enrollment_id).first()
+    if enrollment is None:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+    return to_dict(enrollment, tree)
+
+
+def create_with_orm(db: Session, obj, detail: str):
+    """
+    ORM で1件登録する
+
+    ORM のセッションで書き込むと、summary.py の after_flush イベントで集計テーブルも同じトランザクションで更新されます。
+    """
+    db.add(obj)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=detail)
+    return to_dict(obj, {})
+
+
+@app.post("/enrollments", response_model=EnrollmentResponse, response_model_exclude_unset=True)
+def create_enrollment(enrollment: EnrollmentCreate, db: Session = Depends(get_db)):
+    """新しい受講登録を作成（集計テーブルも更新）"""
+    return create_with_orm(db, Enrollment(**enrollment.model_dump()), "Enrollment ID already exists or student/course not found")
+
+
+@app.post("/lessons", response_model=LessonResponse, response_model_exclude_unset=True)
+def create_lesson(lesson: LessonCreate, db: Session = Depends(get_db)):
+    """新しいレッスンを作成（集計テーブルも更新）"""
+    return create_with_orm(db, Lesson(**lesson.model_dump()), "Lesson ID already exists or enrollment not found")
+
+
+@app.post("/reviews", response_model=ReviewResponse, response_model_exclude_unset=True)
+def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
+    """新しいレビューを作成（集計テーブルも更新）"""
+    return create_with_orm(db, Review(**review.model_dump()), "Review ID already exists or submission not found")
+
+
+# ========== 集計（ダッシュボード） ==========
+#
+# summary.py の集計テーブルから読むだけなので、データ量に関係なく一定の時間で返ります。
+# 集計がずれた場合は python summary.py rebuild で作り直してください。
+
+@app.get("/stats/dashboard", response_model=DashboardStatsResponse)
+def stats_dashboard(db: Session = Depends(get_db)):
+    """ステータスごとの受講登録数、コースの平均月額、提出1件あたりのレビュー数など"""
+    return summary.dashboard(db)
+
+
+@app.get("/stats/courses/{course_id}", response_model=CourseStatsResponse)
+def stats_course(course_id: int, db: Session = Depends(get_db)):
+    """コースごとの受講登録数と平均評価"""
+    if db.get(Course, course_id) is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return summary.course_stats(db, course_id)
+
+
+@app.get("/stats/students/{student_id}", response_model=StudentStatsResponse)
+def stats_student(student_id: int, db: Session = Depends(get_db)):
+    """生徒ごとの受講登録数とレッスン数"""
+    if db.get(Student, student_id) is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return summary.student_stats(db, student_id)
+
+
+# ========== レポート ==========
+#
+# 集計はすべて GROUP BY / ウィンドウ関数を使った1つの SELECT で行い、
+# 行を Python に読み込んで数えることはしません。
+
+@app.get("/reports/course-enrollments", response_model=List[CourseEnrollmentReport])
+def report_course_enrollments(db: Session = Depends(get_db)):
+    """コースごとの受講登録数（ステータス別）"""
+    return db.execute(course_enrollments_query()).mappings().all()
+
+
+@app.get("/reports/enrollment-progress", response_model=List[EnrollmentProgressReport])
+def report_enrollment_progress(
+    response: Response,
+    course_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """受講登録ごとのレッスンの完了率（course_id で絞り込み可、X-Next-Cursor でページング）"""
+    query = apply_page(enrollment_progress_query(course_id), Enrollment.enrollment_id, skip, limit, cursor)
+    rows, next_cursor = split_page(db.execute(query).all(), Enrollment.enrollment_id, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [row._mapping for row in rows]
+
+
+@app.get("/reports/course-ratings", response_model=List[CourseRatingReport])
+def report_course_ratings(db: Session = Depends(get_db)):
+    """コースごとのレビューの平均評価と件数"""
+    return db.execute(course_ratings_query()).mappings().all()
+
+
+@app.get("/reports/new-enrollment-revenue", response_model=List[NewEnrollmentRevenueReport])
+def report_new_enrollment_revenue(db: Session = Depends(get_db)):
+    """
+    月ごとの新規受講の初月売上（その月に登録された受講の月額料金の合計）と累計
+
+    2か月目以降の継続課金は含みません（月ごとの継続売上ではありません）。
+    """
+    return [month_label(row) for row in db.execute(new_enrollment_revenue_query()).mappings()]
+
+
+# ========== 全文検索 ==========
+
+@app.get("/search", response_model=List[SearchResult])
+def search_text(
+    q: str = Query(..., min_length=1, max_length=200),
+    target: str = Query("courses", pattern="^(courses|reviews)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    コース（タイトル・説明）またはレビュー（コメント）をキーワードで検索
+
+    q: 空白区切りのキーワード（すべてを含むものを検索）
+    target: courses または reviews
+    結果は関連度（rank）の高い順です。skip / limit でページングします。
+    """
+    terms = search.parse_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Empty search query")
+    query = search.search_query(target, terms, db.get_bind().dialect.name).offset(skip).limit(limit)
+    return db.execute(query).mappings().all()
+
+
+# ========== エクスポート ==========
+
+@app.get("/export/{table}")
+def export_table(
+    table: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1),
+):
+    """
+    テーブル全体をストリーミングでエクスポート
+
+    table: students, courses, enrollments, lessons, video_submissions, reviews
+    format: ndjson（1行1JSON）または csv
+    """
+    model = EXPORT_MODELS.get(table)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(model, batch_size),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{table}.csv"'},
+        )
+    return StreamingResponse(export_ndjson(model, batch_size), media_type="application/x-ndjson")
+
+
 # ========== ヘルスチェック ==========
 
 @app.get("/")
@@ -98,3 +542,38 @@ def health_check():
     """ヘルスチェック"""
     return {"status": "ok"}
 
+
+@app.get("/health/db")
+def health_check_db(db: Session = Depends(get_db)):
+    """データベースに接続できるかのヘルスチェック（SELECT 1）"""
+    try:
+        db.execute(select(1))
+    except OperationalError:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ok", "database": "ok"}
+
+
+# ========== メトリクス ==========
+
+@app.get("/metrics")
+def metrics():
+    """ルートごとのリクエスト数・SQL の件数と時間の累計、コネクションプール、キャッシュ、SQL のコンパイルキャッシュの状態"""
+    return {
+        "routes": route_metrics.snapshot(),
+        "pool": get_pool_status(),
+        "cache": cache.stats(),
+        "statement_cache": statements.cache_stats.snapshot(),
+    }
+
+
+@app.get("/metrics/pool")
+def pool_metrics():
+    """コネクションプールの状態（貸し出し中・待機中・オーバーフロー・待ち時間）"""
+    return get_pool_status()
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    """レスポンスキャッシュのヒット数・ミス数"""
+    return cache.stats()
+
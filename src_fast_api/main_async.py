@@ -0,0 +1,189 @@
+"""
+非同期版の FastAPI アプリケーション
+
+main.py と同じ生徒・コースのエンドポイントを async def で実装しています。
+起動時にどちらのモジュールを使うかで、同期版と非同期版を切り替えられます。
+
+    uvicorn main:app        # 同期版（スレッドプールで実行）
+    uvicorn main_async:app  # 非同期版（イベントループで実行）
+"""
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
+from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from database_async import async_engine, get_async_db
+from models import Student, Course
+from schemas import StudentCreate, StudentResponse, CourseCreate, CourseResponse
+from pagination import MAX_PAGE_SIZE, apply_page, split_page
+from crud import insert_fallback_statements, insert_statement, supports_on_conflict
+from instrumentation import instrument_engine, sql_timing_middleware
+import summary
+
+app = FastAPI(title="学習管理システムAPI（非同期版）", description="FastAPI + SQLAlchemy AsyncSession 実装")
+
+# CORS設定（ブラウザからのアクセスを許可）
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # 本番環境では特定のオリジンのみ許可することを推奨
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
+)
+
+# リクエストごとに SQL の件数・時間を計測し、Server-Timing ヘッダーで返す
+instrument_engine(async_engine.sync_engine)
+app.middleware("http")(sql_timing_middleware)
+
+
+# ========== Students エンドポイント ==========
+
+@app.get("/students", response_model=List[StudentResponse])
+async def get_students(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """全生徒を取得"""
+    query = apply_page(select(Student), Student.student_id, skip, limit, cursor)
+    rows = (await db.scalars(query)).all()
+    students, next_cursor = split_page(rows, Student.student_id, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return students
+
+
+@app.get("/students/{student_id}", response_model=StudentResponse)
+async def get_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    """特定の生徒を取得"""
+    student = await db.get(Student, student_id)
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student
+
+
+async def create_one(db: AsyncSession, model, data: dict, upsert: bool, before_commit=None):
+    """crud.create_one の非同期版（before_commit は同期のセッションで呼ぶ）"""
+    dialect_name = db.get_bind().dialect.name
+    if not supports_on_conflict(dialect_name):
+        return await create_one_without_on_conflict(db, model, data, upsert, before_commit)
+    if upsert and before_commit is not None:
+        return await upsert_with_old_row(db, model, data, before_commit)
+    try:
+        row = (await db.execute(insert_statement(dialect_name, model, data, upsert))).one_or_none()
+        if row is not None and before_commit is not None:
+            await db.run_sync(before_commit, None, row)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    return row
+
+
+async def upsert_with_old_row(db: AsyncSession, model, data: dict, before_commit):
+    """crud._upsert_with_old_row の非同期版（変更前の行をロックして読んでから UPDATE する）"""
+    _, update_stmt, select_stmt = insert_fallback_statements(model, data)
+    try:
+        old = None
+        row = (await db.execute(insert_statement(db.get_bind().dialect.name, model, data))).one_or_none()
+        if row is None:
+            old = (await db.execute(select_stmt.with_for_update())).one()
+            row = (await db.execute(update_stmt.returning(*model.__table__.c))).one()
+        await db.run_sync(before_commit, old, row)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    return row
+
+
+async def create_one_without_on_conflict(db: AsyncSession, model, data: dict, upsert: bool, before_commit=None):
+    """crud._create_one_without_on_conflict の非同期版（INSERT の制約違反で重複を判定する）"""
+    insert_stmt, update_stmt, select_stmt = insert_fallback_statements(model, data)
+    old = None
+    try:
+        await db.execute(insert_stmt)
+    except IntegrityError:
+        await db.rollback()
+        if not upsert:
+            return None
+        old = (await db.execute(select_stmt.with_for_update())).one_or_none()
+        if old is None:
+            await db.rollback()
+            return None
+        try:
+            await db.execute(update_stmt)
+        except IntegrityError:
+            await db.rollback()
+            return None
+    row = (await db.execute(select_stmt)).one()
+    if before_commit is not None:
+        await db.run_sync(before_commit, old, row)
+    await db.commit()
+    return row
+
+
+@app.post("/students", response_model=StudentResponse)
+async def create_student(student: StudentCreate, upsert: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """新しい生徒を作成（upsert=true の場合、同じ ID の生徒がいれば上書き）"""
+    db_student = await create_one(db, Student, student.model_dump(), upsert)
+    if db_student is None:
+        raise HTTPException(status_code=400, detail="Student ID or email already exists")
+    return db_student
+
+
+# ========== Courses エンドポイント ==========
+
+@app.get("/courses", response_model=List[CourseResponse])
+async def get_courses(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """全コースを取得"""
+    query = apply_page(select(Course), Course.course_id, skip, limit, cursor)
+    rows = (await db.scalars(query)).all()
+    courses, next_cursor = split_page(rows, Course.course_id, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return courses
+
+
+@app.get("/courses/{course_id}", response_model=CourseResponse)
+async def get_course(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    """特定のコースを取得"""
+    course = await db.get(Course, course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
+
+
+@app.post("/courses", response_model=CourseResponse)
+async def create_course(course: CourseCreate, upsert: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """新しいコースを作成（upsert=true の場合、同じ ID のコースがあれば上書き）"""
+    db_course = await create_one(db, Course, course.model_dump(), upsert, before_commit=summary.course_created)
+    if db_course is None:
+        raise HTTPException(status_code=400, detail="Course ID already exists")
+    return db_course
+
+
+# ========== ヘルスチェック ==========
+
+@app.get("/")
+async def root():
+    """ルートエンドポイント"""
+    return {"message": "学習管理システムAPIへようこそ！"}
+
+
+@app.get("/health")
+async def health_check():
+    """ヘルスチェック"""
+    return {"status": "ok"}
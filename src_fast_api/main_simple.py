@@ -1,36 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException
+import os
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Response
 from pydantic import BaseModel
 
+from item_store import ItemStore
+
 app = FastAPI(title="シンプルシステムAPI", description="シンプルなFastAPI")
 
 class Item(BaseModel):
     name: str
     is_done: bool = False
 
-items = []
+class ItemResponse(Item):
+    id: int
+
+# ITEMS_FILE を指定すると、アイテムをファイルに保存して再起動後も残す（未指定ならメモリのみ）
+store = ItemStore(os.getenv("ITEMS_FILE"))
 
 @app.get("/")
 def root():
     return {"message": "Hello, World!"}
 
-# curl.exe -X POST -H "Content-Type: application/json" "http://127.0.0.1:8000/items?item=apple"
 # curl.exe -X POST -H "Content-Type: application/json" -d "{`"name`": `"apple`", `"is_done`": false}" "http://127.0.0.1:8000/items"
 
-@app.post("/items")
-# def create_item(item: str):
+@app.post("/items", response_model=ItemResponse)
 def create_item(item: Item):
-    items.append(item)
-    return items
-
-# curl.exe -X GET -H "Content-Type: application/json" "http://127.0.0.1:8000/items"
-@app.get("/items")
-def get_items():
-    return items
+    # 追加したアイテムだけを返す（一覧は GET /items で取得）
+    return store.add(item.name, item.is_done)
+
+# curl.exe -X GET -H "Content-Type: application/json" "http://127.0.0.1:8000/items?is_done=false&skip=0&limit=10"
+@app.get("/items", response_model=List[ItemResponse])
+def get_items(
+    response: Response,
+    is_done: Optional[bool] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    # 絞り込んだ全体の件数は X-Total-Count ヘッダーで返す
+    response.headers["X-Total-Count"] = str(store.count(is_done))
+    return store.list(is_done, skip, limit)
 
 # curl.exe -X GET -H "Content-Type: application/json" "http://127.0.0.1:8000/items/0"
-@app.get("/items/{item_id}")
+@app.get("/items/{item_id}", response_model=ItemResponse)
 def get_item(item_id: int):
-    if item_id < 0 or item_id >= len(items):
+    item = store.get(item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail=f"Item with id {item_id} not found")
-    item = items[item_id]
     return item
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, ForeignKey, Index, exists, func, select
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -10,11 +11,25 @@ class Student(Base):
     student_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
     email = Column(String(200), nullable=False, unique=True)
-    enrollment_date = Column(DateTime, nullable=False)
+    enrollment_date = Column(DateTime, nullable=False, index=True)
 
     # リレーションシップ
     enrollments = relationship("Enrollment", back_populates="student")
 
+    @hybrid_method
+    def has_active_enrollment(self):
+        """
+        アクティブな受講登録があるか
+
+        インスタンスで呼ぶと読み込んだ enrollments を調べ、クラスで呼ぶと SQL の EXISTS になります。
+        例: db.query(Student).filter(Student.has_active_enrollment())
+        """
+        return any(enrollment.status == "active" for enrollment in self.enrollments)
+
+    @has_active_enrollment.expression
+    def has_active_enrollment(cls):
+        return exists().where(Enrollment.student_id == cls.student_id, Enrollment.status == "active")
+
 
 class Course(Base):
     """コーステーブル"""
@@ -35,16 +50,37 @@ class Enrollment(Base):
     __tablename__ = "enrollments"
 
     enrollment_id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("students.student_id"), nullable=False)
-    course_id = Column(Integer, ForeignKey("courses.course_id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.student_id"), nullable=False, index=True)
+    course_id = Column(Integer, ForeignKey("courses.course_id"), nullable=False, index=True)
     enrolled_at = Column(DateTime, nullable=False)
     status = Column(String(20), nullable=False)  # 'active', 'completed', 'cancelled'
 
+    # 複合インデックス: ステータスで絞り込んでコースと JOIN する検索用
+    __table_args__ = (Index("ix_enrollments_status_course_id", "status", "course_id"),)
+
     # リレーションシップ
     student = relationship("Student", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
     lessons = relationship("Lesson", back_populates="enrollment")
 
+    @hybrid_method
+    def get_completed_lessons_count(self):
+        """
+        完了したレッスン数
+
+        インスタンスで呼ぶと読み込んだ lessons を数え、クラスで呼ぶと SQL の相関サブクエリ（COUNT）になります。
+        例: db.query(Enrollment).order_by(Enrollment.get_completed_lessons_count().desc())
+        """
+        return sum(1 for lesson in self.lessons if lesson.status == "completed")
+
+    @get_completed_lessons_count.expression
+    def get_completed_lessons_count(cls):
+        return (
+            select(func.count(Lesson.lesson_id))
+            .where(Lesson.enrollment_id == cls.enrollment_id, Lesson.status == "completed")
+            .scalar_subquery()
+        )
+
 
 class Lesson(Base):
     """授業スケジュールテーブル"""
@@ -57,6 +93,9 @@ class Lesson(Base):
     status = Column(String(20), nullable=False)  # 'scheduled', 'completed', 'cancelled'
     notes = Column(Text)
 
+    # 複合インデックス: 外部キーと、受講登録ごとの完了レッスン数の集計を兼ねる
+    __table_args__ = (Index("ix_lessons_enrollment_id_status", "enrollment_id", "status"),)
+
     # リレーションシップ
     enrollment = relationship("Enrollment", back_populates="lessons")
     video_submissions = relationship("VideoSubmission", back_populates="lesson")
@@ -67,7 +106,7 @@ class VideoSubmission(Base):
     __tablename__ = "video_submissions"
 
     submission_id = Column(Integer, primary_key=True, index=True)
-    lesson_id = Column(Integer, ForeignKey("lessons.lesson_id"), nullable=False)
+    lesson_id = Column(Integer, ForeignKey("lessons.lesson_id"), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     video_url = Column(String(500))
     submitted_at = Column(DateTime, nullable=False)
@@ -83,11 +122,51 @@ class Review(Base):
     __tablename__ = "reviews"
 
     review_id = Column(Integer, primary_key=True, index=True)
-    submission_id = Column(Integer, ForeignKey("video_submissions.submission_id"), nullable=False)
-    rating = Column(Integer)  # 1-5の評価
+    submission_id = Column(Integer, ForeignKey("video_submissions.submission_id"), nullable=False, index=True)
+    rating = Column(Integer, index=True)  # 1-5の評価
     feedback = Column(Text)
     reviewed_at = Column(DateTime, nullable=False)
 
     # リレーションシップ
     submission = relationship("VideoSubmission", back_populates="reviews")
 
+
+
+# ========== 集計テーブル（summary.py で更新） ==========
+#
+# ダッシュボードの数値を毎回集計し直さずに済むよう、集計結果を保存しておくテーブルです。
+# 受講登録・レッスン・レビューの書き込みと同じトランザクションで差分だけ更新します。
+
+class CourseStats(Base):
+    """コースごとの集計"""
+    __tablename__ = "course_stats"
+
+    course_id = Column(Integer, primary_key=True)
+    active_enrollments = Column(Integer, nullable=False, default=0)
+    completed_enrollments = Column(Integer, nullable=False, default=0)
+    cancelled_enrollments = Column(Integer, nullable=False, default=0)
+    total_enrollments = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)  # rating が null でないレビューの数
+    rating_sum = Column(Integer, nullable=False, default=0)
+
+
+class StudentStats(Base):
+    """生徒ごとの集計"""
+    __tablename__ = "student_stats"
+
+    student_id = Column(Integer, primary_key=True)
+    active_enrollments = Column(Integer, nullable=False, default=0)
+    completed_enrollments = Column(Integer, nullable=False, default=0)
+    cancelled_enrollments = Column(Integer, nullable=False, default=0)
+    total_enrollments = Column(Integer, nullable=False, default=0)
+    total_lessons = Column(Integer, nullable=False, default=0)
+    completed_lessons = Column(Integer, nullable=False, default=0)
+
+
+class SummaryTotal(Base):
+    """全体の集計（"courses"、"enrollments.active" などの名前 → 値）"""
+    __tablename__ = "summary_totals"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Numeric(14, 2), nullable=False, default=0)
@@ -0,0 +1,70 @@
+"""
+キーセット（カーソル）ページネーション
+
+OFFSET を使ったページングでは、データベースは skip 件の行を読んでから捨てるため、
+後ろのページほど遅くなります。
+キーセットページネーションでは「前のページの最後の主キー」を覚えておき、
+WHERE 主キー > 最後の主キー で次のページを取得します。
+主キーのインデックスを使って必要な行だけを読むので、どのページでも速度が一定です。
+
+カーソルはクライアントから見て中身を意識しない文字列（不透明なトークン）として返します。
+"""
+
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException
+
+# 1ページの最大件数（エンドポイントの limit の上限）
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    """最後に返した主キーをカーソル文字列に変換"""
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """カーソル文字列を主キーに戻す（不正な値は 400 エラー）"""
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        last_id = payload["after"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def apply_page(query, key_column, skip: int, limit: int, cursor: Optional[str]):
+    """
+    クエリにページングの条件を追加する
+
+    cursor があればキーセット、なければ従来どおり skip（OFFSET）を使います。
+    次のページがあるかを判定するため、limit より1件多く取得します。
+    db.query(...) と select(...) のどちらにも使えます。
+    """
+    query = query.order_by(key_column)
+    if cursor is not None:
+        query = query.filter(key_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def split_page(rows, key_column, limit: int):
+    """
+    apply_page で取得した行を、返す行と次ページのカーソルに分ける
+
+    Returns:
+        (rows, next_cursor) 次のページがない場合 next_cursor は None
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+    return rows, encode_cursor(getattr(rows[-1], key_column.key))
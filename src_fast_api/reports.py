@@ -0,0 +1,121 @@
+"""
+集計レポート
+
+「コースごとの受講者数」のような集計を、ORM のインスタンスを読み込んで Python の for 文で数えると、
+集計に使う行（レッスンなど）をすべてメモリに読み込むことになります。
+ここでは GROUP BY とウィンドウ関数を使い、1つの SQL でデータベースに集計させます。
+返ってくるのは集計結果の行だけです。
+"""
+
+from sqlalchemy import case, extract, func, select
+
+from models import Course, Enrollment, Lesson, Review, VideoSubmission
+
+
+def _count_if(condition):
+    """条件に合う行だけを数える（COUNT(CASE WHEN ... THEN 1 END)）"""
+    return func.count(case((condition, 1)))
+
+
+def course_enrollments_query():
+    """コースごとの受講登録数（アクティブ・完了・キャンセル・合計）"""
+    return (
+        select(
+            Course.course_id,
+            Course.title,
+            _count_if(Enrollment.status == "active").label("active_enrollments"),
+            _count_if(Enrollment.status == "completed").label("completed_enrollments"),
+            _count_if(Enrollment.status == "cancelled").label("cancelled_enrollments"),
+            func.count(Enrollment.enrollment_id).label("total_enrollments"),
+        )
+        .outerjoin(Enrollment, Enrollment.course_id == Course.course_id)
+        .group_by(Course.course_id, Course.title)
+        .order_by(Course.course_id)
+    )
+
+
+def enrollment_progress_query(course_id=None):
+    """
+    受講登録ごとのレッスンの完了率
+
+    total_lessons が 0 の受講登録は completed_ratio が 0 になります。
+    ページングは pagination.apply_page で enrollment_id をキーにして行います。
+    """
+    completed = _count_if(Lesson.status == "completed")
+    total = func.count(Lesson.lesson_id)
+    query = (
+        select(
+            Enrollment.enrollment_id,
+            Enrollment.student_id,
+            Enrollment.course_id,
+            Enrollment.status,
+            completed.label("completed_lessons"),
+            total.label("total_lessons"),
+            case((total == 0, 0.0), else_=completed * 1.0 / total).label("completed_ratio"),
+        )
+        .outerjoin(Lesson, Lesson.enrollment_id == Enrollment.enrollment_id)
+        .group_by(Enrollment.enrollment_id, Enrollment.student_id, Enrollment.course_id, Enrollment.status)
+    )
+    if course_id is not None:
+        query = query.where(Enrollment.course_id == course_id)
+    return query
+
+
+def course_ratings_query():
+    """コースごとのレビューの平均評価と件数（レビューのないコースは平均が null）"""
+    return (
+        select(
+            Course.course_id,
+            Course.title,
+            func.avg(Review.rating).label("average_rating"),
+            func.count(Review.review_id).label("review_count"),
+        )
+        .outerjoin(Enrollment, Enrollment.course_id == Course.course_id)
+        .outerjoin(Lesson, Lesson.enrollment_id == Enrollment.enrollment_id)
+        .outerjoin(VideoSubmission, VideoSubmission.lesson_id == Lesson.lesson_id)
+        .outerjoin(Review, Review.submission_id == VideoSubmission.submission_id)
+        .group_by(Course.course_id, Course.title)
+        .order_by(Course.course_id)
+    )
+
+
+def new_enrollment_revenue_query():
+    """
+    月ごとの新規受講の初月売上
+
+    その月に登録された受講（キャンセルを除く）のコースの月額料金の合計（＝新規受講の1か月目の料金）と、
+    ウィンドウ関数（SUM(...) OVER (ORDER BY 年, 月)）による累計を返します。
+    2か月目以降の継続課金は含みません。受講の終了日を記録していないため、月ごとの継続売上（MRR）は計算できません。
+
+    年と月は EXTRACT で取り出すので、どのデータベースでも同じ SQL になります（'YYYY-MM' への変換は month_label で行います）。
+    """
+    year = extract("year", Enrollment.enrolled_at).label("year")
+    month = extract("month", Enrollment.enrolled_at).label("month")
+    monthly = (
+        select(
+            year,
+            month,
+            func.count(Enrollment.enrollment_id).label("enrollments"),
+            func.sum(Course.monthly_price).label("first_month_revenue"),
+        )
+        .join(Course, Course.course_id == Enrollment.course_id)
+        .where(Enrollment.status != "cancelled")
+        .group_by(year, month)
+        .subquery()
+    )
+    return select(
+        monthly.c.year,
+        monthly.c.month,
+        monthly.c.enrollments,
+        monthly.c.first_month_revenue,
+        func.sum(monthly.c.first_month_revenue)
+        .over(order_by=(monthly.c.year, monthly.c.month))
+        .label("cumulative_first_month_revenue"),
+    ).order_by(monthly.c.year, monthly.c.month)
+
+
+def month_label(row) -> dict:
+    """new_enrollment_revenue_query の行の年・月を 'YYYY-MM' の month にまとめる"""
+    row = dict(row)
+    row["month"] = f"{int(row.pop('year')):04d}-{int(row['month']):02d}"
+    return row
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Union
 from decimal import Decimal
 
 
@@ -40,3 +40,160 @@ class CourseResponse(CourseBase):
     class Config:
         from_attributes = True
 
+
+
+# Review スキーマ
+class ReviewCreate(BaseModel):
+    review_id: int
+    submission_id: int
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    feedback: Optional[str] = None
+    reviewed_at: datetime
+
+
+class ReviewResponse(BaseModel):
+    review_id: int
+    submission_id: int
+    rating: Optional[int] = None
+    feedback: Optional[str] = None
+    reviewed_at: datetime
+
+
+# VideoSubmission スキーマ
+class VideoSubmissionResponse(BaseModel):
+    submission_id: int
+    lesson_id: int
+    title: str
+    video_url: Optional[str] = None
+    submitted_at: datetime
+    status: str
+    reviews: Optional[List[ReviewResponse]] = None  # include=...reviews の場合のみ
+
+
+# Lesson スキーマ
+class LessonCreate(BaseModel):
+    lesson_id: int
+    enrollment_id: int
+    scheduled_at: datetime
+    duration_minutes: int
+    status: str  # 'scheduled', 'completed', 'cancelled'
+    notes: Optional[str] = None
+
+
+class LessonResponse(BaseModel):
+    lesson_id: int
+    enrollment_id: int
+    scheduled_at: datetime
+    duration_minutes: int
+    status: str
+    notes: Optional[str] = None
+    submissions: Optional[List[VideoSubmissionResponse]] = None  # include=lessons.submissions の場合のみ
+
+
+# Enrollment スキーマ
+class EnrollmentCreate(BaseModel):
+    enrollment_id: int
+    student_id: int
+    course_id: int
+    enrolled_at: datetime
+    status: str  # 'active', 'completed', 'cancelled'
+
+
+class EnrollmentResponse(BaseModel):
+    enrollment_id: int
+    student_id: int
+    course_id: int
+    enrolled_at: datetime
+    status: str
+    # include で指定した場合のみ含まれる
+    student: Optional[StudentResponse] = None
+    course: Optional[CourseResponse] = None
+    lessons: Optional[List[LessonResponse]] = None
+
+
+
+# 一括登録スキーマ
+class BulkConflict(BaseModel):
+    index: int  # リクエスト内の位置（0始まり）
+    field: str
+    value: Union[int, str]
+    reason: str
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    conflicts: List[BulkConflict]
+
+
+# 集計レポートスキーマ
+class CourseEnrollmentReport(BaseModel):
+    course_id: int
+    title: str
+    active_enrollments: int
+    completed_enrollments: int
+    cancelled_enrollments: int
+    total_enrollments: int
+
+
+class EnrollmentProgressReport(BaseModel):
+    enrollment_id: int
+    student_id: int
+    course_id: int
+    status: str
+    completed_lessons: int
+    total_lessons: int
+    completed_ratio: float  # 0.0〜1.0
+
+
+class CourseRatingReport(BaseModel):
+    course_id: int
+    title: str
+    average_rating: Optional[float] = None  # レビューがない場合は null
+    review_count: int
+
+
+class NewEnrollmentRevenueReport(BaseModel):
+    month: str  # YYYY-MM
+    enrollments: int  # その月に登録された受講の数（キャンセルを除く）
+    first_month_revenue: Decimal  # それらの受講の1か月目の料金の合計
+    cumulative_first_month_revenue: Decimal
+
+
+# 全文検索のスキーマ（search.py）
+class SearchResult(BaseModel):
+    id: int  # course_id または review_id
+    title: Optional[str] = None  # コース名、またはレビューしたビデオのタイトル
+    text: Optional[str] = None  # コースの説明、またはレビューのコメント
+    rank: float  # 関連度（大きいほど関連が高い）
+
+
+# 集計テーブルのスキーマ（summary.py）
+class DashboardStatsResponse(BaseModel):
+    enrollments_by_status: Dict[str, int]
+    courses: int
+    average_course_price: Optional[float] = None
+    video_submissions: int
+    reviews: int
+    reviews_per_submission: Optional[float] = None
+
+
+class CourseStatsResponse(BaseModel):
+    course_id: int
+    active_enrollments: int
+    completed_enrollments: int
+    cancelled_enrollments: int
+    total_enrollments: int
+    review_count: int
+    rating_count: int
+    rating_sum: int
+    average_rating: Optional[float] = None
+
+
+class StudentStatsResponse(BaseModel):
+    student_id: int
+    active_enrollments: int
+    completed_enrollments: int
+    cancelled_enrollments: int
+    total_enrollments: int
+    total_lessons: int
+    completed_lessons: int
@@ -0,0 +1,246 @@
+"""
+コースの説明・レビューのコメントの全文検索
+
+キーワードでコースやレビューを探すときに、description / feedback を全件読み込んで Python で絞り込むと、
+データが増えるほど遅くなります。ここでは、データベースの全文検索用のインデックスを使います。
+
+- PostgreSQL: pg_trgm 拡張のトライグラム（3文字ずつ）の GIN インデックス。
+  ILIKE '%キーワード%' がインデックスで検索でき、word_similarity() で並べ替えます。
+  tsvector は単語の区切りを空白で判断するため、空白で区切られない日本語の文章を検索できません。
+  トライグラムなら文字単位なので、日本語も英語も同じように検索できます
+  （データベースの LC_CTYPE が C だと日本語の文字がトライグラムに含まれないため、ja_JP.UTF-8 などにしてください）。
+- SQLite: FTS5 の仮想テーブル（tokenize='trigram'）。
+  元のテーブルのトリガーで INSERT / UPDATE / DELETE と同時に更新され、bm25() で並べ替えます。
+
+どちらも3文字未満のキーワード（「練習」など2文字の日本語の単語）はトライグラムを作れないため、
+インデックスを使わない LIKE で検索します（テーブルを全件読むので、行数に比例して遅くなります）。
+SQLite では、そのキーワードが文章に占める割合（出現回数 × 文字数 ÷ 文章の文字数）で並べ替えます。
+インデックスは setup_search_index() で作成します（アプリケーションの起動時に実行されます）。
+PostgreSQL では CREATE INDEX CONCURRENTLY で作成するので、作成中もテーブルへの書き込みを止めません。
+
+    python search.py setup
+"""
+
+import logging
+
+from sqlalchemy import bindparam, column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import Course, Review, VideoSubmission
+
+logger = logging.getLogger("search")
+
+# 検索できる対象（URL の名前 → 設定）
+#   model: 検索するテーブル / columns: 検索するカラム / fts: SQLite の FTS5 テーブル名
+SEARCH_TARGETS = {
+    "courses": {
+        "model": Course,
+        "columns": (Course.title, Course.description),
+        "fts": "courses_fts",
+    },
+    "reviews": {
+        "model": Review,
+        "columns": (Review.feedback,),
+        "fts": "reviews_fts",
+    },
+}
+
+# トライグラムのインデックスで検索できるキーワードの最短の文字数
+MIN_INDEXED_LENGTH = 3
+
+# setup_search_index() で FTS5 テーブルを用意できた対象（SQLite のみ）
+_fts_ready = set()
+
+
+def parse_terms(q: str) -> list:
+    """検索文字列を空白（全角の空白を含む）で区切ってキーワードにする（すべてを含む行を検索）"""
+    return q.split()
+
+
+def _like_pattern(term: str) -> str:
+    """キーワードを含む LIKE のパターン（% と _ はエスケープする）"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _contains_any(columns, term: str, dialect_name: str):
+    """いずれかのカラムがキーワードを含む（大文字・小文字は区別しない）"""
+    pattern = _like_pattern(term)
+    if dialect_name == "postgresql":
+        # ILIKE はトライグラムの GIN インデックスで検索できる
+        return or_(*(col.ilike(pattern, escape="\\") for col in columns))
+    # SQLite の LIKE は ASCII の大文字・小文字を区別しない
+    return or_(*(col.like(pattern, escape="\\") for col in columns))
+
+
+def _occurrence_rank(columns, term: str):
+    """
+    キーワードが文章に占める割合（出現回数 × 文字数 ÷ 文章の文字数。トライグラムを使えない短いキーワード用）
+
+    LIKE は英字の大文字・小文字を区別しないので、REPLACE も両方を lower() でそろえてから数えます。
+    """
+    ranks = []
+    for col in columns:
+        value = func.coalesce(col, "")
+        matched = func.length(value) - func.length(func.replace(func.lower(value), func.lower(term), ""))
+        ranks.append(func.coalesce(matched * 1.0 / func.nullif(func.length(value), 0), 0.0))
+    return sum(ranks[1:], ranks[0])
+
+
+def _fts_match(terms):
+    """FTS5 の MATCH 式（各キーワードをフレーズとして AND で結ぶ）"""
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search_query(target: str, terms, dialect_name: str):
+    """
+    キーワードをすべて含む行を、関連度（rank）の高い順に返す select
+
+    カラム: id, title, text, rank
+    """
+    config = SEARCH_TARGETS[target]
+    model = config["model"]
+    columns = config["columns"]
+    primary_key = model.__table__.primary_key.columns[0]
+
+    if target == "courses":
+        query = select(primary_key.label("id"), Course.title.label("title"), Course.description.label("text"))
+    else:
+        query = (
+            select(primary_key.label("id"), VideoSubmission.title.label("title"), Review.feedback.label("text"))
+            .join(VideoSubmission, VideoSubmission.submission_id == Review.submission_id)
+        )
+
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_LENGTH]
+    rank = literal(0.0)
+
+    if dialect_name == "sqlite" and target in _fts_ready and indexed:
+        fts_name = config["fts"]
+        fts = table(fts_name, column("rowid"))
+        fts_column = literal_column(fts_name)
+        query = query.join(fts, fts.c.rowid == primary_key).where(fts_column.op("MATCH")(_fts_match(indexed)))
+        # bm25() は関連度が高いほど小さい（負の）値になる
+        rank = -func.bm25(fts_column)
+        terms = [term for term in terms if len(term) < MIN_INDEXED_LENGTH]
+    elif dialect_name == "postgresql":
+        rank = func.greatest(*(func.word_similarity(" ".join(terms), func.coalesce(col, "")) for col in columns))
+
+    for term in terms:
+        query = query.where(_contains_any(columns, term, dialect_name))
+        if dialect_name != "postgresql":
+            rank = rank + _occurrence_rank(columns, term)
+
+    rank = rank.label("rank")
+    return query.add_columns(rank).order_by(rank.desc(), primary_key)
+
+
+# ========== インデックスの作成 ==========
+
+def _setup_postgres(engine):
+    """
+    トライグラムの GIN インデックスを作成する
+
+    普通の CREATE INDEX は作成が終わるまでテーブルへの書き込みを止めるため、CONCURRENTLY で作成します。
+    CONCURRENTLY はトランザクションの中で実行できないので、AUTOCOMMIT の接続を使います。
+    作成が途中で失敗すると無効（indisvalid = false）なインデックスが残るので、削除してから作り直します。
+    インデックスを作成できなくても、アプリケーションはインデックスなしで検索できるので、警告だけ出して続けます。
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as exc:
+        logger.warning("pg_trgm 拡張を作成できません（インデックスなしで検索します）: %s", exc)
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for config in SEARCH_TARGETS.values():
+            table_name = config["model"].__tablename__
+            for col in config["columns"]:
+                index_name = f"ix_{table_name}_{col.key}_trgm"
+                try:
+                    valid = conn.execute(
+                        text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                             "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"),
+                        {"name": index_name},
+                    ).scalar()
+                    if valid:
+                        continue
+                    if valid is not None:
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                    conn.execute(text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                        f"ON {table_name} USING gin ({col.key} gin_trgm_ops)"
+                    ))
+                except SQLAlchemyError as exc:
+                    # 他のワーカーが同時に作成している場合など
+                    logger.warning("%s を作成できません（インデックスなしで検索します）: %s", index_name, exc)
+
+
+def _sqlite_fts_statements(config):
+    """FTS5 テーブルと、元のテーブルと同期させるトリガーの CREATE 文"""
+    fts_name = config["fts"]
+    table_name = config["model"].__tablename__
+    primary_key = config["model"].__table__.primary_key.columns[0].key
+    names = ", ".join(col.key for col in config["columns"])
+    new_values = ", ".join(f"new.{col.key}" for col in config["columns"])
+    old_values = ", ".join(f"old.{col.key}" for col in config["columns"])
+    insert_new = f"INSERT INTO {fts_name}(rowid, {names}) VALUES (new.{primary_key}, {new_values});"
+    delete_old = (
+        f"INSERT INTO {fts_name}({fts_name}, rowid, {names}) VALUES ('delete', old.{primary_key}, {old_values});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5("
+        f"{names}, content='{table_name}', content_rowid='{primary_key}', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_ai AFTER INSERT ON {table_name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_ad AFTER DELETE ON {table_name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_au AFTER UPDATE ON {table_name} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _setup_sqlite(engine, rebuild: bool):
+    for target, config in SEARCH_TARGETS.items():
+        fts_name = config["fts"]
+        triggers = [f"{fts_name}_ai", f"{fts_name}_ad", f"{fts_name}_au"]
+        try:
+            with engine.begin() as conn:
+                existing = set(conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE name IN :names").bindparams(
+                        bindparam("names", expanding=True)
+                    ),
+                    {"names": [fts_name, *triggers]},
+                ).scalars())
+                for statement in _sqlite_fts_statements(config):
+                    conn.execute(text(statement))
+                # テーブルを作り直した（トリガーが消えた）場合は、FTS5 テーブルの中身が古いので作り直す
+                if rebuild or len(existing) < 1 + len(triggers):
+                    conn.execute(text(f"INSERT INTO {fts_name}({fts_name}) VALUES ('rebuild')"))
+        except SQLAlchemyError as exc:
+            # SQLite が古い（3.34 未満は trigram がない）、FTS5 が無効など
+            logger.warning("%s を作成できません（LIKE で検索します）: %s", fts_name, exc)
+            continue
+        _fts_ready.add(target)
+
+
+def setup_search_index(engine, rebuild: bool = False):
+    """
+    全文検索用のインデックスを作成（作成済みなら何もしない）
+
+    rebuild=True の場合、SQLite の FTS5 テーブルを元のテーブルから作り直します。
+    """
+    dialect_name = engine.dialect.name
+    if dialect_name == "postgresql":
+        _setup_postgres(engine)
+    elif dialect_name == "sqlite":
+        _setup_sqlite(engine, rebuild)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from database import engine
+
+    if sys.argv[1:] not in (["setup"], ["rebuild"]):
+        print("使い方: python search.py setup | rebuild")
+        sys.exit(1)
+    setup_search_index(engine, rebuild=sys.argv[1] == "rebuild")
+    print("全文検索用のインデックスを作成しました")
@@ -0,0 +1,75 @@
+"""
+高速なレスポンス生成（オプトイン）
+
+通常のエンドポイントでは、次の3段階でレスポンスを作ります。
+
+1. ORM でモデルのインスタンスを作る（アイデンティティマップへの登録などの処理が入る）
+2. FastAPI が response_model（StudentResponse など）で検証し直す
+3. 標準ライブラリの json でエンコードする
+
+一覧のように行数が多いと、この処理が CPU 時間の大半を占めます。
+高速モードでは、Core の select で必要なカラムだけをタプルとして取得し、
+そのまま辞書に変換して orjson でエンコードします。出力される JSON は通常モードと同じです。
+
+環境変数 FAST_SERIALIZATION=true で有効になります。
+orjson がインストールされていない場合は、標準ライブラリの json を使います。
+"""
+
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+
+def response_columns(model, schema):
+    """
+    レスポンススキーマと同じ順番のカラムのリスト
+
+    select(*response_columns(Student, StudentResponse)) のように使うと、
+    StudentResponse と同じキー・同じ順番の行が取得できます。
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def _to_json_value(value):
+    # Pydantic と同じ形式に変換する（datetime は ISO 8601、Decimal は文字列）
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def row_to_dict(row) -> dict:
+    """Core の結果の行を、JSON に変換できる辞書にする"""
+    return {key: _to_json_value(value) for key, value in row._mapping.items()}
+
+
+class FastJSONResponse(Response):
+    """orjson でエンコードする JSONResponse（FastAPI の ORJSONResponse と同等）"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        # FastAPI の JSONResponse と同じ設定で出力する
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_response(content, response: Response) -> FastJSONResponse:
+    """
+    response_model の検証を通さずに返すレスポンスを作成
+
+    Response を直接返すと、依存関数の response に設定したヘッダーは使われないため、ここで引き継ぎます。
+    """
+    return FastJSONResponse(content, headers=response.headers)
@@ -0,0 +1,92 @@
+"""
+よく使う検索の SQL を一度だけ組み立てて使い回す
+
+SQLAlchemy は、一度 SQL の文字列にコンパイルした select(...) をエンジンのキャッシュに保存しています。
+ただし、キャッシュを探すためのキーは select(...) の構造をたどって作るため、
+リクエストのたびに select(...).where(Student.student_id == student_id) を組み立て直すと、
+組み立てとキーの作成の Python の処理が毎回かかります。
+
+ここでは、値の部分を bindparam("student_id") にした select(...) をモジュールの読み込み時に一度だけ作り、
+db.execute(STUDENT_BY_ID, {"student_id": student_id}) のように値だけを渡して実行します。
+キャッシュのキーは同じ select(...) のオブジェクトに保存されるので、2回目以降は組み立てもキーの作成も行われず、
+コンパイル済みの SQL がそのまま使われます。
+
+lambda_stmt(lambda: select(...)) でも同じことができますが、Session で実行すると
+ORM の処理のために毎回 SQL の構造をコピーし直すため、かえって遅くなります
+（benchmarks/bench_statements.py で比較できます）。
+
+キャッシュのヒット率は cache_stats で確認できます（GET /metrics の statement_cache）。
+"""
+
+import threading
+
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import contains_eager
+
+from models import Course, Enrollment, Student
+from schemas import CourseResponse, StudentResponse
+from serialization import response_columns
+
+# レスポンススキーマと同じ順番のカラム（高速シリアライズモード用）
+STUDENT_COLUMNS = tuple(response_columns(Student, StudentResponse))
+COURSE_COLUMNS = tuple(response_columns(Course, CourseResponse))
+
+# 主キーで生徒・コースを1件取得（ORM のインスタンス）
+STUDENT_BY_ID = select(Student).where(Student.student_id == bindparam("student_id"))
+COURSE_BY_ID = select(Course).where(Course.course_id == bindparam("course_id"))
+
+# 主キーで生徒・コースを1件取得（レスポンススキーマと同じ順番のカラムのタプル）
+STUDENT_ROW_BY_ID = select(*STUDENT_COLUMNS).where(Student.student_id == bindparam("student_id"))
+COURSE_ROW_BY_ID = select(*COURSE_COLUMNS).where(Course.course_id == bindparam("course_id"))
+
+# 生徒の、指定したステータス（"active" など）の受講登録を、コースと JOIN して取得
+# （src_orm/core_example.py の active_enrollments_query と同じ JOIN。course は JOIN した行から読み込む）
+STUDENT_ENROLLMENTS_BY_STATUS = (
+    select(Enrollment)
+    .join(Enrollment.course)
+    .options(contains_eager(Enrollment.course))
+    .where(Enrollment.student_id == bindparam("student_id"), Enrollment.status == bindparam("status"))
+    .order_by(Enrollment.enrollment_id)
+)
+
+
+class StatementCacheStats:
+    """
+    コンパイル済み SQL のキャッシュのヒット数・ミス数
+
+    SQL を実行するたびに、エンジンのキャッシュが使われたかどうか（context.cache_hit）を数えます。
+    """
+
+    def __init__(self):
+        self.counts = {stat: 0 for stat in CacheStats}
+        self._lock = threading.Lock()
+
+    def record(self, stat: CacheStats):
+        with self._lock:
+            self.counts[stat] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits = self.counts[CacheStats.CACHE_HIT]
+            misses = self.counts[CacheStats.CACHE_MISS]
+            return {
+                "hits": hits,
+                "misses": misses,
+                # 文字列の SQL など、キャッシュの対象外だった実行
+                "uncached": sum(self.counts.values()) - hits - misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+
+
+cache_stats = StatementCacheStats()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and context.compiled is not None:
+        cache_stats.record(context.cache_hit)
+
+
+def track_statement_cache(engine):
+    """エンジンに、コンパイル済み SQL のキャッシュのヒット数を数えるイベントを登録"""
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,430 @@
+"""
+ダッシュボード用の集計テーブル（差分更新）
+
+「ステータスごとの受講登録数」「コースの平均月額」「提出1件あたりのレビュー数」のような数値を、
+リクエストのたびに GROUP BY で集計し直すと、データが増えるほど遅くなります。
+ここでは集計結果を course_stats / student_stats / summary_totals テーブルに保存しておき、
+読み込みは主キーでの1行の取得（O(1)）で済ませます。
+
+- 受講登録・レッスン・ビデオ提出・レビューを ORM で書き込むと、セッションの after_flush イベントで
+  変更内容から差分を計算し、同じトランザクションの中で集計テーブルを更新します
+  （UPDATE ... SET 件数 = 件数 + 差分 なので、同時に書き込まれても数え漏れません）
+- コースは Core の INSERT で登録されるため after_flush では拾えません。コースの件数と月額の合計は、
+  登録した行（upsert なら変更前と変更後の行）を apply_course_changes() に渡して、同じように差分で更新します
+- データベースを直接書き換えた場合など、集計がずれたときは rebuild() で作り直せます
+- 集計テーブルが空のまま（generate_data.py でデータを投入した直後など）アプリケーションを起動すると、
+  rebuild_if_empty() が起動時に作り直します
+- 集計テーブルがない（集計テーブルを追加する前の 01_ddl.sql で作った）データベースでは、
+  create_tables() が起動時に集計テーブルだけを作成します（既存のテーブルとデータはそのまま）
+
+    python summary.py create   # 集計テーブルがなければ作成する
+    python summary.py rebuild
+"""
+
+import logging
+from collections import defaultdict
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from crud import ON_CONFLICT_INSERTS
+from database import Base, SessionLocal
+from models import Course, CourseStats, Enrollment, Lesson, Review, Student, StudentStats, SummaryTotal, VideoSubmission
+
+logger = logging.getLogger("summary")
+
+ENROLLMENT_STATUSES = ("active", "completed", "cancelled")
+SUMMARY_MODELS = (CourseStats, StudentStats, SummaryTotal)
+
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+
+# ========== 差分の計算 ==========
+
+class Deltas:
+    """集計テーブルに足し込む差分（テーブル → 主キー → カラム → 差分）"""
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+    def add(self, model, key, column: str, delta):
+        if delta:
+            self.rows[model][key][column] += delta
+
+    def total(self, name: str, delta):
+        self.add(SummaryTotal, name, "value", delta)
+
+
+def _values(obj, keys, old: bool):
+    """
+    オブジェクトの属性の値（old=True なら変更前の値）
+
+    変更された属性は history.deleted に変更前の値が入っています。
+    """
+    state = inspect(obj)
+    values = {}
+    for key in keys:
+        history = state.attrs[key].history
+        values[key] = history.deleted[0] if old and history.deleted else getattr(obj, key)
+    return values
+
+
+def _column_of(conn, deleted, model, key, column: str):
+    """
+    主キーが key の行の column の値
+
+    同じ flush で削除された行は、データベースにはもうないので、セッションの削除したオブジェクトから読みます。
+    """
+    if key is None:
+        return None
+    obj = deleted.get((model, key))
+    if obj is not None:
+        return _values(obj, (column,), old=True)[column]
+    primary_key = next(iter(model.__table__.primary_key.columns))
+    return conn.execute(select(model.__table__.c[column]).where(primary_key == key)).scalar()
+
+
+def _enrollment(conn, deleted, deltas, values, sign):
+    status_column = f"{values['status']}_enrollments" if values["status"] in ENROLLMENT_STATUSES else None
+    for model, key in ((CourseStats, values["course_id"]), (StudentStats, values["student_id"])):
+        deltas.add(model, key, "total_enrollments", sign)
+        if status_column:
+            deltas.add(model, key, status_column, sign)
+    deltas.total(f"enrollments.{values['status']}", sign)
+
+
+def _lesson(conn, deleted, deltas, values, sign):
+    student_id = _column_of(conn, deleted, Enrollment, values["enrollment_id"], "student_id")
+    if student_id is None:
+        return
+    deltas.add(StudentStats, student_id, "total_lessons", sign)
+    if values["status"] == "completed":
+        deltas.add(StudentStats, student_id, "completed_lessons", sign)
+
+
+def _video_submission(conn, deleted, deltas, values, sign):
+    deltas.total("video_submissions", sign)
+
+
+def _review(conn, deleted, deltas, values, sign):
+    course_id = conn.execute(
+        select(Enrollment.course_id)
+        .join(Lesson, Lesson.enrollment_id == Enrollment.enrollment_id)
+        .join(VideoSubmission, VideoSubmission.lesson_id == Lesson.lesson_id)
+        .where(VideoSubmission.submission_id == values["submission_id"])
+    ).scalar()
+    if course_id is None and deleted:
+        # 提出（やレッスン・受講登録）も同じ flush で削除された場合は、1つずつたどる
+        lesson_id = _column_of(conn, deleted, VideoSubmission, values["submission_id"], "lesson_id")
+        enrollment_id = _column_of(conn, deleted, Lesson, lesson_id, "enrollment_id")
+        course_id = _column_of(conn, deleted, Enrollment, enrollment_id, "course_id")
+    deltas.total("reviews", sign)
+    if course_id is None:
+        return
+    deltas.add(CourseStats, course_id, "review_count", sign)
+    if values["rating"] is not None:
+        deltas.add(CourseStats, course_id, "rating_count", sign)
+        deltas.add(CourseStats, course_id, "rating_sum", sign * values["rating"])
+
+
+# モデル → (集計に使う属性, 差分を計算する関数)
+TRACKED_MODELS = {
+    Enrollment: (("student_id", "course_id", "status"), _enrollment),
+    Lesson: (("enrollment_id", "status"), _lesson),
+    VideoSubmission: (("lesson_id",), _video_submission),
+    Review: (("submission_id", "rating"), _review),
+}
+
+
+def _add_to_row(conn, table, primary_key, key, columns: dict):
+    """
+    1行に差分を足し込む（ON CONFLICT がないデータベース用）
+
+    UPDATE ... SET 件数 = 件数 + 差分 で足し、行がなければ INSERT します。
+    同時に同じ行を INSERT された場合は、INSERT を取り消して UPDATE し直します。
+    """
+    stmt = update(table).where(primary_key == key).values({column: table.c[column] + delta
+                                                          for column, delta in columns.items()})
+    if conn.execute(stmt).rowcount:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(table.insert().values({primary_key.key: key, **columns}))
+    except IntegrityError:
+        conn.execute(stmt)
+
+
+def apply_deltas(conn, deltas: Deltas):
+    """
+    差分を集計テーブルに足し込む
+
+    行がなければ差分の値で INSERT し、あれば UPDATE で足します（INSERT ... ON CONFLICT DO UPDATE）。
+    デッドロックを避けるため、常に同じ順番（テーブル・主キーの順）で更新します。
+    """
+    dialect_insert = ON_CONFLICT_INSERTS.get(conn.dialect.name)
+    for model in sorted(deltas.rows, key=lambda m: m.__tablename__):
+        table = model.__table__
+        primary_key = next(iter(table.primary_key.columns))
+        for key, columns in sorted(deltas.rows[model].items()):
+            columns = {column: delta for column, delta in columns.items() if delta}
+            if not columns:
+                continue
+            if dialect_insert is None:
+                _add_to_row(conn, table, primary_key, key, columns)
+                continue
+            stmt = dialect_insert(table).values({primary_key.key: key, **columns})
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[primary_key.key],
+                set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+            )
+            conn.execute(stmt)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session, flush_context):
+    """flush した変更から差分を計算して、同じトランザクションで集計テーブルを更新する"""
+    changes = []
+    for obj in session.new:
+        if type(obj) in TRACKED_MODELS:
+            changes.append((obj, False, 1))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_MODELS:
+            changes.append((obj, True, -1))
+    for obj in session.dirty:
+        if type(obj) in TRACKED_MODELS and session.is_modified(obj):
+            # 更新は「変更前の値を引いて、変更後の値を足す」
+            changes.append((obj, True, -1))
+            changes.append((obj, False, 1))
+    if not changes:
+        return
+
+    conn = session.connection()
+    # 同じ flush で削除したオブジェクト（(モデル, 主キー) → オブジェクト）
+    deleted = {(type(obj), inspect(obj).identity[0]): obj for obj in session.deleted}
+    deltas = Deltas()
+    for obj, old, sign in changes:
+        keys, collect = TRACKED_MODELS[type(obj)]
+        collect(conn, deleted, deltas, _values(obj, keys, old), sign)
+    apply_deltas(conn, deltas)
+
+
+# ========== コースの集計・作り直し ==========
+
+def apply_course_changes(db, changes):
+    """
+    登録・更新したコースの分だけ、コースの件数と月額の合計を差分で更新する
+
+    crud.create_one / bulk_create の before_commit から、COMMIT の前に（同じトランザクションで）呼びます。
+
+    Args:
+        changes: (変更前の行, 変更後の行) のリスト。新しく登録したコースは変更前の行が None
+    """
+    deltas = Deltas()
+    for old, new in changes:
+        if old is None:
+            deltas.total("courses", 1)
+            deltas.total("course_price_sum", new["monthly_price"])
+        else:
+            deltas.total("course_price_sum", new["monthly_price"] - old["monthly_price"])
+    apply_deltas(db.connection(), deltas)
+
+
+def course_created(db, old, new):
+    """create_one の before_commit 用"""
+    apply_course_changes(db, [(old and old._mapping, new._mapping)])
+
+
+def courses_created(db, rows):
+    """bulk_create の before_commit 用"""
+    apply_course_changes(db, [(None, row) for row in rows])
+
+
+def rebuild(db):
+    """集計テーブルを元のテーブルから作り直す"""
+    conn = db.connection()
+    for model in SUMMARY_MODELS:
+        conn.execute(model.__table__.delete())
+
+    status_columns = [f"{status}_enrollments" for status in ENROLLMENT_STATUSES] + ["total_enrollments"]
+    status_counts = [
+        *[_count_if(Enrollment.status == status).label(f"{status}_enrollments") for status in ENROLLMENT_STATUSES],
+        func.count(Enrollment.enrollment_id).label("total_enrollments"),
+    ]
+
+    # コースごと: 受講登録数とレビュー
+    enrollments = (
+        select(Enrollment.course_id, *status_counts)
+        .group_by(Enrollment.course_id)
+        .subquery()
+    )
+    reviews = (
+        select(
+            Enrollment.course_id,
+            func.count(Review.review_id).label("review_count"),
+            func.count(Review.rating).label("rating_count"),
+            func.coalesce(func.sum(Review.rating), 0).label("rating_sum"),
+        )
+        .join(VideoSubmission, VideoSubmission.submission_id == Review.submission_id)
+        .join(Lesson, Lesson.lesson_id == VideoSubmission.lesson_id)
+        .join(Enrollment, Enrollment.enrollment_id == Lesson.enrollment_id)
+        .group_by(Enrollment.course_id)
+        .subquery()
+    )
+    conn.execute(CourseStats.__table__.insert().from_select(
+        ["course_id", *status_columns, "review_count", "rating_count", "rating_sum"],
+        select(
+            Course.course_id,
+            *[func.coalesce(enrollments.c[column], 0) for column in status_columns],
+            func.coalesce(reviews.c.review_count, 0),
+            func.coalesce(reviews.c.rating_count, 0),
+            func.coalesce(reviews.c.rating_sum, 0),
+        )
+        .outerjoin(enrollments, enrollments.c.course_id == Course.course_id)
+        .outerjoin(reviews, reviews.c.course_id == Course.course_id),
+    ))
+
+    # 生徒ごと: 受講登録数とレッスン数
+    enrollments = (
+        select(Enrollment.student_id, *status_counts)
+        .group_by(Enrollment.student_id)
+        .subquery()
+    )
+    lessons = (
+        select(
+            Enrollment.student_id,
+            func.count(Lesson.lesson_id).label("total_lessons"),
+            _count_if(Lesson.status == "completed").label("completed_lessons"),
+        )
+        .join(Lesson, Lesson.enrollment_id == Enrollment.enrollment_id)
+        .group_by(Enrollment.student_id)
+        .subquery()
+    )
+    conn.execute(StudentStats.__table__.insert().from_select(
+        ["student_id", *status_columns, "total_lessons", "completed_lessons"],
+        select(
+            Student.student_id,
+            *[func.coalesce(enrollments.c[column], 0) for column in status_columns],
+            func.coalesce(lessons.c.total_lessons, 0),
+            func.coalesce(lessons.c.completed_lessons, 0),
+        )
+        .outerjoin(enrollments, enrollments.c.student_id == Student.student_id)
+        .outerjoin(lessons, lessons.c.student_id == Student.student_id),
+    ))
+
+    # 全体
+    totals = {f"enrollments.{status}": count for status, count in
+              conn.execute(select(Enrollment.status, func.count()).group_by(Enrollment.status))}
+    totals["video_submissions"] = conn.execute(select(func.count(VideoSubmission.submission_id))).scalar()
+    totals["reviews"] = conn.execute(select(func.count(Review.review_id))).scalar()
+    count, price_sum = conn.execute(select(func.count(Course.course_id), func.sum(Course.monthly_price))).one()
+    totals["courses"] = count
+    totals["course_price_sum"] = price_sum or 0
+    conn.execute(SummaryTotal.__table__.insert(), [{"name": name, "value": value}
+                                                   for name, value in sorted(totals.items())])
+    db.commit()
+
+
+def create_tables(engine) -> bool:
+    """
+    集計テーブルがなければ作成する（アプリケーションの起動時に呼ぶ）
+
+    集計テーブルを追加する前の 01_ddl.sql で作ったデータベースでも、
+    01_ddl.sql を流し直さずに（既存のテーブルとデータを消さずに）集計テーブルだけを追加できます。
+
+    Returns:
+        集計テーブルを使える場合は True（作成できなかった場合は警告を出して False）
+    """
+    try:
+        Base.metadata.create_all(engine, tables=[model.__table__ for model in SUMMARY_MODELS])
+    except SQLAlchemyError as exc:
+        logger.warning("集計テーブルを作成できません（/stats は使えません）: %s", exc)
+        return False
+    return True
+
+
+def rebuild_if_empty(db) -> bool:
+    """
+    集計テーブルが空で、元のテーブルにデータがあれば作り直す（アプリケーションの起動時に呼ぶ）
+
+    generate_data.py は集計テーブルを埋めないため、データを投入した直後はダッシュボードがすべて 0 になります。
+    複数のワーカーが同時に起動して、他のワーカーが先に作り直した場合は何もしません。
+
+    Returns:
+        作り直した場合は True
+    """
+    if db.execute(select(SummaryTotal.name).limit(1)).first() is not None:
+        return False
+    if all(db.execute(select(1).select_from(model).limit(1)).first() is None for model in (Student, Course, Enrollment)):
+        return False
+    try:
+        rebuild(db)
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+# ========== 読み込み ==========
+
+def _total(rows: dict, name: str):
+    return rows.get(name, 0)
+
+
+def dashboard(db) -> dict:
+    """全体の集計（summary_totals の数行を読むだけ）"""
+    rows = {name: value for name, value in db.execute(select(SummaryTotal.name, SummaryTotal.value))}
+    courses = _total(rows, "courses")
+    submissions = _total(rows, "video_submissions")
+    return {
+        "enrollments_by_status": {
+            name.split(".", 1)[1]: int(value) for name, value in sorted(rows.items())
+            if name.startswith("enrollments.") and value
+        },
+        "courses": int(courses),
+        "average_course_price": float(_total(rows, "course_price_sum") / courses) if courses else None,
+        "video_submissions": int(submissions),
+        "reviews": int(_total(rows, "reviews")),
+        "reviews_per_submission": float(_total(rows, "reviews") / submissions) if submissions else None,
+    }
+
+
+def course_stats(db, course_id: int) -> dict:
+    """コースの集計（主キーで1行取得）。まだ集計がないコースはすべて 0"""
+    stats = db.get(CourseStats, course_id)
+    values = {column.key: (getattr(stats, column.key) if stats else 0) for column in CourseStats.__table__.columns}
+    values["course_id"] = course_id
+    values["average_rating"] = values["rating_sum"] / values["rating_count"] if values["rating_count"] else None
+    return values
+
+
+def student_stats(db, student_id: int) -> dict:
+    """生徒の集計（主キーで1行取得）。まだ集計がない生徒はすべて 0"""
+    stats = db.get(StudentStats, student_id)
+    values = {column.key: (getattr(stats, column.key) if stats else 0) for column in StudentStats.__table__.columns}
+    values["student_id"] = student_id
+    return values
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ダッシュボード用の集計テーブルを管理します")
+    parser.add_argument("command", choices=["create", "rebuild"],
+                        help="create: 集計テーブルがなければ作成する / rebuild: 元のテーブルから集計し直す")
+    args = parser.parse_args()
+
+    from database import engine
+
+    if args.command == "create":
+        if create_tables(engine):
+            print("集計テーブルを作成しました（作成済みのテーブルはそのまま）")
+        raise SystemExit
+    session = SessionLocal()
+    try:
+        rebuild(session)
+        print("集計テーブルを作り直しました")
+        print(dashboard(session))
+    finally:
+        session.close()
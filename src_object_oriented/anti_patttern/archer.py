@@ -3,6 +3,9 @@
 各キャラクターごとに別々のモジュールで実装しているため、コードが冗長になっています。
 """
 
+from combat_events import ATTACK, DAMAGE, DEFEND, MISS, emit
+
+
 def create_archer(name, hp, attack_power, accuracy):
     """弓使いを作成する"""
     return {
@@ -21,19 +24,19 @@ def archer_attack(archer, target):
     # 命中率に基づいて攻撃が当たるか判定
     if random.random() < archer["accuracy"]:
         damage = archer["attack_power"]
-        print(f"{archer['name']}が{target['name']}に{damage}のダメージを与えた！")
+        emit(ATTACK, archer["name"], target["name"], damage)
         target["hp"] -= damage
         if target["hp"] < 0:
             target["hp"] = 0
         return damage
     else:
-        print(f"{archer['name']}の攻撃が外れた！")
+        emit(MISS, archer["name"], target["name"], 0)
         return 0
 
 
 def archer_defend(archer):
     """弓使いが防御する"""
-    print(f"{archer['name']}は防御の構えを取った！")
+    emit(DEFEND, archer["name"])
     return archer["attack_power"] * 0.4  # 防御力は攻撃力の40%
 
 
@@ -42,7 +45,7 @@ def archer_take_damage(archer, damage):
     archer["hp"] -= damage
     if archer["hp"] < 0:
         archer["hp"] = 0
-    print(f"{archer['name']}は{damage}のダメージを受けた！残りHP: {archer['hp']}")
+    emit(DAMAGE, archer["name"], damage=damage, hp=archer["hp"])
     return archer["hp"] > 0
 
 
@@ -0,0 +1,33 @@
+"""
+戦闘イベントの出力先（アンチパターン版）
+
+各キャラクターの関数は print() で文章を作らず、「何が起きたか」を emit() に渡すだけにします。
+出力先（シンク）は、クラス版の design_pattern/events.py と同じものを使います
+（ConsoleSink / NullSink / RingBufferSink / BatchedFileSink。set_sink() / use_sink() で切り替える）。
+
+このディレクトリに events.py という名前で置くと、sys.path の順番によってどちらの events が
+import されるかが変わってしまうため、別の名前にして design_pattern.events として import します。
+"""
+
+import sys
+from pathlib import Path
+
+# src_object_oriented を追加して、design_pattern をパッケージとして import できるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from design_pattern.events import (  # noqa: E402,F401
+    ATTACK,
+    DAMAGE,
+    DEFEND,
+    MAGIC,
+    MISS,
+    BatchedFileSink,
+    CombatEvent,
+    ConsoleSink,
+    NullSink,
+    RingBufferSink,
+    emit,
+    get_sink,
+    set_sink,
+    use_sink,
+)
@@ -3,6 +3,9 @@
 各キャラクターごとに別々のモジュールで実装しているため、コードが冗長になっています。
 """
 
+from combat_events import ATTACK, DAMAGE, DEFEND, MAGIC, emit
+
+
 def create_mage(name, hp, attack_power, magic_power):
     """魔法使いを作成する"""
     return {
@@ -18,7 +21,7 @@ def create_mage(name, hp, attack_power, magic_power):
 def mage_attack(mage, target):
     """魔法使いが攻撃する"""
     damage = mage["attack_power"]
-    print(f"{mage['name']}が{target['name']}に{damage}のダメージを与えた！")
+    emit(ATTACK, mage["name"], target["name"], damage)
     target["hp"] -= damage
     if target["hp"] < 0:
         target["hp"] = 0
@@ -28,7 +31,7 @@ def mage_attack(mage, target):
 def mage_cast_magic(mage, target):
     """魔法使いが魔法を唱える"""
     damage = mage["magic_power"]
-    print(f"{mage['name']}が魔法を唱えた！{target['name']}に{damage}のダメージを与えた！")
+    emit(MAGIC, mage["name"], target["name"], damage)
     target["hp"] -= damage
     if target["hp"] < 0:
         target["hp"] = 0
@@ -37,7 +40,7 @@ def mage_cast_magic(mage, target):
 
 def mage_defend(mage):
     """魔法使いが防御する"""
-    print(f"{mage['name']}は防御の構えを取った！")
+    emit(DEFEND, mage["name"])
     return mage["attack_power"] * 0.3  # 防御力は攻撃力の30%
 
 
@@ -46,7 +49,7 @@ def mage_take_damage(mage, damage):
     mage["hp"] -= damage
     if mage["hp"] < 0:
         mage["hp"] = 0
-    print(f"{mage['name']}は{damage}のダメージを受けた！残りHP: {mage['hp']}")
+    emit(DAMAGE, mage["name"], damage=damage, hp=mage["hp"])
     return mage["hp"] > 0
 
 
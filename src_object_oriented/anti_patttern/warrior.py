@@ -3,6 +3,9 @@
 各キャラクターごとに別々のモジュールで実装しているため、コードが冗長になっています。
 """
 
+from combat_events import ATTACK, DAMAGE, DEFEND, emit
+
+
 def create_warrior(name, hp, attack_power):
     """戦士を作成する"""
     return {
@@ -17,7 +20,7 @@ def create_warrior(name, hp, attack_power):
 def warrior_attack(warrior, target):
     """戦士が攻撃する"""
     damage = warrior["attack_power"]
-    print(f"{warrior['name']}が{target['name']}に{damage}のダメージを与えた！")
+    emit(ATTACK, warrior["name"], target["name"], damage)
     target["hp"] -= damage
     if target["hp"] < 0:
         target["hp"] = 0
@@ -26,7 +29,7 @@ def warrior_attack(warrior, target):
 
 def warrior_defend(warrior):
     """戦士が防御する"""
-    print(f"{warrior['name']}は防御の構えを取った！")
+    emit(DEFEND, warrior["name"])
     return warrior["attack_power"] * 0.5  # 防御力は攻撃力の半分
 
 
@@ -35,7 +38,7 @@ def warrior_take_damage(warrior, damage):
     warrior["hp"] -= damage
     if warrior["hp"] < 0:
         warrior["hp"] = 0
-    print(f"{warrior['name']}は{damage}のダメージを受けた！残りHP: {warrior['hp']}")
+    emit(DAMAGE, warrior["name"], damage=damage, hp=warrior["hp"])
     return warrior["hp"] > 0
 
 
@@ -5,6 +5,7 @@
 
 import random
 from character import Character
+from events import ATTACK, DEFEND, MISS, emit
 
 
 class Archer(Character):
@@ -37,19 +38,23 @@ class Archer(Character):
         """
         if random.random() < self.accuracy:
             damage = self.attack_power
-            print(f"{self.name}が{target.name}に{damage}のダメージを与えた！")
+            emit(ATTACK, self.name, target.name, damage)
             target.take_damage(damage)
             return damage
         else:
-            print(f"{self.name}の攻撃が外れた！")
+            emit(MISS, self.name, target.name, 0)
             return 0
     
+    def hit_chance(self):
+        """弓使いの攻撃は命中率で当たるかが決まる（オーバーライド）"""
+        return self.accuracy
+    
     def get_status(self):
         """弓使いのステータスを取得（オーバーライド）"""
         return f"{self.name} (弓使い) - HP: {self.hp}/{self.max_hp}, 攻撃力: {self.attack_power}, 命中率: {self.accuracy*100:.1f}%"
     
     def defend(self):
         """弓使いの防御（オーバーライド）"""
-        print(f"{self.name}は防御の構えを取った！")
+        emit(DEFEND, self.name)
         return self.attack_power * 0.4  # 防御力は攻撃力の40%
 
@@ -3,6 +3,8 @@
 共通の機能をここに定義することで、コードの重複を避けられます。
 """
 
+from events import ATTACK, DAMAGE, DEFEND, emit
+
 
 class Character:
     """ゲームキャラクターの基底クラス"""
@@ -32,7 +34,7 @@ class Character:
             与えたダメージ量
         """
         damage = self.attack_power
-        print(f"{self.name}が{target.name}に{damage}のダメージを与えた！")
+        emit(ATTACK, self.name, target.name, damage)
         target.take_damage(damage)
         return damage
     
@@ -43,7 +45,7 @@ class Character:
         Returns:
             防御力
         """
-        print(f"{self.name}は防御の構えを取った！")
+        emit(DEFEND, self.name)
         return self.attack_power * 0.5
     
     def take_damage(self, damage):
@@ -59,7 +61,7 @@ class Character:
         self.hp -= damage
         if self.hp < 0:
             self.hp = 0
-        print(f"{self.name}は{damage}のダメージを受けた！残りHP: {self.hp}")
+        emit(DAMAGE, self.name, damage=damage, hp=self.hp)
         return self.is_alive()
     
     def is_alive(self):
@@ -71,6 +73,24 @@ class Character:
         """
         return self.hp > 0
     
+    def action_damage(self):
+        """
+        1回の行動で与えるダメージ（戦闘シミュレーション用）
+        
+        Returns:
+            ダメージ量（基本は攻撃力）
+        """
+        return self.attack_power
+    
+    def hit_chance(self):
+        """
+        1回の行動が当たる確率（戦闘シミュレーション用）
+        
+        Returns:
+            0.0〜1.0（基本は必ず当たる）
+        """
+        return 1.0
+    
     def get_status(self):
         """
         ステータスを取得
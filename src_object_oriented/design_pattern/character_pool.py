@@ -0,0 +1,286 @@
+"""
+大量のキャラクターを配列でまとめて扱う（CharacterPool）
+
+Character のインスタンスは、1体ごとに name・hp・max_hp・attack_power などを持つ辞書（__dict__）を持っています。
+10万体のキャラクターを作るとメモリを多く使い、攻撃のたびに Python の for 文で1体ずつ処理することになります。
+
+CharacterPool は、ステータスごとに全キャラクター分の NumPy 配列を持ちます（struct of arrays）。
+    hp          = [100,  60,  80, ...]
+    attack_power = [ 30,  15,  25, ...]
+攻撃・防御・生存チェックは、配列の演算で全キャラクター分を一度に計算します。
+
+pool[i] で取り出した1体は、Warrior / Mage / Archer のインスタンスとして扱えます（ビュー）。
+ステータスは配列を直接読み書きするので、pool[i].attack(...) の結果は配列にも反映されます。
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from character import Character
+from warrior import Warrior
+from mage import Mage
+from archer import Archer
+
+# キャラクタータイプ（配列には番号で保存する）
+CHARACTER_TYPES = ("character", "warrior", "mage", "archer")
+TYPE_CODES = {name: code for code, name in enumerate(CHARACTER_TYPES)}
+
+# 防御力は攻撃力の何倍か（各クラスの defend() と同じ）
+DEFEND_RATIOS = np.array([0.5, 0.5, 0.3, 0.4])
+
+
+class CharacterPool:
+    """キャラクターのステータスを、ステータスごとの配列で持つ"""
+
+    def __init__(self, names, character_type, hp, attack_power, magic_power=None, accuracy=None, max_hp=None):
+        """
+        Args:
+            names: キャラクター名のリスト
+            character_type: キャラクタータイプ（"warrior" など）のリスト、またはタイプ番号の配列
+            hp: ヒットポイント
+            attack_power: 攻撃力
+            magic_power: 魔力（省略時は 0）
+            accuracy: 命中率（省略時は 1.0。弓使い以外は使わない）
+            max_hp: 最大ヒットポイント（省略時は hp）
+        """
+        count = len(names)
+        self.names = list(names)
+        self.character_type = np.array(
+            [TYPE_CODES[t] for t in character_type] if isinstance(character_type, (list, tuple)) else character_type,
+            dtype=np.int8,
+        )
+        self.hp = np.array(hp, dtype=np.int32)
+        self.max_hp = np.array(hp if max_hp is None else max_hp, dtype=np.int32)
+        self.attack_power = np.array(attack_power, dtype=np.int32)
+        self.magic_power = np.zeros(count, dtype=np.int32) if magic_power is None else np.array(magic_power, dtype=np.int32)
+        self.accuracy = np.ones(count, dtype=np.float32) if accuracy is None else np.array(accuracy, dtype=np.float32)
+        # 弓使い以外は必ず当たる
+        self.accuracy[self.character_type != TYPE_CODES["archer"]] = 1.0
+
+    @classmethod
+    def from_characters(cls, characters):
+        """Character のインスタンスのリストから作る"""
+        return cls(
+            names=[c.name for c in characters],
+            character_type=[getattr(c, "character_type", "character") for c in characters],
+            hp=[c.hp for c in characters],
+            max_hp=[c.max_hp for c in characters],
+            attack_power=[c.attack_power for c in characters],
+            magic_power=[getattr(c, "magic_power", 0) for c in characters],
+            accuracy=[getattr(c, "accuracy", 1.0) for c in characters],
+        )
+
+    @classmethod
+    def of(cls, character, count):
+        """1体のキャラクターと同じステータスのキャラクターを count 体作る"""
+        return cls(
+            names=[character.name] * count,
+            character_type=np.full(count, TYPE_CODES[getattr(character, "character_type", "character")]),
+            hp=np.full(count, character.hp),
+            max_hp=np.full(count, character.max_hp),
+            attack_power=np.full(count, character.attack_power),
+            magic_power=np.full(count, getattr(character, "magic_power", 0)),
+            accuracy=np.full(count, getattr(character, "accuracy", 1.0)),
+        )
+
+    @classmethod
+    def concat(cls, pools):
+        """複数のプールを1つにつなげる"""
+        return cls(
+            names=[name for pool in pools for name in pool.names],
+            character_type=np.concatenate([pool.character_type for pool in pools]),
+            hp=np.concatenate([pool.hp for pool in pools]),
+            max_hp=np.concatenate([pool.max_hp for pool in pools]),
+            attack_power=np.concatenate([pool.attack_power for pool in pools]),
+            magic_power=np.concatenate([pool.magic_power for pool in pools]),
+            accuracy=np.concatenate([pool.accuracy for pool in pools]),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        """ステータスの配列が使うメモリ（バイト、names のリストは含まない）"""
+        return sum(a.nbytes for a in (self.character_type, self.hp, self.max_hp, self.attack_power,
+                                      self.magic_power, self.accuracy))
+
+    def __getitem__(self, index):
+        """index 番目のキャラクターを、Character と同じように扱えるビューとして返す"""
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        index %= len(self)
+        return VIEW_CLASSES[self.character_type[index]](self, index)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    # ========== 全キャラクター分をまとめて計算 ==========
+
+    def is_alive(self, indices=None):
+        """生存しているか（indices を省略すると全キャラクター分の True / False の配列）"""
+        hp = self.hp if indices is None else self.hp[indices]
+        return hp > 0
+
+    def alive_indices(self):
+        """生存しているキャラクターの番号"""
+        return np.flatnonzero(self.hp > 0)
+
+    def take_damage(self, indices, damage):
+        """
+        ダメージを受ける
+
+        Args:
+            indices: ダメージを受けるキャラクターの番号の配列（同じ番号が何度出てきてもよい）
+            damage: それぞれのダメージ量
+
+        Returns:
+            indices のキャラクターが生存しているか
+        """
+        indices = np.asarray(indices)
+        np.subtract.at(self.hp, indices, np.asarray(damage, dtype=np.int32))
+        np.maximum(self.hp, 0, out=self.hp)
+        return self.hp[indices] > 0
+
+    def attack(self, attackers, targets, rng=None, target_pool=None):
+        """
+        attackers[k] が targets[k] を攻撃する（Character.attack / Archer.attack と同じ計算）
+
+        弓使いの命中判定は、全員分の乱数を一度に引いて行います。
+
+        Args:
+            attackers: 攻撃するキャラクターの番号の配列
+            targets: 攻撃対象のキャラクターの番号の配列
+            rng: np.random.Generator（省略時は np.random.default_rng()）
+            target_pool: 攻撃対象のプール（省略時は自分のプール）
+
+        Returns:
+            それぞれが与えたダメージ量（外れた場合は 0）
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        attackers = np.asarray(attackers)
+        hits = rng.random(len(attackers)) < self.accuracy[attackers]
+        damage = np.where(hits, self.attack_power[attackers], 0)
+        (self if target_pool is None else target_pool).take_damage(targets, damage)
+        return damage
+
+    def cast_magic(self, attackers, targets, target_pool=None):
+        """attackers[k] が targets[k] に魔法を唱える（Mage.cast_magic と同じ計算）"""
+        attackers = np.asarray(attackers)
+        damage = self.magic_power[attackers]
+        (self if target_pool is None else target_pool).take_damage(targets, damage)
+        return damage
+
+    def defend(self, indices=None):
+        """防御力（各クラスの defend() と同じく、攻撃力 × タイプごとの倍率）"""
+        if indices is None:
+            return self.attack_power * DEFEND_RATIOS[self.character_type]
+        return self.attack_power[indices] * DEFEND_RATIOS[self.character_type[indices]]
+
+
+# ========== 1体分のビュー ==========
+
+def _array_property(name):
+    """プールの配列の index 番目を読み書きする属性"""
+
+    def getter(self):
+        return getattr(self._pool, name)[self._index].item()
+
+    def setter(self, value):
+        getattr(self._pool, name)[self._index] = value
+
+    return property(getter, setter)
+
+
+class PooledCharacterMixin:
+    """
+    CharacterPool の1体を、Character のインスタンスとして扱うためのビュー
+
+    Character.__init__ は呼ばず、hp などの属性をプールの配列に読み書きします。
+    attack() / take_damage() / get_status() などのメソッドは、継承したクラスのものがそのまま使われます。
+    """
+
+    def __init__(self, pool, index):
+        self._pool = pool
+        self._index = index
+
+    name = property(lambda self: self._pool.names[self._index])
+    character_type = property(lambda self: CHARACTER_TYPES[self._pool.character_type[self._index]])
+    hp = _array_property("hp")
+    max_hp = _array_property("max_hp")
+    attack_power = _array_property("attack_power")
+    magic_power = _array_property("magic_power")
+    accuracy = _array_property("accuracy")
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._index}: {self.get_status()}>"
+
+
+class PooledCharacter(PooledCharacterMixin, Character):
+    pass
+
+
+class PooledWarrior(PooledCharacterMixin, Warrior):
+    pass
+
+
+class PooledMage(PooledCharacterMixin, Mage):
+    pass
+
+
+class PooledArcher(PooledCharacterMixin, Archer):
+    pass
+
+
+VIEW_CLASSES = (PooledCharacter, PooledWarrior, PooledMage, PooledArcher)
+
+
+def main():
+    count = 100_000
+    rng = np.random.default_rng(42)
+
+    # 戦士・魔法使い・弓使いの混成部隊 vs 戦士の大軍
+    allies = CharacterPool.concat([
+        CharacterPool.of(Warrior("戦士", hp=100, attack_power=30), count // 2),
+        CharacterPool.of(Mage("魔法使い", hp=60, attack_power=15, magic_power=40), count // 4),
+        CharacterPool.of(Archer("弓使い", hp=80, attack_power=25, accuracy=0.8), count // 4),
+    ])
+    enemies = CharacterPool.of(Warrior("敵の戦士", hp=120, attack_power=20), count)
+    mages = np.flatnonzero(allies.character_type == TYPE_CODES["mage"])
+
+    start = time.perf_counter()
+    rounds = 0
+    while allies.is_alive().any() and enemies.is_alive().any():
+        rounds += 1
+        # 生きているキャラクターが、生きている相手をランダムに1体選んで攻撃する
+        attackers = allies.alive_indices()
+        targets = rng.choice(enemies.alive_indices(), len(attackers))
+        is_mage = np.isin(attackers, mages)
+        allies.attack(attackers[~is_mage], targets[~is_mage], rng, target_pool=enemies)
+        allies.cast_magic(attackers[is_mage], targets[is_mage], target_pool=enemies)
+        if enemies.is_alive().any():
+            attackers = enemies.alive_indices()
+            enemies.attack(attackers, rng.choice(allies.alive_indices(), len(attackers)), rng, target_pool=allies)
+    elapsed = time.perf_counter() - start
+
+    print(f"味方 {len(allies)} 体 vs 敵 {len(enemies)} 体: {rounds} ラウンドで決着（{elapsed:.2f}秒）")
+    print(f"生き残り: 味方 {allies.is_alive().sum()} 体, 敵 {enemies.is_alive().sum()} 体")
+
+    # 同じ数の Character のインスタンスを作った場合とメモリを比べる
+    tracemalloc.start()
+    characters = [Warrior("戦士", hp=100, attack_power=30) for _ in range(count)]
+    instances_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"メモリ: 配列 {allies.nbytes / 1e6:.1f} MB, インスタンス {len(characters)} 体 {instances_bytes / 1e6:.1f} MB")
+
+    # 1体だけ取り出して、いつもの Character のメソッドを使う
+    survivor = allies[int(allies.alive_indices()[0])] if allies.is_alive().any() else allies[0]
+    print(survivor.get_status())
+    Warrior("アレックス", hp=100, attack_power=30).attack(survivor)
+    print(f"配列にも反映: hp[{survivor._index}] = {allies.hp[survivor._index]}")
+
+
+if __name__ == "__main__":
+    main()
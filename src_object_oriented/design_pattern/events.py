@@ -0,0 +1,218 @@
+"""
+戦闘イベントの出力先（シンク）
+
+attack() や take_damage() が毎回 print() で文字列を作って表示すると、
+誰も読まないシミュレーションでも、戦闘の計算より表示のほうに時間がかかります。
+
+そこで各メソッドは、文字列ではなく「何が起きたか」（CombatEvent）を emit() で出力先に渡すだけにします。
+出力先は set_sink() / use_sink() で切り替えられます。
+- ConsoleSink: これまでと同じ文章を画面に表示する（デフォルト）
+- NullSink: 何もしない（文字列も CombatEvent も作らない）
+- RingBufferSink: 最新の N 件をメモリに残す
+- BatchedFileSink: まとめて 1行1JSON でファイルに書く
+
+文章（format()）は、ConsoleSink が表示するときや、残したイベントを読むときに初めて作ります。
+
+    from events import RingBufferSink, use_sink
+
+    with use_sink(RingBufferSink(1000)) as log:
+        warrior.attack(mage)
+    for event in log.events():
+        print(event.format())
+"""
+
+import json
+from collections import deque
+from contextlib import contextmanager
+
+# イベントの種類
+ATTACK = "attack"  # 攻撃が当たった
+MISS = "miss"  # 攻撃が外れた
+MAGIC = "magic"  # 魔法を唱えた
+DEFEND = "defend"  # 防御の構えを取った
+DAMAGE = "damage"  # ダメージを受けた
+
+
+class CombatEvent:
+    """戦闘で起きた1つの出来事"""
+
+    __slots__ = ("kind", "actor", "target", "damage", "hp")
+
+    def __init__(self, kind, actor, target=None, damage=None, hp=None):
+        """
+        Args:
+            kind: イベントの種類（ATTACK / MISS / MAGIC / DEFEND / DAMAGE）
+            actor: 行動した（DAMAGE はダメージを受けた）キャラクターの名前
+            target: 攻撃対象のキャラクターの名前
+            damage: ダメージ量（外れた攻撃は 0）
+            hp: ダメージを受けたあとの残りHP（DAMAGE のみ）
+        """
+        self.kind = kind
+        self.actor = actor
+        self.target = target
+        self.damage = damage
+        self.hp = hp
+
+    @property
+    def hit(self):
+        """攻撃が当たったか（攻撃以外のイベントは None）"""
+        if self.kind == MISS:
+            return False
+        if self.kind in (ATTACK, MAGIC):
+            return True
+        return None
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "actor": self.actor,
+            "target": self.target,
+            "damage": self.damage,
+            "hit": self.hit,
+            "hp": self.hp,
+        }
+
+    def format(self):
+        """これまで print() で表示していた文章"""
+        if self.kind == ATTACK:
+            return f"{self.actor}が{self.target}に{self.damage}のダメージを与えた！"
+        if self.kind == MISS:
+            return f"{self.actor}の攻撃が外れた！"
+        if self.kind == MAGIC:
+            return f"{self.actor}が魔法を唱えた！{self.target}に{self.damage}のダメージを与えた！"
+        if self.kind == DEFEND:
+            return f"{self.actor}は防御の構えを取った！"
+        if self.kind == DAMAGE:
+            return f"{self.actor}は{self.damage}のダメージを受けた！残りHP: {self.hp}"
+        raise ValueError(f"不明なイベントの種類です: {self.kind}")
+
+    def __repr__(self):
+        return f"<CombatEvent {self.to_dict()}>"
+
+
+class NullSink:
+    """何もしない出力先（enabled が False なので、emit() はイベントを作らずに戻る）"""
+
+    enabled = False
+
+    def write(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    """これまでと同じ文章を画面に表示する出力先"""
+
+    enabled = True
+
+    def write(self, event):
+        print(event.format())
+
+    def close(self):
+        pass
+
+
+class RingBufferSink:
+    """最新の maxlen 件のイベントをメモリに残す出力先（古いものから捨てる）"""
+
+    enabled = True
+
+    def __init__(self, maxlen=10_000):
+        self._events = deque(maxlen=maxlen)
+        self.write = self._events.append
+
+    def events(self):
+        """残っているイベント（古い順）"""
+        return list(self._events)
+
+    def lines(self):
+        """残っているイベントの文章（古い順）"""
+        return [event.format() for event in self._events]
+
+    def clear(self):
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def close(self):
+        pass
+
+
+# json.dumps() は呼ぶたびにエンコーダーを作るので、1つを使い回す
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class BatchedFileSink:
+    """
+    イベントを batch_size 件ずつまとめて、1行1JSON でファイルに追記する出力先
+
+    close() するまで最後の batch_size 件未満は書かれないので、with 文か use_sink() で使ってください。
+    """
+
+    enabled = True
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("".join([_encode_json(e.to_dict()) + "\n" for e in self._buffer]))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_sink = ConsoleSink()
+
+
+def get_sink():
+    return _sink
+
+
+def set_sink(sink):
+    """出力先を切り替えて、それまでの出力先を返す"""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+@contextmanager
+def use_sink(sink):
+    """with の中だけ出力先を切り替える（抜けるときに sink を close する）"""
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(previous)
+        sink.close()
+
+
+def emit(kind, actor, target=None, damage=None, hp=None):
+    """
+    イベントを出力先に渡す
+
+    出力先が無効（NullSink）のときは、CombatEvent も文字列も作りません。
+    """
+    if _sink.enabled:
+        _sink.write(CombatEvent(kind, actor, target, damage, hp))
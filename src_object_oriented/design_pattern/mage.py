@@ -4,6 +4,7 @@
 """
 
 from character import Character
+from events import DEFEND, MAGIC, emit
 
 
 class Mage(Character):
@@ -34,16 +35,20 @@ class Mage(Character):
             与えたダメージ量
         """
         damage = self.magic_power
-        print(f"{self.name}が魔法を唱えた！{target.name}に{damage}のダメージを与えた！")
+        emit(MAGIC, self.name, target.name, damage)
         target.take_damage(damage)
         return damage
     
+    def action_damage(self):
+        """魔法使いは魔法で攻撃する（オーバーライド）"""
+        return self.magic_power
+    
     def get_status(self):
         """魔法使いのステータスを取得（オーバーライド）"""
         return f"{self.name} (魔法使い) - HP: {self.hp}/{self.max_hp}, 攻撃力: {self.attack_power}, 魔力: {self.magic_power}"
     
     def defend(self):
         """魔法使いの防御（オーバーライド）"""
-        print(f"{self.name}は防御の構えを取った！")
+        emit(DEFEND, self.name)
         return self.attack_power * 0.3  
 
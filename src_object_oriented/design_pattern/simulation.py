@@ -0,0 +1,244 @@
+"""
+戦闘シミュレーション（大量の戦闘をまとめて実行）
+
+main.py のように attack() を1回ずつ呼ぶと、1回の攻撃ごとにメソッドの呼び出しとイベントの出力（events.py）が行われます。
+バランス調整のために何百万回も戦わせるには遅すぎるため、ここでは画面に何も表示せず、
+NumPy の配列で「N 回の戦闘」を同時に進めます。
+
+キャラクターごとの違いは、各クラスでオーバーライドしたメソッドから読み取ります。
+- action_damage(): 1回の行動のダメージ（戦士・弓使いは攻撃力、魔法使いは魔力）
+- hit_chance(): 当たる確率（弓使いは命中率、それ以外は 1.0）
+
+戦闘のルール:
+1. 1ターンの中で、先攻のチームの生きているキャラクターが並び順に行動し、そのあと後攻のチームが行動します
+   （先攻・後攻は戦闘ごとにランダムに決めます）
+2. 行動するキャラクターは、相手チームの生きている先頭のキャラクターを攻撃します
+3. 相手チームが全員倒れたら勝ち。max_turns ターンで決着しなければ引き分けです
+
+乱数は seed から作るので、同じ seed・同じ chunk_size なら何度実行しても同じ結果になります。
+
+    python simulation.py --battles 1000000 --seed 42
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from warrior import Warrior
+from mage import Mage
+from archer import Archer
+
+DRAW, TEAM_A, TEAM_B = 0, 1, 2
+
+
+class Roster:
+    """チームのキャラクターのステータスを配列にしたもの"""
+
+    def __init__(self, characters):
+        if not characters:
+            raise ValueError("チームには1人以上のキャラクターが必要です")
+        self.names = [c.name for c in characters]
+        self.hp = np.array([c.hp for c in characters], dtype=np.float64)
+        self.damage = np.array([c.action_damage() for c in characters], dtype=np.float64)
+        self.hit_chance = np.array([c.hit_chance() for c in characters], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class SimulationResult:
+    """
+    シミュレーションの結果
+
+    Attributes:
+        winner: 戦闘ごとの勝者（DRAW / TEAM_A / TEAM_B）
+        turns: 戦闘ごとの決着したターン（引き分けは max_turns）
+        death_turns: {"A" or "B": (戦闘数, 人数) の配列} キャラクターが倒れたターン（倒れなかった場合は 0）
+        damage: {"A" or "B": 戦闘ごとにそのチームが与えたダメージの合計}
+    """
+
+    def __init__(self, team_a, team_b, winner, turns, death_turns, damage, max_turns):
+        self.names = {"A": team_a.names, "B": team_b.names}
+        self.winner = winner
+        self.turns = turns
+        self.death_turns = death_turns
+        self.damage = damage
+        self.max_turns = max_turns
+
+    @property
+    def battles(self):
+        return len(self.winner)
+
+    def win_rates(self):
+        """チーム A の勝率・チーム B の勝率・引き分けの割合"""
+        counts = np.bincount(self.winner, minlength=3)
+        return {
+            "A": counts[TEAM_A] / self.battles,
+            "B": counts[TEAM_B] / self.battles,
+            "draw": counts[DRAW] / self.battles,
+        }
+
+    def turns_distribution(self, team=None):
+        """
+        決着までのターン数の分布
+
+        Args:
+            team: "A" / "B" を指定すると、そのチームが勝った戦闘だけを数える
+
+        Returns:
+            {ターン数: 戦闘数}
+        """
+        turns = self.turns[self.winner != DRAW]
+        if team is not None:
+            turns = self.turns[self.winner == (TEAM_A if team == "A" else TEAM_B)]
+        counts = np.bincount(turns, minlength=self.max_turns + 1)
+        return {turn: int(count) for turn, count in enumerate(counts) if count}
+
+    def turns_to_kill(self, team, index):
+        """
+        キャラクターが倒されるまでのターン数の分布
+
+        Args:
+            team: "A" または "B"
+            index: チームの中の並び順
+
+        Returns:
+            {ターン数: 戦闘数}（倒されなかった戦闘は含まない）
+        """
+        turns = self.death_turns[team][:, index]
+        counts = np.bincount(turns[turns > 0], minlength=self.max_turns + 1)
+        return {turn: int(count) for turn, count in enumerate(counts) if count}
+
+    def damage_histogram(self, team, bins=10):
+        """
+        戦闘ごとにチームが与えたダメージの合計のヒストグラム
+
+        Returns:
+            (各区間の戦闘数, 区間の境界) np.histogram と同じ形式
+        """
+        return np.histogram(self.damage[team], bins=bins)
+
+    def summary(self):
+        """結果を文字列にまとめる"""
+        rates = self.win_rates()
+        lines = [
+            f"戦闘数: {self.battles}",
+            f"勝率: A {rates['A']:.2%} / B {rates['B']:.2%} / 引き分け {rates['draw']:.2%}",
+            f"決着までの平均ターン数: {self.turns[self.winner != DRAW].mean():.2f}" if rates["draw"] < 1 else "決着した戦闘はありません",
+        ]
+        for team in ("A", "B"):
+            lines.append(f"チーム {team} の与えたダメージ: 平均 {self.damage[team].mean():.1f}")
+            for index, name in enumerate(self.names[team]):
+                killed = self.death_turns[team][:, index] > 0
+                lines.append(f"  {name}: 倒された割合 {killed.mean():.2%}")
+        return "\n".join(lines)
+
+
+def _act(rng, attackers, i, attacker_hp, defender_hp, death_turns, damage_dealt, acting, turn):
+    """チームの i 番目のキャラクターが、acting が True の戦闘で1回ずつ行動する"""
+    defender_alive = defender_hp > 0
+    acting = acting & (attacker_hp[:, i] > 0) & defender_alive.any(axis=1)
+    if attackers.hit_chance[i] < 1.0:
+        # 外れた戦闘は何もしない（乱数は全戦闘分を1回で引く）
+        acting &= rng.random(len(acting)) < attackers.hit_chance[i]
+    battles = np.flatnonzero(acting)
+    if len(battles) == 0:
+        return
+    # 生きている先頭のキャラクターを狙う
+    targets = defender_alive[battles].argmax(axis=1)
+    hp = defender_hp[battles, targets] - attackers.damage[i]
+    defender_hp[battles, targets] = np.maximum(hp, 0)
+    damage_dealt[battles] += attackers.damage[i]
+    killed = hp <= 0
+    death_turns[battles[killed], targets[killed]] = turn
+
+
+def _simulate_chunk(rng, team_a, team_b, battles, max_turns):
+    hp = {"A": np.tile(team_a.hp, (battles, 1)), "B": np.tile(team_b.hp, (battles, 1))}
+    death_turns = {
+        "A": np.zeros((battles, len(team_a)), dtype=np.int32),
+        "B": np.zeros((battles, len(team_b)), dtype=np.int32),
+    }
+    damage = {"A": np.zeros(battles), "B": np.zeros(battles)}
+    winner = np.full(battles, DRAW, dtype=np.int8)
+    turns = np.full(battles, max_turns, dtype=np.int32)
+    ongoing = np.ones(battles, dtype=bool)
+    a_first = rng.random(battles) < 0.5
+
+    sides = (("A", "B", team_a, TEAM_A), ("B", "A", team_b, TEAM_B))
+    for turn in range(1, max_turns + 1):
+        # 先攻の番、後攻の番の順に進める（A が先攻の戦闘と B が先攻の戦闘は別々なので、同時に処理できる）
+        for a_moves in (a_first, ~a_first):
+            for attacker, defender, roster, team_id in sides:
+                moves = a_moves if attacker == "A" else ~a_moves
+                for i in range(len(roster)):
+                    _act(rng, roster, i, hp[attacker], hp[defender], death_turns[defender], damage[attacker],
+                         ongoing & moves, turn)
+            for attacker, defender, roster, team_id in sides:
+                wiped = ongoing & ~(hp[defender] > 0).any(axis=1)
+                winner[wiped] = team_id
+                turns[wiped] = turn
+                ongoing &= ~wiped
+        if not ongoing.any():
+            break
+    return winner, turns, death_turns, damage
+
+
+def simulate(team_a, team_b, battles, seed=0, max_turns=100, chunk_size=100_000):
+    """
+    チーム A とチーム B を battles 回戦わせる
+
+    Args:
+        team_a, team_b: キャラクター（Character のサブクラスのインスタンス）のリスト。
+            インスタンスは変更せず、現在の HP から戦闘を始めます
+        battles: 戦闘の回数（それぞれ独立した戦闘）
+        seed: 乱数のシード
+        max_turns: これを超えたら引き分け
+        chunk_size: 一度に配列で進める戦闘の数（メモリ使用量の上限）
+
+    Returns:
+        SimulationResult
+    """
+    roster_a, roster_b = Roster(team_a), Roster(team_b)
+    rng = np.random.default_rng(seed)
+    chunks = [
+        _simulate_chunk(rng, roster_a, roster_b, min(chunk_size, battles - start), max_turns)
+        for start in range(0, battles, chunk_size)
+    ]
+    return SimulationResult(
+        roster_a,
+        roster_b,
+        winner=np.concatenate([c[0] for c in chunks]),
+        turns=np.concatenate([c[1] for c in chunks]),
+        death_turns={team: np.concatenate([c[2][team] for c in chunks]) for team in ("A", "B")},
+        damage={team: np.concatenate([c[3][team] for c in chunks]) for team in ("A", "B")},
+        max_turns=max_turns,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="戦士・魔法使い vs 戦士・弓使いの戦闘をまとめて実行します")
+    parser.add_argument("--battles", type=int, default=1_000_000, help="戦闘の回数（デフォルト: 1000000）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード（デフォルト: 42）")
+    args = parser.parse_args()
+
+    team_a = [Warrior("アレックス", hp=100, attack_power=30), Mage("ルナ", hp=60, attack_power=15, magic_power=40)]
+    team_b = [Warrior("ブルース", hp=120, attack_power=25), Archer("ロビン", hp=80, attack_power=25, accuracy=0.8)]
+
+    start = time.perf_counter()
+    result = simulate(team_a, team_b, args.battles, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(result.summary())
+    print(f"決着までのターン数: {result.turns_distribution()}")
+    print(f"ロビンが倒されるまでのターン数: {result.turns_to_kill('B', 1)}")
+    counts, edges = result.damage_histogram("B", bins=5)
+    print("チーム B の与えたダメージ:")
+    for count, low, high in zip(counts, edges[:-1], edges[1:]):
+        print(f"  {low:6.1f}〜{high:6.1f}: {count}")
+    print(f"\n実行時間: {elapsed:.2f}秒（{args.battles / elapsed:,.0f} 戦闘/秒）")
+
+
+if __name__ == "__main__":
+    main()
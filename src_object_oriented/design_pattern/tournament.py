@@ -0,0 +1,257 @@
+"""
+総当たり戦（トーナメント）を複数のプロセスで実行する
+
+戦士・魔法使い・弓使いのステータスの組み合わせ（グリッド）から出場キャラクターを作り、
+すべての組み合わせを 1対1 で simulate() により battles 回ずつ戦わせて、勝率のランキングを作ります。
+
+- 対戦は shard_size 件ずつの「シャード」に分け、ProcessPoolExecutor で並列に実行します
+- 各対戦の乱数のシードは [seed, 対戦の番号] から作るので、
+  ワーカーの数・シャードの大きさ・終わった順番に関係なく、同じ結果（ビット単位で同じ）になります
+- 終わったシャードから順にチェックポイントファイル（1行1JSON）に追記し、途中経過を表示します
+- 同じチェックポイントファイルを指定して実行し直すと、終わっていないシャードだけを実行します
+
+    python tournament.py --workers 4 --battles 2000 --checkpoint tournament.jsonl
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from events import NullSink, set_sink
+from simulation import TEAM_A, TEAM_B, DRAW, simulate
+from warrior import Warrior
+from mage import Mage
+from archer import Archer
+
+CLASSES = {"warrior": Warrior, "mage": Mage, "archer": Archer}
+LABELS = {"warrior": "戦士", "mage": "魔法使い", "archer": "弓使い"}
+
+# {キャラクタータイプ: {ステータス: 候補の値のリスト}}
+DEFAULT_GRID = {
+    "warrior": {"hp": [80, 100, 120], "attack_power": [20, 30, 40]},
+    "mage": {"hp": [50, 60, 70], "attack_power": [15], "magic_power": [30, 40, 50]},
+    "archer": {"hp": [70, 80, 90], "attack_power": [20, 25, 30], "accuracy": [0.7, 0.8, 0.9]},
+}
+
+
+def build_entries(grid):
+    """
+    グリッドのすべての組み合わせから、出場キャラクターを作る
+
+    Returns:
+        [(名前, キャラクタータイプ, ステータスの辞書)] のリスト（プロセスに渡せるように、インスタンスではなく引数で持つ）
+    """
+    entries = []
+    for character_type, stats in grid.items():
+        keys = list(stats)
+        for values in itertools.product(*(stats[key] for key in keys)):
+            params = dict(zip(keys, values))
+            name = f"{LABELS[character_type]}(" + ", ".join(f"{k}={v}" for k, v in params.items()) + ")"
+            entries.append((name, character_type, params))
+    return entries
+
+
+def build_matchups(entries):
+    """すべての組み合わせの対戦 [(対戦の番号, 出場キャラクター A, 出場キャラクター B)]"""
+    return [(index, a, b) for index, (a, b) in enumerate(itertools.combinations(entries, 2))]
+
+
+def _create(entry):
+    name, character_type, params = entry
+    return CLASSES[character_type](name, **params)
+
+
+def run_shard(shard, matchups, battles, seed, max_turns):
+    """
+    1つのシャードの対戦を実行する（ワーカーのプロセスで実行される）
+
+    Returns:
+        (シャードの番号, [対戦ごとの結果の辞書])
+    """
+    set_sink(NullSink())
+    rows = []
+    for index, a, b in matchups:
+        result = simulate([_create(a)], [_create(b)], battles, seed=[seed, index], max_turns=max_turns)
+        decided = result.turns[result.winner != DRAW]
+        rows.append({
+            "index": index,
+            "a": a[0],
+            "b": b[0],
+            "wins_a": int((result.winner == TEAM_A).sum()),
+            "wins_b": int((result.winner == TEAM_B).sum()),
+            "draws": int((result.winner == DRAW).sum()),
+            "mean_turns": float(decided.mean()) if len(decided) else None,
+        })
+    return shard, rows
+
+
+class Checkpoint:
+    """
+    終わったシャードの結果を追記するファイル
+
+    1行目に設定（グリッド・戦闘数・シードなど）を書き、2行目以降に {"shard": 番号, "rows": [...]} を書きます。
+    設定が違うファイルから再開しようとした場合は ValueError を出します。
+    書き込みの途中で止まった最後の行は、読み込むときにファイルから切り詰めます
+    （残したまま追記すると、次の結果がその行につながって壊れるため）。
+    """
+
+    def __init__(self, path, config):
+        self.path = path
+        self.done = {}  # シャードの番号 → 結果
+        if path and os.path.exists(path):
+            self._load(path, config)
+        self._file = None
+        if path:
+            self._file = open(path, "a", encoding="utf-8")
+            if not self.done and os.path.getsize(path) == 0:
+                self._write({"config": config})
+
+    def _load(self, path, config):
+        with open(path, "rb+") as f:
+            data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                f.truncate(complete)
+        lines = data[:complete].decode("utf-8").splitlines()
+        if not lines:
+            return  # 設定の行も書き終わっていなかった（空のファイルとして作り直す）
+        try:
+            saved = json.loads(lines[0]).get("config")
+        except (ValueError, AttributeError):
+            raise ValueError(f"{path} はチェックポイントのファイルではありません")
+        if saved != config:
+            raise ValueError(f"{path} は別の設定のチェックポイントです（設定を合わせるか、別のファイルを指定してください）")
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 書き込みの途中で止まった最後の行
+            self.done[record["shard"]] = record["rows"]
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def save(self, shard, rows):
+        self.done[shard] = rows
+        if self._file is not None:
+            self._write({"shard": shard, "rows": rows})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def run_tournament(grid=None, battles=1000, seed=0, max_turns=100, shard_size=50, workers=None,
+                   checkpoint=None, on_progress=None):
+    """
+    総当たり戦を実行して、対戦ごとの結果を対戦の番号順に返す
+
+    Args:
+        grid: {キャラクタータイプ: {ステータス: 候補の値のリスト}}（省略時は DEFAULT_GRID）
+        battles: 1つの対戦で戦わせる回数
+        seed: 乱数のシード
+        max_turns: これを超えたら引き分け
+        shard_size: 1つのシャードの対戦の数
+        workers: プロセスの数（1 ならこのプロセスで実行する。省略時は CPU の数）
+        checkpoint: チェックポイントファイルのパス（省略時は保存しない）
+        on_progress: シャードが終わるたびに on_progress(終わったシャードの数, シャードの総数, rows) を呼ぶ
+
+    Returns:
+        対戦ごとの結果の辞書のリスト
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    matchups = build_matchups(build_entries(grid))
+    shards = [matchups[start:start + shard_size] for start in range(0, len(matchups), shard_size)]
+    config = {"grid": grid, "battles": battles, "seed": seed, "max_turns": max_turns, "shard_size": shard_size}
+    store = Checkpoint(checkpoint, config)
+    pending = [shard for shard in range(len(shards)) if shard not in store.done]
+
+    def finished(shard, rows):
+        store.save(shard, rows)
+        if on_progress is not None:
+            on_progress(len(store.done), len(shards), rows)
+
+    try:
+        if workers == 1:
+            for shard in pending:
+                finished(*run_shard(shard, shards[shard], battles, seed, max_turns))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(run_shard, shard, shards[shard], battles, seed, max_turns) for shard in pending
+                ]
+                # 終わった順に受け取って保存する（並べ直すのは最後にまとめて行う）
+                for future in as_completed(futures):
+                    finished(*future.result())
+    finally:
+        store.close()
+
+    return [row for shard in range(len(shards)) for row in store.done[shard]]
+
+
+def leaderboard(rows):
+    """
+    対戦ごとの結果を、出場キャラクターごとの成績にまとめる
+
+    Returns:
+        勝率の高い順の [{"name", "wins", "losses", "draws", "win_rate"}]
+    """
+    records = {}
+    for row in rows:
+        for name, wins, losses in ((row["a"], row["wins_a"], row["wins_b"]), (row["b"], row["wins_b"], row["wins_a"])):
+            record = records.setdefault(name, {"name": name, "wins": 0, "losses": 0, "draws": 0})
+            record["wins"] += wins
+            record["losses"] += losses
+            record["draws"] += row["draws"]
+    for record in records.values():
+        record["win_rate"] = record["wins"] / (record["wins"] + record["losses"] + record["draws"])
+    return sorted(records.values(), key=lambda r: (-r["win_rate"], r["name"]))
+
+
+def results_digest(rows):
+    """結果のハッシュ（ワーカーの数を変えても同じになることを確かめる用）"""
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="戦士・魔法使い・弓使いのステータスの組み合わせで総当たり戦を行います")
+    parser.add_argument("--battles", type=int, default=1000, help="1つの対戦で戦わせる回数（デフォルト: 1000）")
+    parser.add_argument("--seed", type=int, default=42, help="乱数のシード（デフォルト: 42）")
+    parser.add_argument("--workers", type=int, default=None, help="プロセスの数（デフォルト: CPU の数）")
+    parser.add_argument("--shard-size", type=int, default=50, help="1つのシャードの対戦の数（デフォルト: 50）")
+    parser.add_argument("--grid", help="グリッドの JSON ファイル（デフォルト: DEFAULT_GRID）")
+    parser.add_argument("--checkpoint", help="チェックポイントファイル。指定すると途中から再開できる")
+    parser.add_argument("--top", type=int, default=10, help="表示する順位の数（デフォルト: 10）")
+    args = parser.parse_args()
+
+    grid = None
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as f:
+            grid = json.load(f)
+
+    def progress(done, total, rows):
+        best = max(rows, key=lambda r: max(r["wins_a"], r["wins_b"]))
+        winner = best["a"] if best["wins_a"] >= best["wins_b"] else best["b"]
+        print(f"[{done}/{total}] シャード完了（最も大差の勝利: {winner} {max(best['wins_a'], best['wins_b'])}勝）")
+
+    start = time.perf_counter()
+    rows = run_tournament(grid, battles=args.battles, seed=args.seed, shard_size=args.shard_size,
+                          workers=args.workers, checkpoint=args.checkpoint, on_progress=progress)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n=== ランキング（{len(rows)} 対戦 × {args.battles} 戦） ===")
+    for rank, record in enumerate(leaderboard(rows)[:args.top], start=1):
+        print(f"{rank:3d}. {record['name']:<45} 勝率 {record['win_rate']:.2%}"
+              f"（{record['wins']}勝 {record['losses']}敗 {record['draws']}分）")
+    print(f"\n結果のハッシュ: {results_digest(rows)}")
+    print(f"実行時間: {elapsed:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 """
 
 from character import Character
+from events import DEFEND, emit
 
 
 class Warrior(Character):
@@ -27,6 +28,6 @@ class Warrior(Character):
     
     def defend(self):
         """戦士の防御（オーバーライド）"""
-        print(f"{self.name}は防御の構えを取った！")
+        emit(DEFEND, self.name)
         return self.attack_power * 0.5  # 防御力は攻撃力の半分
 
@@ -14,7 +14,7 @@ SQL の知識が必要です。
 
 from sqlalchemy import (
     create_engine, MetaData, Table, Column, Integer, String, 
-    Text, DateTime, Numeric, ForeignKey, select, insert, update, delete
+    Text, DateTime, Numeric, ForeignKey, Index, select, insert, update, delete, bindparam
 )
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -31,7 +31,10 @@ DATABASE_URL = os.getenv(
 )
 
 # エンジンを作成（データベースへの接続を管理）
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True で実行されるSQLを表示
+# 実行されるSQLの表示（環境変数 SQL_ECHO）
+#   true: SQL を表示（デフォルト） / debug: 取得した行も表示 / false: 表示しない
+SQL_ECHO = os.getenv('SQL_ECHO', 'true').lower()
+engine = create_engine(DATABASE_URL, echo='debug' if SQL_ECHO == 'debug' else SQL_ECHO in ('1', 'true', 'yes'))
 
 # メタデータオブジェクトを作成（テーブル定義を管理）
 metadata = MetaData()
@@ -43,7 +46,7 @@ students = Table(
     Column('student_id', Integer, primary_key=True),
     Column('name', String(200), nullable=False),
     Column('email', String(200), nullable=False, unique=True),
-    Column('enrollment_date', DateTime, nullable=False)
+    Column('enrollment_date', DateTime, nullable=False, index=True)
 )
 
 courses = Table(
@@ -58,10 +61,12 @@ courses = Table(
 enrollments = Table(
     'enrollments', metadata,
     Column('enrollment_id', Integer, primary_key=True),
-    Column('student_id', Integer, ForeignKey('students.student_id'), nullable=False),
-    Column('course_id', Integer, ForeignKey('courses.course_id'), nullable=False),
+    Column('student_id', Integer, ForeignKey('students.student_id'), nullable=False, index=True),
+    Column('course_id', Integer, ForeignKey('courses.course_id'), nullable=False, index=True),
     Column('enrolled_at', DateTime, nullable=False),
-    Column('status', String(20), nullable=False)
+    Column('status', String(20), nullable=False),
+    # 複合インデックス（ステータスで絞り込んでコースと JOIN する検索用）
+    Index('ix_enrollments_status_course_id', 'status', 'course_id')
 )
 
 lessons = Table(
@@ -71,13 +76,14 @@ lessons = Table(
     Column('scheduled_at', DateTime, nullable=False),
     Column('duration_minutes', Integer, nullable=False),
     Column('status', String(20), nullable=False),
-    Column('notes', Text)
+    Column('notes', Text),
+    Index('ix_lessons_enrollment_id_status', 'enrollment_id', 'status')
 )
 
 video_submissions = Table(
     'video_submissions', metadata,
     Column('submission_id', Integer, primary_key=True),
-    Column('lesson_id', Integer, ForeignKey('lessons.lesson_id'), nullable=False),
+    Column('lesson_id', Integer, ForeignKey('lessons.lesson_id'), nullable=False, index=True),
     Column('title', String(200), nullable=False),
     Column('video_url', String(500)),
     Column('submitted_at', DateTime, nullable=False),
@@ -87,8 +93,8 @@ video_submissions = Table(
 reviews = Table(
     'reviews', metadata,
     Column('review_id', Integer, primary_key=True),
-    Column('submission_id', Integer, ForeignKey('video_submissions.submission_id'), nullable=False),
-    Column('rating', Integer),
+    Column('submission_id', Integer, ForeignKey('video_submissions.submission_id'), nullable=False, index=True),
+    Column('rating', Integer, index=True),
     Column('feedback', Text),
     Column('reviewed_at', DateTime, nullable=False)
 )
@@ -252,6 +258,29 @@ def example_10_complex_join():
             print(f"生徒: {row.student_name}, コース: {row.course_title}, 登録日: {row.enrolled_at}")
 
 
+# 生徒のアクティブな受講登録（値の部分を bindparam にして、一度だけ組み立てておく）
+active_enrollments_query = (
+    select(students.c.name, courses.c.title, enrollments.c.enrolled_at)
+    .select_from(
+        students.join(enrollments, students.c.student_id == enrollments.c.student_id)
+        .join(courses, enrollments.c.course_id == courses.c.course_id)
+    )
+    .where(students.c.student_id == bindparam('student_id'), enrollments.c.status == 'active')
+)
+
+
+def example_11_prebuilt_statement():
+    """例11: 同じ形のクエリを何度も実行する（bindparam）"""
+    print("\n=== 例11: 組み立て済みの SQL を値だけ変えて使い回す ===")
+    
+    # select(...) を毎回組み立てると、コンパイル済み SQL のキャッシュを探すためのキーも毎回作り直します。
+    # 組み立て済みの select(...) に値だけを渡すと、その準備を省けます（ログに [cached since ...] と表示されます）。
+    with engine.connect() as conn:
+        for student_id in (101, 102, 103):
+            for row in conn.execute(active_enrollments_query, {'student_id': student_id}):
+                print(f"生徒: {row.name}, コース: {row.title}, 登録日: {row.enrolled_at}")
+
+
 if __name__ == '__main__':
     print("SQLAlchemy Core サンプルプログラム")
     print("=" * 50)
@@ -267,6 +296,7 @@ if __name__ == '__main__':
     example_8_update()
     example_9_delete()
     example_10_complex_join()
+    example_11_prebuilt_statement()
     
     print("\n" + "=" * 50)
     print("すべての例を実行しました！")
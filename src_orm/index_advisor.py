@@ -0,0 +1,112 @@
+"""
+インデックスアドバイザー
+
+orm_example.py と core_example.py のすべての例（example_*）を実行し、
+そのとき発行された SELECT 文を EXPLAIN にかけて、全件走査（シーケンシャルスキャン）している
+テーブルを一覧にします。インデックスが足りない検索条件を見つけるのに使います。
+
+- PostgreSQL: EXPLAIN の結果から「Seq Scan on テーブル名」を探します。
+  データが少ないと、インデックスがあっても全件走査の方が速いと判断されるため、
+  enable_seqscan = off にして「インデックスを使える場合は使う」状態で調べます。
+- SQLite: EXPLAIN QUERY PLAN の結果から、インデックスを使わない「SCAN テーブル名」を探します。
+- MySQL / MariaDB: EXPLAIN の結果から、type が ALL（全件走査）の行のテーブルを探します。
+それ以外のデータベースでは、例を実行する前にメッセージを表示して終了します。
+
+WHERE のない SELECT（すべての行を取得する例など）は、最初に読むテーブル1つの全件走査は当然なので
+「想定どおり」と表示します。それ以外の全件走査は「要確認」です。
+
+使い方:
+    python index_advisor.py
+（DATABASE_URL は orm_example.py / core_example.py と同じものが使われます）
+"""
+
+import contextlib
+import io
+import re
+import sys
+
+from sqlalchemy import event
+
+import core_example
+import orm_example
+
+
+def collect_statements(module):
+    """モジュールのすべての例を実行し、発行された SELECT 文とパラメータを集める"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    module.engine.echo = False
+    event.listen(module.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for name in sorted(dir(module), key=_example_number):
+            if name.startswith("example_"):
+                # 例が表示する内容はここでは不要なので捨てる
+                with contextlib.redirect_stdout(io.StringIO()):
+                    getattr(module, name)()
+    finally:
+        event.remove(module.engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def _example_number(name):
+    match = re.match(r"example_(\d+)_", name)
+    return int(match.group(1)) if match else 0
+
+
+# EXPLAIN の結果から全件走査を判定できるデータベース
+SUPPORTED_DIALECTS = ("postgresql", "sqlite", "mysql", "mariadb")
+
+
+def sequential_scans(conn, statement, parameters):
+    """SELECT 文を EXPLAIN して、全件走査しているテーブル名のリストを返す"""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = [row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        return re.findall(r"Seq Scan on (\w+)", "\n".join(plan))
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        return [m.group(1) for line in plan if (m := re.match(r"SCAN (\w+)", line)) and "INDEX" not in line]
+    # MySQL / MariaDB
+    plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings()
+    return [row["table"] for row in plan if row["type"] == "ALL"]
+
+
+def _unique(statements):
+    """同じ SQL が（パラメータを変えて）何度も実行されている場合は1回だけ調べる"""
+    seen = set()
+    for statement, parameters in statements:
+        if statement not in seen:
+            seen.add(statement)
+            yield statement, parameters
+
+
+def main():
+    dialect_name = orm_example.engine.dialect.name
+    if dialect_name not in SUPPORTED_DIALECTS:
+        sys.exit(f"{dialect_name} には対応していません（対応しているデータベース: {', '.join(SUPPORTED_DIALECTS)}）")
+
+    print("インデックスアドバイザー")
+    print("=" * 50)
+
+    for module in (orm_example, core_example):
+        print(f"\n=== {module.__name__}.py ===")
+        statements = collect_statements(module)
+        with module.engine.connect() as conn:
+            for statement, parameters in _unique(statements):
+                tables = sorted(set(sequential_scans(conn, statement, parameters)))
+                if not tables:
+                    continue
+                # WHERE がなければ、最初に読むテーブル1つは全件走査になって当然
+                expected = 0 if re.search(r"\bWHERE\b", statement, re.IGNORECASE) else 1
+                label = "要確認" if len(tables) > expected else "想定どおり（条件なし）"
+                print(f"\n[{label}] 全件走査: {', '.join(tables)}")
+                print("  " + " ".join(statement.split()))
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
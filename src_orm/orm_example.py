@@ -13,8 +13,9 @@ SQL を直接書かずに、Python のオブジェクト操作でデータベー
 - データの追加、更新、削除
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Numeric, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Numeric, ForeignKey, Index, exists, func, select
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 import os
@@ -30,7 +31,10 @@ DATABASE_URL = os.getenv(
 )
 
 # エンジンを作成
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True で実行されるSQLを表示
+# 実行されるSQLの表示（環境変数 SQL_ECHO）
+#   true: SQL を表示（デフォルト） / debug: 取得した行も表示 / false: 表示しない
+SQL_ECHO = os.getenv('SQL_ECHO', 'true').lower()
+engine = create_engine(DATABASE_URL, echo='debug' if SQL_ECHO == 'debug' else SQL_ECHO in ('1', 'true', 'yes'))
 
 # セッションクラスを作成
 SessionLocal = sessionmaker(bind=engine)
@@ -56,7 +60,7 @@ class Student(Base):
     student_id = Column(Integer, primary_key=True)
     name = Column(String(200), nullable=False)
     email = Column(String(200), nullable=False, unique=True)
-    enrollment_date = Column(DateTime, nullable=False)
+    enrollment_date = Column(DateTime, nullable=False, index=True)  # index=True でインデックスを作成
     
     # リレーションシップ: 1人の生徒は複数の受講登録を持つ
     enrollments = relationship('Enrollment', back_populates='student')
@@ -64,6 +68,7 @@ class Student(Base):
     def __repr__(self):
         return f"<Student(id={self.student_id}, name='{self.name}')>"
     
+    @hybrid_method
     def has_active_enrollment(self):
         """
         シンプルなメソッド例: アクティブな受講登録があるかチェック
@@ -72,8 +77,18 @@ class Student(Base):
         テーブルをクラスとして定義することで、データに関連するロジックを
         クラス内にメソッドとして定義できます。
         これにより、コードの再利用性と可読性が向上します。
+        
+        【hybrid_method】
+        student.has_active_enrollment() のようにインスタンスで呼ぶと、この Python の処理が動きます。
+        Student.has_active_enrollment() のようにクラスで呼ぶと、下の expression の SQL 式になり、
+        filter() や order_by() の中で使えます（例15）。
         """
         return any(enrollment.status == 'active' for enrollment in self.enrollments)
+    
+    @has_active_enrollment.expression
+    def has_active_enrollment(cls):
+        # EXISTS (SELECT * FROM enrollments WHERE student_id = students.student_id AND status = 'active')
+        return exists().where(Enrollment.student_id == cls.student_id, Enrollment.status == 'active')
 
 
 class Course(Base):
@@ -98,11 +113,14 @@ class Enrollment(Base):
     __tablename__ = 'enrollments'
     
     enrollment_id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey('students.student_id'), nullable=False)
-    course_id = Column(Integer, ForeignKey('courses.course_id'), nullable=False)
+    student_id = Column(Integer, ForeignKey('students.student_id'), nullable=False, index=True)
+    course_id = Column(Integer, ForeignKey('courses.course_id'), nullable=False, index=True)
     enrolled_at = Column(DateTime, nullable=False)
     status = Column(String(20), nullable=False)
     
+    # 複数のカラムにまたがるインデックス（複合インデックス）は __table_args__ で定義
+    __table_args__ = (Index('ix_enrollments_status_course_id', 'status', 'course_id'),)
+    
     # リレーションシップ: 多対1の関係
     student = relationship('Student', back_populates='enrollments')
     course = relationship('Course', back_populates='enrollments')
@@ -113,6 +131,7 @@ class Enrollment(Base):
     def __repr__(self):
         return f"<Enrollment(id={self.enrollment_id}, student_id={self.student_id}, course_id={self.course_id})>"
     
+    @hybrid_method
     def get_completed_lessons_count(self):
         """
         実用的なメソッド例: 完了したレッスン数を取得
@@ -122,8 +141,21 @@ class Enrollment(Base):
         メソッドとして定義することで、ビジネスロジックをモデルに集約できます。
         呼び出し側は単純に enrollment.get_completed_lessons_count() と
         呼ぶだけで済み、実装の詳細を気にする必要がありません。
+        
+        【注意】
+        インスタンスで呼ぶと、すべてのレッスンをメモリに読み込んでから数えます。
+        たくさんの受講登録について数える場合は、クラスで呼んで SQL の COUNT にしましょう（例15）。
         """
         return sum(1 for lesson in self.lessons if lesson.status == 'completed')
+    
+    @get_completed_lessons_count.expression
+    def get_completed_lessons_count(cls):
+        # (SELECT count(*) FROM lessons WHERE enrollment_id = enrollments.enrollment_id AND status = 'completed')
+        return (
+            select(func.count(Lesson.lesson_id))
+            .where(Lesson.enrollment_id == cls.enrollment_id, Lesson.status == 'completed')
+            .scalar_subquery()
+        )
 
 
 class Lesson(Base):
@@ -137,6 +169,8 @@ class Lesson(Base):
     status = Column(String(20), nullable=False)
     notes = Column(Text)
     
+    __table_args__ = (Index('ix_lessons_enrollment_id_status', 'enrollment_id', 'status'),)
+    
     # リレーションシップ
     enrollment = relationship('Enrollment', back_populates='lessons')
     video_submissions = relationship('VideoSubmission', back_populates='lesson')
@@ -150,7 +184,7 @@ class VideoSubmission(Base):
     __tablename__ = 'video_submissions'
     
     submission_id = Column(Integer, primary_key=True)
-    lesson_id = Column(Integer, ForeignKey('lessons.lesson_id'), nullable=False)
+    lesson_id = Column(Integer, ForeignKey('lessons.lesson_id'), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     video_url = Column(String(500))
     submitted_at = Column(DateTime, nullable=False)
@@ -169,8 +203,8 @@ class Review(Base):
     __tablename__ = 'reviews'
     
     review_id = Column(Integer, primary_key=True)
-    submission_id = Column(Integer, ForeignKey('video_submissions.submission_id'), nullable=False)
-    rating = Column(Integer)
+    submission_id = Column(Integer, ForeignKey('video_submissions.submission_id'), nullable=False, index=True)
+    rating = Column(Integer, index=True)
     feedback = Column(Text)
     reviewed_at = Column(DateTime, nullable=False)
     
@@ -457,6 +491,33 @@ def example_14_class_method_practical():
         session.close()
 
 
+def example_15_hybrid_method_in_query():
+    """例15: メソッドを SQL の条件・並び替えに使う（hybrid_method）"""
+    print("\n=== 例15: メソッドを SQL の条件・並び替えに使う ===")
+    print("例13・14 のメソッドは、レッスンなどをすべて読み込んでから Python で数えます。")
+    print("クラスから呼ぶと SQL の式になるので、データベースに数えさせることができます。")
+    print()
+    
+    session = SessionLocal()
+    try:
+        # WHERE EXISTS (...) で、アクティブな受講登録がある生徒だけを取得
+        active_students = session.query(Student).filter(Student.has_active_enrollment()).all()
+        print(f"アクティブな受講登録がある生徒: {len(active_students)}人")
+        
+        # 完了したレッスン数をサブクエリで数え、多い順に並べる（レッスンは読み込まない）
+        completed_count = Enrollment.get_completed_lessons_count().label('completed_count')
+        results = (
+            session.query(Enrollment.enrollment_id, completed_count)
+            .order_by(completed_count.desc(), Enrollment.enrollment_id)
+            .limit(5)
+            .all()
+        )
+        for enrollment_id, count in results:
+            print(f"受講登録ID: {enrollment_id}, 完了レッスン数: {count}")
+    finally:
+        session.close()
+
+
 if __name__ == '__main__':
     print("SQLAlchemy ORM サンプルプログラム")
     print("=" * 50)
@@ -476,6 +537,7 @@ if __name__ == '__main__':
     example_12_complex_query()
     example_13_class_method_simple()
     example_14_class_method_practical()
+    example_15_hybrid_method_in_query()
     
     print("\n" + "=" * 50)
     print("すべての例を実行しました！")
@@ -0,0 +1,60 @@
+"""
+テストの共通設定
+
+src_fast_api のモジュールは import したときの環境変数（DATABASE_URL など）を使うため、
+import する前に一時ファイルの SQLite を指定します。
+テストごとに 01_ddl.sql と 02_seed.sql でテーブルを作り直し、レスポンスキャッシュも空にします。
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = tempfile.mkdtemp(prefix="tests_")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(WORK_DIR) / 'test.db'}"
+os.environ["CACHE_TTL"] = "30"
+sys.path.insert(0, str(ROOT / "sample_data"))
+sys.path.insert(0, str(ROOT / "src_fast_api"))
+
+SEED_PATH = ROOT / "sample_data" / "02_seed.sql"
+
+
+@pytest.fixture
+def engine():
+    """01_ddl.sql と 02_seed.sql で作り直したデータベースのエンジン"""
+    import generate_data
+    from database import engine
+
+    generate_data.reset_schema(engine)
+    dbapi_conn = engine.raw_connection()
+    try:
+        dbapi_conn.executescript(SEED_PATH.read_text(encoding="utf-8"))
+        dbapi_conn.commit()
+    finally:
+        dbapi_conn.close()
+    return engine
+
+
+@pytest.fixture
+def app(engine):
+    """main.py のアプリケーション（レスポンスキャッシュは空の状態）"""
+    from cache import MemoryBackend, cache
+    from main import app
+
+    cache.backend = MemoryBackend()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
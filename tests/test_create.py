@@ -0,0 +1,110 @@
+"""
+POST /students・/students/bulk の重複の扱い
+
+同じ ID・メールアドレスの登録を並列に送っても、データベースの制約で1件だけが登録されることを確かめます。
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+from sqlalchemy import func, select
+
+from crud import _create_one_without_on_conflict, bulk_create
+from database import SessionLocal
+from models import Student
+
+
+def student(student_id, email=None):
+    return {
+        "student_id": student_id,
+        "name": f"生徒 {student_id}",
+        "email": email or f"student{student_id}@example.com",
+        "enrollment_date": "2024-04-01T09:00:00",
+    }
+
+
+def student_row(student_id, email=None):
+    """crud の関数に直接渡す行（日時は datetime）"""
+    return {**student(student_id, email), "enrollment_date": datetime(2024, 4, 1, 9)}
+
+
+def post_in_parallel(app, requests):
+    """(パス, ボディ) のリストを同時に送り、レスポンスを返す（def のエンドポイントはスレッドプールで並列に動く）"""
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(path, json=body) for path, body in requests))
+
+    return asyncio.run(run())
+
+
+def count_students(**filters):
+    with SessionLocal() as db:
+        query = select(func.count()).select_from(Student).filter_by(**filters)
+        return db.scalar(query)
+
+
+def test_parallel_creates_with_same_id(app):
+    responses = post_in_parallel(app, [("/students", student(900, f"dup{i}@example.com")) for i in range(20)])
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200] + [400] * 19
+    assert count_students(student_id=900) == 1
+
+
+def test_parallel_creates_with_same_email(app):
+    responses = post_in_parallel(app, [("/students", student(900 + i, "same@example.com")) for i in range(20)])
+    assert sorted(r.status_code for r in responses) == [200] + [400] * 19
+    assert count_students(email="same@example.com") == 1
+
+
+def test_parallel_upserts(app):
+    responses = post_in_parallel(
+        app, [("/students?upsert=true", {**student(101), "name": f"更新 {i}"}) for i in range(10)]
+    )
+    assert all(r.status_code == 200 for r in responses)
+    assert count_students(student_id=101) == 1
+    with SessionLocal() as db:
+        assert db.get(Student, 101).name in {f"更新 {i}" for i in range(10)}
+
+
+def test_parallel_bulk_creates_with_overlap(app):
+    # 2つのリクエストで 1000〜1149 が重複している
+    first = [student(i) for i in range(1000, 1150)]
+    second = [student(i) for i in range(1000, 1300)]
+    responses = post_in_parallel(app, [("/students/bulk?batch_size=50", first), ("/students/bulk?batch_size=50", second)])
+    results = [r.json() for r in responses]
+
+    assert sum(r["created"] for r in results) == 300
+    assert count_students() == 6 + 300
+    # 重複した 150 行は、どちらかのリクエストで1行ずつ競合として返る
+    conflicts = [c for r in results for c in r["conflicts"]]
+    assert len(conflicts) == 150
+    assert all(c["field"] in ("student_id", "email") for c in conflicts)
+
+
+def test_bulk_reports_each_conflicting_row(engine):
+    # 事前チェックで見つからない競合（ここでは unique_columns に含めていないメールアドレス）が
+    # INSERT で起きても、バッチ全体ではなく競合した行だけが返る
+    rows = [student_row(900), student_row(901, "ichiro.tanaka@example.com"), student_row(902)]
+    with SessionLocal() as db:
+        created, conflicts = bulk_create(db, Student, rows, [Student.student_id])
+    assert created == 2
+    assert conflicts == [{"index": 1, "field": "student_id", "value": 901, "reason": "rejected by database"}]
+    assert count_students() == 6 + 2
+
+
+def test_create_without_on_conflict(engine):
+    # ON CONFLICT がないデータベース向けの処理（INSERT の制約違反で判定）
+    with SessionLocal() as db:
+        row = _create_one_without_on_conflict(db, Student, student_row(900), upsert=False)
+        assert row.student_id == 900
+        assert _create_one_without_on_conflict(db, Student, student_row(900), upsert=False) is None
+
+        updated = _create_one_without_on_conflict(db, Student, {**student_row(900), "name": "上書き"}, upsert=True)
+        assert updated.name == "上書き"
+        # 別の生徒のメールアドレスと重複する upsert は登録できない
+        duplicate_email = student_row(907, "ichiro.tanaka@example.com")
+        assert _create_one_without_on_conflict(db, Student, duplicate_email, upsert=True) is None
+    assert count_students() == 7
@@ -0,0 +1,99 @@
+"""
+受講登録のネストしたエンドポイントの SQL の実行回数
+
+include で指定したリレーションシップを先読みするので、受講登録・レッスン・提出・レビューの件数を増やしても
+1リクエストで実行される SQL の回数が変わらない（N+1問題が起きない）ことを確かめます。
+"""
+
+import contextlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, insert
+
+from models import Enrollment, Lesson, Review, VideoSubmission
+
+STUDENT_ID = 101
+COURSE_ID = 201
+
+
+@contextlib.contextmanager
+def count_statements(engine):
+    """ブロックの中で実行された SQL の数を数える（counter[0] に入る）"""
+    counter = [0]
+
+    def before_cursor_execute(*args):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_enrollments(engine, count: int):
+    """生徒 101・コース 201 の受講登録を count 件追加する（1件につきレッスン3つ、それぞれに提出とレビュー）"""
+    at = datetime(2024, 4, 1, 9)
+    enrollments, lessons, submissions, reviews = [], [], [], []
+    for i in range(count):
+        enrollment_id = 10000 + i
+        enrollments.append({"enrollment_id": enrollment_id, "student_id": STUDENT_ID, "course_id": COURSE_ID,
+                            "enrolled_at": at, "status": "active"})
+        for j in range(3):
+            lesson_id = enrollment_id * 10 + j
+            lessons.append({"lesson_id": lesson_id, "enrollment_id": enrollment_id, "scheduled_at": at,
+                            "duration_minutes": 60, "status": "completed", "notes": None})
+            submissions.append({"submission_id": lesson_id, "lesson_id": lesson_id, "title": f"提出 {lesson_id}",
+                                "video_url": None, "submitted_at": at, "status": "reviewed"})
+            reviews.append({"review_id": lesson_id, "submission_id": lesson_id, "rating": 5, "feedback": None,
+                            "reviewed_at": at})
+    with engine.begin() as conn:
+        for model, rows in ((Enrollment, enrollments), (Lesson, lessons), (VideoSubmission, submissions),
+                            (Review, reviews)):
+            conn.execute(insert(model), rows)
+
+
+@pytest.mark.parametrize("path", [
+    f"/students/{STUDENT_ID}/enrollments",
+    f"/students/{STUDENT_ID}/enrollments?include=course,lessons",
+    f"/students/{STUDENT_ID}/enrollments?status=active&include=course",
+    f"/students/{STUDENT_ID}/enrollments?include=student,course,lessons.submissions.reviews",
+    f"/courses/{COURSE_ID}/enrollments?include=student,lessons.submissions",
+])
+def test_statement_count_does_not_grow_with_rows(client, engine, path):
+    with count_statements(engine) as before:
+        first = client.get(path)
+    assert first.status_code == 200
+
+    add_enrollments(engine, 30)
+    with count_statements(engine) as after:
+        second = client.get(path)
+    assert second.status_code == 200
+
+    assert len(second.json()) == len(first.json()) + 30
+    assert after[0] == before[0], f"{path}: SQL の回数が {before[0]} 回から {after[0]} 回に増えました"
+
+
+def test_active_enrollments_with_course(client, engine):
+    with count_statements(engine) as counter:
+        response = client.get("/students/102/enrollments?status=active&include=course")
+    assert response.status_code == 200
+    enrollments = response.json()
+    assert [enrollment["enrollment_id"] for enrollment in enrollments] == [303]
+    assert enrollments[0]["course"]["course_id"] == 201
+    # コースは JOIN で一緒に読み込むので1回
+    assert counter[0] == 1
+
+
+def test_statement_count_for_single_enrollment(client, engine):
+    add_enrollments(engine, 1)
+    path = "/enrollments/10000?include=student,course,lessons.submissions.reviews"
+    with count_statements(engine) as counter:
+        response = client.get(path)
+    assert response.status_code == 200
+    lessons = response.json()["lessons"]
+    assert len(lessons) == 3
+    assert all(len(lesson["submissions"][0]["reviews"]) == 1 for lesson in lessons)
+    # 受講登録（生徒・コースは JOIN）+ レッスン + 提出 + レビューの4回
+    assert counter[0] <= 4
@@ -0,0 +1,75 @@
+"""
+条件付き GET（ETag / If-None-Match）
+
+ETag はキャッシュのキー（名前空間のバージョン + ルート + パラメータ）から作るので、
+キャッシュになくてもデータベースを使わずに 304 を返せること、POST で変わること、
+ワーカー（キャッシュ）が別でも同じ値になることを確かめます。
+キャッシュなし（CACHE_TTL=0）の場合はデータから作るので、API を通さない更新でも変わります。
+"""
+
+from sqlalchemy import event, text
+
+from cache import MemoryBackend, cache
+
+
+def test_not_modified(client):
+    first = client.get("/students/101")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get("/students/101", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+
+
+def test_etag_changes_after_post(client):
+    etag = client.get("/students?limit=100").headers["etag"]
+    client.post("/students", json={
+        "student_id": 900, "name": "新入生", "email": "new@example.com", "enrollment_date": "2024-04-01T09:00:00",
+    })
+    response = client.get("/students?limit=100", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_changes_after_direct_update(client, engine):
+    # キャッシュなし（CACHE_TTL=0）なら、API を通さない更新もすぐに ETag に反映される
+    cache.ttl = 0
+    try:
+        etag = client.get("/courses/201").headers["etag"]
+        assert client.get("/courses/201", headers={"If-None-Match": etag}).status_code == 304
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE courses SET title = '更新済み' WHERE course_id = 201"))
+
+        response = client.get("/courses/201", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["title"] == "更新済み"
+        assert response.headers["etag"] != etag
+    finally:
+        cache.ttl = 30
+
+
+def test_same_etag_across_workers(client):
+    # 別のワーカー（別のキャッシュ）でも、バージョンが同じなら ETag は同じ
+    etag = client.get("/courses?limit=100").headers["etag"]
+    cache.backend = MemoryBackend()
+    response = client.get("/courses?limit=100", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_not_modified_without_loading(client, engine):
+    # キャッシュから消えていても、ETag が一致すればデータベースを使わずに 304 を返す
+    etag = client.get("/students/101").headers["etag"]
+    cache.backend = MemoryBackend()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/students/101", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 304
+    assert statements == []
@@ -0,0 +1,113 @@
+"""
+GET /export/{table} のメモリ使用量
+
+100万行の生徒テーブルをエクスポートしても、サーバーのピークメモリ（RSS）がほとんど増えないことを確かめます。
+TestClient はレスポンス全体をメモリに溜めるため、uvicorn を別プロセスで起動し、
+そのプロセスのピーク RSS（/proc/<pid>/status の VmHWM）を読みます（Linux のみ）。
+
+行数は EXPORT_TEST_ROWS で変えられます（デフォルト: 1000000）。
+"""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+
+import generate_data
+
+ROOT = Path(__file__).resolve().parent.parent
+ROWS = int(os.getenv("EXPORT_TEST_ROWS", "1000000"))
+# 1行およそ 90 バイトなので、100万行の NDJSON は約 90MB。全行をメモリに載せれば、これを大きく超える
+MAX_RSS_GROWTH_MB = 50
+
+
+def load_students(database_url: str, rows: int):
+    engine = create_engine(database_url)
+    generate_data.reset_schema(engine)
+    start = generate_data.START_DATE
+    dbapi_conn = engine.raw_connection()
+    try:
+        generate_data._executemany_sqlite(
+            dbapi_conn,
+            "students",
+            generate_data.TABLES["students"],
+            ((i, f"生徒 {i}", f"student{i}@example.com", start + timedelta(minutes=i)) for i in range(1, rows + 1)),
+        )
+        dbapi_conn.commit()
+    finally:
+        dbapi_conn.close()
+    engine.dispose()
+
+
+def peak_rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM が見つかりません")
+
+
+def get(port: int, path: str):
+    """GET して、(ステータス, 本文の行数) を返す（本文は少しずつ読み捨てる）"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    lines = 0
+    while chunk := response.read(1 << 16):
+        lines += chunk.count(b"\n")
+    conn.close()
+    return response.status, lines
+
+
+@pytest.fixture
+def server():
+    """100万行の生徒テーブルを持つ uvicorn を起動し、(ポート, プロセスID) を返す"""
+    if not Path("/proc/self/status").exists():
+        pytest.skip("/proc がない環境ではピーク RSS を測れません")
+    database_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='tests_export_')) / 'export.db'}"
+    load_students(database_url, ROWS)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT / "src_fast_api",
+        env={**os.environ, "DATABASE_URL": database_url, "CACHE_TTL": "0", "SLOW_REQUEST_MS": "600000"},
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                get(port, "/health")
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("main:app を起動できませんでした")
+                time.sleep(0.2)
+        yield port, process.pid
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_memory_stays_flat(server, fmt):
+    port, pid = server
+    # エクスポートと同じコードを一度通してから、基準のピーク RSS を測る
+    assert get(port, f"/export/courses?format={fmt}")[0] == 200
+    before = peak_rss_mb(pid)
+
+    status, lines = get(port, f"/export/students?format={fmt}")
+    growth = peak_rss_mb(pid) - before
+
+    assert status == 200
+    assert lines == ROWS + (1 if fmt == "csv" else 0)  # CSV はヘッダー行がある
+    assert growth < MAX_RSS_GROWTH_MB, f"{ROWS:,} 行のエクスポートでピーク RSS が {growth:.1f}MB 増えました"
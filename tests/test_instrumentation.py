@@ -0,0 +1,38 @@
+"""
+SQL の計測（instrumentation.py）
+
+失敗した SQL（重複した POST の IntegrityError など）も記録され、接続に計測用の値が残らないことを確かめます。
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from instrumentation import RequestStats, _current_stats
+
+
+def test_failed_statement_is_recorded(client, engine):
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(IntegrityError):
+                conn.execute(text("INSERT INTO courses (course_id, title, monthly_price, created_at) "
+                                  "SELECT course_id, title, monthly_price, created_at FROM courses"))
+            info = conn.connection.info
+    finally:
+        _current_stats.reset(token)
+    assert stats.statements == 2
+    assert not any(isinstance(value, list) for value in info.values())
+
+
+def test_duplicate_post_is_timed(client):
+    # 他の生徒とメールアドレスが重複する upsert は、INSERT が IntegrityError で失敗して 400 になる
+    student = {"student_id": 101, "name": "田中 一郎", "email": "misaki.takahashi@example.com",
+               "enrollment_date": "2024-01-05T09:00:00"}
+    for _ in range(3):
+        response = client.post("/students?upsert=true", json=student)
+        assert response.status_code == 400
+        assert 'desc="1 queries"' in response.headers["server-timing"]
+    assert client.get("/students/102").headers["server-timing"].startswith("db;dur=")
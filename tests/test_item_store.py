@@ -0,0 +1,60 @@
+"""
+main_simple.py のアイテムの保存先（ItemStore）
+
+書き込みの途中で止まったファイルを読み込み直しても、壊れずに追記を続けられることを確かめます。
+"""
+
+import json
+
+from item_store import ItemStore
+
+
+def read_lines(path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_truncated_last_line_is_removed(tmp_path):
+    path = tmp_path / "items.jsonl"
+    store = ItemStore(str(path))
+    store.add("apple")
+    store.add("banana", is_done=True)
+    store.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": 2, "name": "che')  # 書き込みの途中で止まった
+
+    store = ItemStore(str(path))
+    assert store.add("cherry")["id"] == 2
+    store.close()
+
+    assert [item["name"] for item in read_lines(path)] == ["apple", "banana", "cherry"]
+    assert [item["id"] for item in ItemStore(str(path)).list()] == [0, 1, 2]
+
+
+def test_next_id_follows_max_id(tmp_path):
+    path = tmp_path / "items.jsonl"
+    path.write_text(
+        '{"id": 0, "name": "apple", "is_done": false}\n'
+        'not json\n'
+        '{"id": 5, "name": "banana", "is_done": true}\n',
+        encoding="utf-8",
+    )
+    store = ItemStore(str(path))
+    assert store.count() == 2
+    assert store.add("cherry")["id"] == 6
+    assert store.get(5)["name"] == "banana"
+    assert [item["id"] for item in store.list(is_done=False)] == [0, 6]
+    store.close()
+
+
+def test_invalid_lines_are_skipped(tmp_path, caplog):
+    path = tmp_path / "items.jsonl"
+    lines = ['{"id": 0, "name": "apple", "is_done": false}', "{}", "[]", '{"name": "no id", "is_done": true}',
+             '{"id": "1", "name": "string id", "is_done": false}', "not json",
+             '{"id": 1, "name": "banana", "is_done": true}']
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+    store = ItemStore(str(path))
+    assert [item["name"] for item in store.list()] == ["apple", "banana"]
+    assert store.add("cherry")["id"] == 2
+    store.close()
+    assert len([record for record in caplog.records if record.name == "item_store"]) == 5
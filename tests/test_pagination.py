@@ -0,0 +1,34 @@
+"""
+キーセットページネーション（limit と cursor）
+
+範囲外の limit は 422 になり、ページの最後で X-Next-Cursor を返さないことを確かめます。
+"""
+
+import pytest
+
+from pagination import split_page
+from models import Student
+
+PATHS = ["/students", "/courses", "/reports/enrollment-progress"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+@pytest.mark.parametrize("limit", [0, -1, 1001])
+def test_limit_out_of_range(client, path, limit):
+    assert client.get(path, params={"limit": limit}).status_code == 422
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_pages_follow_cursor(client, path):
+    first = client.get(path, params={"limit": 1})
+    assert first.status_code == 200
+    assert len(first.json()) == 1
+    cursor = first.headers["x-next-cursor"]
+
+    rest = client.get(path, params={"limit": 1000, "cursor": cursor})
+    assert rest.status_code == 200
+    assert "x-next-cursor" not in rest.headers
+
+
+def test_split_page_with_zero_limit():
+    assert split_page([Student(student_id=1)], Student.student_id, 0) == ([], None)
@@ -0,0 +1,63 @@
+"""
+レプリカとレスポンスキャッシュを併用したときの read-your-writes
+
+レプリカは、テストの開始時点のデータベースをコピーした SQLite（その後の書き込みが反映されない、遅れたレプリカ）です。
+POST したクライアントの直後の GET に自分の書き込みが見え、
+ほかのクライアントがレプリカから読んだ古いデータがキャッシュに残らないことを確かめます。
+"""
+
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import database
+
+NEW_STUDENT = {"student_id": 900, "name": "新入生", "email": "new@example.com", "enrollment_date": "2024-04-01T09:00:00"}
+
+
+def student_ids(response) -> set:
+    assert response.status_code == 200
+    return {student["student_id"] for student in response.json()}
+
+
+@pytest.fixture
+def replica(engine, tmp_path, monkeypatch):
+    """プライマリをコピーした、遅れたレプリカ（read_engines に追加する）"""
+    path = tmp_path / "replica.db"
+    shutil.copy(engine.url.database, path)
+    replica = create_engine(f"sqlite:///{path}")
+    # main.py は read_engines を import しているので、リストそのものに追加する
+    database.read_engines.append(replica)
+    monkeypatch.setattr(database, "choose_read_engine", lambda: replica)
+    try:
+        yield path
+    finally:
+        database.read_engines.remove(replica)
+        replica.dispose()
+
+
+def test_post_then_get_sees_own_write(client, replica):
+    assert 900 not in student_ids(client.get("/students?limit=100"))  # レプリカから読んでキャッシュされる
+
+    assert client.post("/students", json=NEW_STUDENT).status_code == 200
+    assert database.PRIMARY_COOKIE in client.cookies
+
+    # 書き込みの直後に、ほかのクライアントがレプリカから（書き込み前のデータを）読む
+    TestClient(client.app).get("/students?limit=100")
+
+    assert 900 in student_ids(client.get("/students?limit=100"))
+    assert client.get("/students/900").status_code == 200
+
+
+def test_replica_reads_are_not_cached_right_after_write(client, replica, engine):
+    assert client.post("/students", json=NEW_STUDENT).status_code == 200
+
+    # Cookie のないクライアントはレプリカから読むので、まだ見えない
+    other = TestClient(client.app)
+    assert 900 not in student_ids(other.get("/students?limit=100"))
+
+    # レプリカに反映されたら、古い結果がキャッシュに残っていないのですぐに見える
+    shutil.copy(engine.url.database, replica)
+    assert 900 in student_ids(other.get("/students?limit=100"))
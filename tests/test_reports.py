@@ -0,0 +1,34 @@
+"""
+GET /reports/new-enrollment-revenue
+
+SQL の集計（EXTRACT + GROUP BY + ウィンドウ関数）の結果が、Python で数えた値と同じになることを確かめます。
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from database import SessionLocal
+from models import Course, Enrollment
+
+
+def test_new_enrollment_revenue(client):
+    with SessionLocal() as db:
+        prices = {course.course_id: course.monthly_price for course in db.query(Course)}
+        expected = defaultdict(lambda: [0, Decimal(0)])
+        for enrollment in db.query(Enrollment).filter(Enrollment.status != "cancelled"):
+            month = enrollment.enrolled_at.strftime("%Y-%m")
+            expected[month][0] += 1
+            expected[month][1] += prices[enrollment.course_id]
+
+    response = client.get("/reports/new-enrollment-revenue")
+    assert response.status_code == 200
+    rows = response.json()
+    assert [row["month"] for row in rows] == sorted(expected)
+
+    cumulative = Decimal(0)
+    for row in rows:
+        enrollments, revenue = expected[row["month"]]
+        cumulative += revenue
+        assert row["enrollments"] == enrollments
+        assert Decimal(row["first_month_revenue"]) == revenue
+        assert Decimal(row["cumulative_first_month_revenue"]) == cumulative
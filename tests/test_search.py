@@ -0,0 +1,35 @@
+"""
+全文検索（GET /search）
+
+トライグラムを作れない2文字のキーワード（「練習」など）でも、含む行だけが関連度の順に返ることを確かめます。
+"""
+
+
+def search(client, q: str, target: str = "reviews"):
+    response = client.get("/search", params={"q": q, "target": target, "limit": 100})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_two_character_term_is_ranked(client):
+    results = search(client, "練習")
+    assert results
+    assert all("練習" in row["text"] for row in results)
+    ranks = [row["rank"] for row in results]
+    assert ranks == sorted(ranks, reverse=True)
+    assert all(rank > 0 for rank in ranks)
+
+
+def test_short_and_long_terms(client):
+    results = search(client, "自己紹介 発音")
+    assert results
+    assert all("自己紹介" in row["text"] and "発音" in row["text"] for row in results)
+    assert {row["id"] for row in results} <= {row["id"] for row in search(client, "発音")}
+
+
+def test_short_term_rank_ignores_case(client):
+    # LIKE と同じく、英字の大文字・小文字を区別せずに関連度を数える
+    results = search(client, "to", target="courses")
+    assert [row["title"] for row in results] == ["TOEIC対策コース"]
+    assert results[0]["rank"] > 0
+    assert results[0]["rank"] == search(client, "TO", target="courses")[0]["rank"]
@@ -0,0 +1,36 @@
+"""
+セッションの枠（database.session_slots）
+
+枠はセッションを初めて使うときに取るので、遅い SQL が枠を使い切っていても、
+データベースを使わないリクエスト（キャッシュ・304・入力エラー）は待たされないことを確かめます。
+"""
+
+import contextlib
+
+from database import session_slots
+
+
+@contextlib.contextmanager
+def all_slots_taken():
+    for _ in range(session_slots.size):
+        session_slots.acquire()
+    try:
+        yield
+    finally:
+        for _ in range(session_slots.size):
+            session_slots.release()
+
+
+def test_requests_without_database_do_not_wait_for_slots(client):
+    etag = client.get("/students/101").headers["etag"]  # キャッシュに入れる
+
+    with all_slots_taken():
+        assert client.get("/students/101").status_code == 200
+        assert client.get("/students/101", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/students?limit=0").status_code == 422
+
+    # 使った枠は返されているので、データベースを使うリクエストも通る
+    with all_slots_taken():
+        pass
+    assert client.get("/students/102").status_code == 200
+    assert client.get("/courses/201").status_code == 200
@@ -0,0 +1,107 @@
+"""
+ダッシュボード用の集計テーブル
+
+コースの登録で件数と月額の合計が差分で更新され、rebuild() で作り直した値と一致することを確かめます。
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+import summary
+from database import SessionLocal
+from models import CourseStats, Review, VideoSubmission
+
+
+def course(course_id: int, price: int) -> dict:
+    return {"course_id": course_id, "title": f"コース {course_id}", "monthly_price": price,
+            "created_at": "2024-04-01T09:00:00"}
+
+
+def rebuilt_dashboard() -> dict:
+    db = SessionLocal()
+    try:
+        summary.rebuild(db)
+        return summary.dashboard(db)
+    finally:
+        db.close()
+
+
+def test_dashboard_is_built_at_startup(client):
+    # 02_seed.sql で投入しただけで、rebuild を実行していなくても集計がある
+    dashboard = client.get("/stats/dashboard").json()
+    assert dashboard["courses"] == 5
+    assert dashboard["enrollments_by_status"]
+    assert dashboard == rebuilt_dashboard()
+
+
+def test_course_totals_are_incremental(client):
+    before = client.get("/stats/dashboard").json()
+    assert client.post("/courses", json=course(900, 10000)).status_code == 200
+    assert client.post("/courses/bulk", json=[course(901, 20000), course(902, 30000)]).json()["created"] == 2
+
+    after = client.get("/stats/dashboard").json()
+    assert after["courses"] == before["courses"] + 3
+    assert after == rebuilt_dashboard()
+
+
+def test_upsert_adds_price_difference(client):
+    client.post("/courses", json=course(900, 10000))
+    before = client.get("/stats/dashboard").json()
+
+    assert client.post("/courses?upsert=true", json=course(900, 16000)).status_code == 200
+    after = client.get("/stats/dashboard").json()
+    assert after["courses"] == before["courses"]
+    assert after["average_course_price"] == before["average_course_price"] + 6000 / before["courses"]
+    assert after == rebuilt_dashboard()
+
+
+def test_concurrent_course_creates(client):
+    def create(course_id):
+        # SQLite は同時に書き込むと "database is locked" になることがあるので、やり直す
+        # （失敗したリクエストは集計テーブルの更新も含めてロールバックされる）
+        while True:
+            try:
+                return client.post("/courses", json=course(course_id, 1000 + course_id)).status_code
+            except OperationalError:
+                pass
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(create, range(900, 940))) == {200}
+    assert client.get("/stats/dashboard").json() == rebuilt_dashboard()
+
+
+def test_tables_are_created_on_old_database(app, engine):
+    # 集計テーブルを追加する前の 01_ddl.sql で作ったデータベース
+    with engine.begin() as conn:
+        for model in summary.SUMMARY_MODELS:
+            conn.execute(text(f"DROP TABLE {model.__tablename__}"))
+
+    with TestClient(app) as client:
+        assert client.get("/students/101").status_code == 200
+        dashboard = client.get("/stats/dashboard").json()
+    assert dashboard["courses"] == 5
+    assert dashboard == rebuilt_dashboard()
+
+
+def test_delete_submission_with_its_reviews(client):
+    # 提出とそのレビューを同じ flush で削除しても、コースのレビュー数が減る
+    db = SessionLocal()
+    try:
+        submission = db.get(VideoSubmission, db.scalars(select(Review.submission_id).order_by(Review.review_id)).first())
+        course_id = submission.lesson.enrollment.course_id
+        before = summary.course_stats(db, course_id)
+        for review in submission.reviews:
+            db.delete(review)
+        db.delete(submission)
+        db.commit()
+
+        after = summary.course_stats(db, course_id)
+        assert after["review_count"] == before["review_count"] - len(submission.reviews)
+        counts = {stats.course_id: stats.review_count for stats in db.scalars(select(CourseStats))}
+        summary.rebuild(db)
+        assert counts == {stats.course_id: stats.review_count for stats in db.scalars(select(CourseStats))}
+    finally:
+        db.close()